@@ -3,6 +3,11 @@ from flask import Flask, request, jsonify, send_from_directory, Response, stream
 from flask_cors import CORS
 from podcast_generator import PodcastGenerator
 from memory_manager import MemoryManager
+from elevenlabs_queue import PARTIAL_AUDIO_SUFFIX
+from episode_events import EpisodeEvents
+from claude_scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, claude_priority, get_claude_scheduler
+from sanity_outbox import get_sanity_outbox
+from werkzeug.utils import safe_join
 import traceback
 import os
 import threading
@@ -10,6 +15,8 @@ import queue
 import uuid
 import json
 import time
+import hashlib
+from config import AUDIO_CACHE_MAX_AGE, GENERATION_QUALITY_MODES, SANITY_ASYNC_WRITES
 
 app = Flask(__name__)
 CORS(app)
@@ -21,6 +28,9 @@ os.makedirs(AUDIO_DIR, exist_ok=True)
 # Initialize generator
 generator = PodcastGenerator()
 
+# Per-episode progress events (Redis pub/sub, served as SSE)
+episode_events = EpisodeEvents()
+
 # Initialize Redis-based topic queue
 try:
     from topic_queue import TopicQueue
@@ -37,7 +47,10 @@ def health():
     return jsonify({
         'status': 'healthy',
         'service': 'EchoDuo API',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'claude_scheduler': get_claude_scheduler().health(),
+        'sanity_outbox': get_sanity_outbox().health() if generator.sanity and SANITY_ASYNC_WRITES else None,
+        'generation_quality': generator.quality_summary()
     })
 
 
@@ -50,7 +63,8 @@ def generate_podcast():
     {
         "topic": "string (required)",
         "context": "string (optional)",
-        "sponsor": "string (optional)"
+        "sponsor": "string (optional)",
+        "quality_mode": "single_pass | lint | two_pass (optional)"
     }
     """
     try:
@@ -64,6 +78,7 @@ def generate_podcast():
         topic = data['topic']
         context = data.get('context')
         sponsor = data.get('sponsor')
+        quality_mode = data.get('quality_mode')
         
         # Validate sponsor if provided
         if sponsor:
@@ -73,88 +88,216 @@ def generate_podcast():
                     'error': f'Invalid sponsor. Must be one of: {", ".join(AVAILABLE_SPONSORS)}'
                 }), 400
         
-        # Generate podcast
+        if quality_mode and quality_mode not in GENERATION_QUALITY_MODES:
+            return jsonify({
+                'error': f'Invalid quality_mode. Must be one of: {", ".join(GENERATION_QUALITY_MODES)}'
+            }), 400
+        
+        data = _generate_episode(topic, context, sponsor, quality_mode=quality_mode)
+        
+        return jsonify({
+            'success': True,
+            'data': data
+        })
+    
+    except Exception as e:
+        traceback.print_exc()
+        return jsonify({
+            'error': str(e),
+            'type': type(e).__name__
+        }), 500
+
+
+def _generate_episode(topic, context=None, sponsor=None, episode_id=None, on_event=None, quality_mode=None):
+    """
+    Generate an episode's script and audio.
+    
+    Args:
+        topic: Podcast topic
+        context: Optional pre-fetched context
+        sponsor: Optional sponsor to force
+        episode_id: Optional episode ID (generated if not given)
+        on_event: Optional callback receiving (event_type, data) progress events
+        quality_mode: Optional quality mode override
+    
+    Returns:
+        Response data for the episode
+    """
+    # Start text-to-speech while the final script is still streaming
+    episode_id = episode_id or f"episode-{uuid.uuid4().hex[:12]}"
+    tts_pipeline = _open_tts_pipeline(episode_id)
+    
+    def _forward_line(line):
+        if on_event:
+            on_event('script_line', {'line': line})
+        if tts_pipeline:
+            tts_pipeline.add_line(line)
+    
+    on_line = _forward_line if (tts_pipeline or on_event) else None
+    
+    # Generate podcast
+    try:
         result = generator.generate(
             topic=topic,
             real_world_context=context,
-            force_sponsor=sponsor
+            force_sponsor=sponsor,
+            on_line=on_line,
+            on_event=on_event,
+            quality_mode=quality_mode
         )
-        
-        # Queue and process dialogues for ElevenLabs if configured
-        audio_files = []
-        elevenlabs_queued = False
-        elevenlabs_error = None
-        episode_id = None
-        
-        try:
-            from elevenlabs_queue import ElevenLabsQueue
-            from config import ELEVENLABS_API_KEY
-            import uuid
-            import os
-            
-            if ELEVENLABS_API_KEY:
+    except Exception:
+        if tts_pipeline:
+            tts_pipeline.cancel()
+        raise
+    
+    # Queue and process dialogues for ElevenLabs if configured
+    audio_files = []
+    episode_audio = None
+    episode_audio_index = None
+    elevenlabs_queued = False
+    elevenlabs_error = None
+    
+    try:
+        from elevenlabs_queue import ElevenLabsQueue
+        from config import ELEVENLABS_API_KEY
+        import os
+        
+        if ELEVENLABS_API_KEY:
+            process_result = None
+            if tts_pipeline:
+                # Lines have been synthesizing since they were streamed
+                print(f"🎵 Waiting for streamed audio generation...")
+                process_result = tts_pipeline.finish()
+                queue_result = {
+                    'success': process_result.get('success'),
+                    'total_dialogues': process_result.get('total', 0),
+                    'error': process_result.get('error')
+                }
+            else:
                 queue_manager = ElevenLabsQueue()
-                episode_id = f"episode-{uuid.uuid4().hex[:12]}"
                 
                 # Queue dialogues
                 queue_result = queue_manager.queue_dialogues(
                     result['conversation'],
                     episode_id
                 )
+            
+            if queue_result.get('success'):
+                elevenlabs_queued = True
+                total_dialogues = queue_result.get('total_dialogues', 0)
+                print(f"🎤 Queued {total_dialogues} dialogues for ElevenLabs")
                 
-                if queue_result.get('success'):
-                    elevenlabs_queued = True
-                    total_dialogues = queue_result.get('total_dialogues', 0)
-                    print(f"🎤 Queued {total_dialogues} dialogues for ElevenLabs")
-                    
-                    # Process queue to generate audio files
+                # Process queue to generate audio files
+                if process_result is None:
                     print(f"🎵 Processing audio generation...")
                     process_result = queue_manager.process_queue(episode_id)
+                
+                if process_result.get('success'):
+                    processed_count = process_result.get('processed', 0)
+                    print(f"✅ Generated {processed_count} audio files")
                     
-                    if process_result.get('success'):
-                        processed_count = process_result.get('processed', 0)
-                        print(f"✅ Generated {processed_count} audio files")
-                        
-                        # Get audio files from process result
-                        generated_files = process_result.get('audio_files', [])
-                        for audio_file in generated_files:
-                            # audio_file is just the filename, add /audio/ prefix
-                            if audio_file:
-                                audio_files.append(f"/audio/{audio_file}")
-                        
-                        # Fallback: check files directly if not in result
-                        if not audio_files:
-                            for i in range(total_dialogues):
-                                audio_filename = f"{episode_id}_dialogue_{i}.mp3"
-                                audio_path = os.path.join(AUDIO_DIR, audio_filename)
-                                if os.path.exists(audio_path):
-                                    audio_files.append(f"/audio/{audio_filename}")
-                    else:
-                        elevenlabs_error = process_result.get('error', 'Processing failed')
-                        print(f"⚠️  Audio processing failed: {elevenlabs_error}")
+                    # Get audio files from process result
+                    generated_files = process_result.get('audio_files', [])
+                    for audio_file in generated_files:
+                        # audio_file is just the filename, add /audio/ prefix
+                        if audio_file:
+                            audio_files.append(f"/audio/{audio_file}")
+                    
+                    # Single stitched file with per-line chapter offsets
+                    if process_result.get('episode_audio'):
+                        episode_audio = f"/audio/{process_result['episode_audio']}"
+                        episode_audio_index = process_result.get('episode_index')
+                    
+                    # Fallback: check files directly if not in result
+                    if not audio_files:
+                        for i in range(total_dialogues):
+                            audio_filename = f"{episode_id}_dialogue_{i}.mp3"
+                            audio_path = os.path.join(AUDIO_DIR, audio_filename)
+                            if os.path.exists(audio_path):
+                                audio_files.append(f"/audio/{audio_filename}")
                 else:
-                    elevenlabs_error = queue_result.get('error', 'Unknown error')
-                    print(f"⚠️  ElevenLabs queue failed: {elevenlabs_error}")
+                    elevenlabs_error = process_result.get('error', 'Processing failed')
+                    print(f"⚠️  Audio processing failed: {elevenlabs_error}")
             else:
-                print("ℹ️  ElevenLabs API key not configured, skipping audio generation")
-        except Exception as e:
-            elevenlabs_error = str(e)
-            print(f"⚠️  ElevenLabs queue failed: {e}")
-            import traceback
-            traceback.print_exc()
+                elevenlabs_error = queue_result.get('error', 'Unknown error')
+                print(f"⚠️  ElevenLabs queue failed: {elevenlabs_error}")
+        else:
+            episode_id = None
+            print("ℹ️  ElevenLabs API key not configured, skipping audio generation")
+    except Exception as e:
+        elevenlabs_error = str(e)
+        print(f"⚠️  ElevenLabs queue failed: {e}")
+        import traceback
+        traceback.print_exc()
+    
+    return {
+        'conversation': result['conversation'],
+        'sponsor': result['sponsor'],
+        'topic': result['topic'],
+        'context_snippet': result['context_used'],
+        'quality': result['quality'],
+        'elevenlabs_queued': elevenlabs_queued,
+        'audio_files': audio_files,
+        'episode_audio': episode_audio,
+        'episode_audio_index': episode_audio_index,
+        'episode_id': episode_id
+    }
+
+
+@app.route('/generate-async', methods=['POST'])
+def generate_podcast_async():
+    """
+    Start generating a podcast episode in the background.
+    Progress is streamed from GET /events/<episode_id>.
+    
+    Request body: same as /generate
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or 'topic' not in data:
+            return jsonify({
+                'error': 'Missing required field: topic'
+            }), 400
+        
+        topic = data['topic']
+        context = data.get('context')
+        sponsor = data.get('sponsor')
+        quality_mode = data.get('quality_mode')
+        
+        if sponsor:
+            from config import AVAILABLE_SPONSORS
+            if sponsor not in AVAILABLE_SPONSORS:
+                return jsonify({
+                    'error': f'Invalid sponsor. Must be one of: {", ".join(AVAILABLE_SPONSORS)}'
+                }), 400
+        
+        if quality_mode and quality_mode not in GENERATION_QUALITY_MODES:
+            return jsonify({
+                'error': f'Invalid quality_mode. Must be one of: {", ".join(GENERATION_QUALITY_MODES)}'
+            }), 400
+        
+        episode_id = f"episode-{uuid.uuid4().hex[:12]}"
+        
+        def worker():
+            def on_event(event_type, event_data):
+                episode_events.publish(episode_id, event_type, event_data)
+            
+            try:
+                on_event('episode_started', {'topic': topic})
+                result = _generate_episode(topic, context, sponsor, episode_id, on_event, quality_mode)
+                on_event('episode_complete', result)
+            except Exception as e:
+                traceback.print_exc()
+                on_event('episode_failed', {'error': str(e), 'type': type(e).__name__})
+        
+        threading.Thread(target=worker, daemon=True).start()
         
         return jsonify({
             'success': True,
-            'data': {
-                'conversation': result['conversation'],
-                'sponsor': result['sponsor'],
-                'topic': result['topic'],
-                'context_snippet': result['context_used'],
-                'elevenlabs_queued': elevenlabs_queued,
-                'audio_files': audio_files,
-                'episode_id': episode_id
-            }
-        })
+            'episode_id': episode_id,
+            'events_url': f"/events/{episode_id}"
+        }), 202
     
     except Exception as e:
         traceback.print_exc()
@@ -164,6 +307,25 @@ def generate_podcast():
         }), 500
 
 
+@app.route('/events/<episode_id>', methods=['GET'])
+def stream_episode_events(episode_id):
+    """
+    Stream an episode's progress as Server-Sent Events.
+    Earlier events are replayed first, so clients may connect at any time.
+    """
+    def stream():
+        for event in episode_events.listen(episode_id):
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    
+    response = Response(stream_with_context(stream()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+    return response
+
+
 @app.route('/memory', methods=['GET'])
 def get_memory():
     """Get current memory state."""
@@ -206,13 +368,113 @@ def get_sponsors():
 
 @app.route('/audio/<path:filename>', methods=['GET'])
 def serve_audio(filename):
-    """Serve audio files."""
+    """
+    Serve audio files, including lines that are still being synthesized.
+    Completed files support Range requests (206), strong content-hash ETags
+    and If-None-Match, with Cache-Control suited to a CDN.
+    """
     try:
-        return send_from_directory(AUDIO_DIR, filename)
+        audio_path = safe_join(AUDIO_DIR, filename)
+        if audio_path and not os.path.exists(audio_path):
+            partial_path = f"{audio_path}{PARTIAL_AUDIO_SUFFIX}"
+            if os.path.exists(partial_path):
+                response = Response(
+                    stream_with_context(_tail_partial_audio(partial_path, audio_path)),
+                    mimetype='audio/mpeg'
+                )
+                # Still growing - never let a cache keep the truncated body
+                response.headers['Cache-Control'] = 'no-store'
+                return response
+        
+        if not audio_path or not os.path.isfile(audio_path):
+            return jsonify({'error': 'Audio file not found'}), 404
+        
+        # conditional=True gives us Range/206 and If-None-Match/304 handling
+        response = send_from_directory(
+            AUDIO_DIR, filename,
+            etag=_audio_etag(audio_path),
+            conditional=True,
+            max_age=AUDIO_CACHE_MAX_AGE
+        )
+        response.headers['Accept-Ranges'] = 'bytes'
+        return response
     except Exception as e:
         return jsonify({'error': str(e)}), 404
 
 
+# Content hashes of served audio, keyed by path and invalidated on change
+_audio_etags = {}
+_audio_etags_lock = threading.Lock()
+
+
+def _audio_etag(path):
+    """Get a strong ETag (SHA-256 of the content) for an audio file."""
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    
+    with _audio_etags_lock:
+        cached = _audio_etags.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    etag = digest.hexdigest()
+    
+    with _audio_etags_lock:
+        _audio_etags[path] = (signature, etag)
+    return etag
+
+
+def _tail_partial_audio(partial_path, audio_path, chunk_size=8192, max_wait=60):
+    """
+    Stream an audio file while ElevenLabs is still writing it.
+    The writer renames the partial file when done; the open handle keeps
+    pointing at the same data, so we read until EOF once the rename happened.
+    """
+    try:
+        f = open(partial_path, 'rb')
+    except FileNotFoundError:
+        # Finished between the existence check and open
+        f = open(audio_path, 'rb')
+    
+    with f:
+        deadline = time.time() + max_wait
+        while time.time() < deadline:
+            chunk = f.read(chunk_size)
+            if chunk:
+                yield chunk
+                continue
+            if not os.path.exists(partial_path):
+                # Writer finished (or gave up) - drain whatever is left
+                remaining = f.read()
+                if remaining:
+                    yield remaining
+                return
+            time.sleep(0.05)
+
+
+def _open_tts_pipeline(episode_id):
+    """
+    Start a streaming TTS pipeline for an episode if ElevenLabs is configured.
+    Returns None when pipelining is disabled or unavailable, in which case the
+    script is queued for audio after generation as before.
+    """
+    from config import ELEVENLABS_API_KEY, ELEVENLABS_PIPELINE
+    
+    if not ELEVENLABS_API_KEY or not ELEVENLABS_PIPELINE:
+        return None
+    
+    try:
+        from elevenlabs_queue import ElevenLabsQueue
+        return ElevenLabsQueue().open_pipeline(episode_id)
+    except Exception as e:
+        print(f"⚠️  Streaming TTS pipeline unavailable, falling back to queue: {e}")
+        return None
+
+
 def generate_topic_worker(sequence_id, topic_index, topic, sponsors, previous_script=None, wait_for_confirmation=False):
     """Worker function to generate a single topic."""
     try:
@@ -246,18 +508,33 @@ def generate_topic_worker(sequence_id, topic_index, topic, sponsors, previous_sc
         else:
             print(f"🎯 [Sequence {sequence_id}] No sponsor provided, will be auto-selected")
         
-        # Generate podcast with previous script as context for continuation
-        result = generator.generate(
-            topic=topic,
-            real_world_context=None,  # Will be scraped
-            force_sponsor=sponsor,
-            previous_script=previous_script,
-            sequence_id=sequence_id,
-            sequence_index=topic_index
-        )
+        # Start text-to-speech while the final script is still streaming
+        tts_pipeline = _open_tts_pipeline(f"episode-{sequence_id}-{topic_index}")
+        
+        # Generate podcast with previous script as context for continuation.
+        # The listener waits on the first topic; later ones are generated ahead
+        # of time, so their Claude calls queue behind interactive requests.
+        priority = PRIORITY_INTERACTIVE if topic_index == 0 else PRIORITY_BATCH
+        try:
+            with claude_priority(priority):
+                result = generator.generate(
+                    topic=topic,
+                    real_world_context=None,  # Will be scraped
+                    force_sponsor=sponsor,
+                    previous_script=previous_script,
+                    sequence_id=sequence_id,
+                    sequence_index=topic_index,
+                    on_line=tts_pipeline.add_line if tts_pipeline else None
+                )
+        except Exception:
+            if tts_pipeline:
+                tts_pipeline.cancel()
+            raise
         
         # Process audio files
         audio_files = []
+        episode_audio = None
+        episode_audio_index = None
         episode_id = None
         
         try:
@@ -265,23 +542,34 @@ def generate_topic_worker(sequence_id, topic_index, topic, sponsors, previous_sc
             from config import ELEVENLABS_API_KEY
             
             if ELEVENLABS_API_KEY:
-                queue_manager = ElevenLabsQueue()
                 episode_id = f"episode-{sequence_id}-{topic_index}"
                 
-                queue_result = queue_manager.queue_dialogues(
-                    result['conversation'],
-                    episode_id
-                )
+                if tts_pipeline:
+                    process_result = tts_pipeline.finish()
+                    queue_result = {
+                        'success': process_result.get('success'),
+                        'total_dialogues': process_result.get('total', 0)
+                    }
+                else:
+                    queue_manager = ElevenLabsQueue()
+                    queue_result = queue_manager.queue_dialogues(
+                        result['conversation'],
+                        episode_id
+                    )
+                    if queue_result.get('success'):
+                        process_result = queue_manager.process_queue(episode_id)
                 
                 if queue_result.get('success'):
-                    process_result = queue_manager.process_queue(episode_id)
-                    
                     if process_result.get('success'):
                         generated_files = process_result.get('audio_files', [])
                         for audio_file in generated_files:
                             if audio_file:
                                 audio_files.append(f"/audio/{audio_file}")
                         
+                        if process_result.get('episode_audio'):
+                            episode_audio = f"/audio/{process_result['episode_audio']}"
+                            episode_audio_index = process_result.get('episode_index')
+                        
                         if not audio_files:
                             for i in range(queue_result.get('total_dialogues', 0)):
                                 audio_filename = f"{episode_id}_dialogue_{i}.mp3"
@@ -299,6 +587,8 @@ def generate_topic_worker(sequence_id, topic_index, topic, sponsors, previous_sc
             'context_snippet': result['context_used'],
             'elevenlabs_queued': len(audio_files) > 0,
             'audio_files': audio_files,
+            'episode_audio': episode_audio,
+            'episode_audio_index': episode_audio_index,
             'episode_id': episode_id
         }
         
@@ -593,6 +883,8 @@ if __name__ == '__main__':
     print("🎙️  Starting EchoDuo API Server...")
     print("📡 Endpoints:")
     print("   POST /generate - Generate podcast")
+    print("   POST /generate-async - Start generating a podcast in the background")
+    print("   GET  /events/<episode_id> - Stream episode progress (SSE)")
     print("   GET  /memory - View memory state")
     print("   POST /memory/clear - Clear memory")
     print("   GET  /sponsors - List available sponsors")
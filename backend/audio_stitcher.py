@@ -0,0 +1,197 @@
+"""
+Episode-level audio stitching.
+Concatenates per-line ElevenLabs mp3 files into one episode file at the MPEG
+frame level (no re-encoding) and writes a sidecar chapter index with the byte
+and time offsets of every dialogue line.
+"""
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+# Bitrates in kbps, indexed by [version_family][layer][bitrate_index]
+# version_family: 1 = MPEG-1, 2 = MPEG-2/2.5
+_BITRATES = {
+    1: {
+        1: [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+        2: [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+        3: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    },
+    2: {
+        1: [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+        2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+        3: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    },
+}
+
+# Sample rates in Hz, indexed by version bits then sample rate index
+_SAMPLE_RATES = {
+    0b11: [44100, 48000, 32000],  # MPEG-1
+    0b10: [22050, 24000, 16000],  # MPEG-2
+    0b00: [11025, 12000, 8000],   # MPEG-2.5
+}
+
+
+def _parse_frame_header(data: bytes, pos: int) -> Optional[Tuple[int, int, int]]:
+    """
+    Parse an MPEG audio frame header.
+
+    Returns:
+        (frame_length, samples_per_frame, sample_rate), or None if not a valid header
+    """
+    if pos + 4 > len(data):
+        return None
+
+    b1, b2 = data[pos + 1], data[pos + 2]
+    if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version_bits = (b1 >> 3) & 0x03
+    layer_bits = (b1 >> 1) & 0x03
+    bitrate_index = (b2 >> 4) & 0x0F
+    sample_rate_index = (b2 >> 2) & 0x03
+    padding = (b2 >> 1) & 0x01
+
+    if version_bits == 0b01 or layer_bits == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    layer = 4 - layer_bits
+    family = 1 if version_bits == 0b11 else 2
+    bitrate = _BITRATES[family][layer][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version_bits][sample_rate_index]
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 2:
+        samples = 1152
+        length = 144 * bitrate // sample_rate + padding
+    else:
+        samples = 1152 if family == 1 else 576
+        length = (144 if family == 1 else 72) * bitrate // sample_rate + padding
+
+    return length, samples, sample_rate
+
+
+def _skip_id3v2(data: bytes) -> int:
+    """Return the offset of the first byte after a leading ID3v2 tag."""
+    if len(data) >= 10 and data[:3] == b'ID3':
+        size = ((data[6] & 0x7F) << 21) | ((data[7] & 0x7F) << 14) | ((data[8] & 0x7F) << 7) | (data[9] & 0x7F)
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def _is_vbr_info_frame(frame: bytes) -> bool:
+    """Detect a Xing/Info/VBRI header frame, which describes only its own file."""
+    head = frame[:64]
+    return b'Xing' in head or b'Info' in head or b'VBRI' in head
+
+
+def extract_frames(data: bytes) -> Tuple[bytes, float]:
+    """
+    Extract the raw audio frames from an mp3 file.
+    Drops ID3 tags and VBR info frames so frames from several files can be
+    concatenated into one valid stream.
+
+    Args:
+        data: Contents of an mp3 file
+
+    Returns:
+        (frame_bytes, duration_seconds)
+    """
+    pos = _skip_id3v2(data)
+    end = len(data)
+    if end - pos >= 128 and data[end - 128:end - 125] == b'TAG':
+        end -= 128
+
+    frames = bytearray()
+    duration = 0.0
+    first = True
+
+    while pos < end:
+        header = _parse_frame_header(data, pos)
+        if not header or pos + header[0] > end:
+            # Lost sync (junk or truncated frame) - scan for the next header
+            pos += 1
+            continue
+
+        length, samples, sample_rate = header
+        frame = data[pos:pos + length]
+        if not (first and _is_vbr_info_frame(frame)):
+            frames += frame
+            duration += samples / sample_rate
+        first = False
+        pos += length
+
+    return bytes(frames), duration
+
+
+def stitch_episode(episode_id: str, lines: List[Dict], audio_dir: str) -> Optional[Dict]:
+    """
+    Concatenate an episode's per-line audio into one file with a chapter index.
+
+    Writes {episode_id}.mp3 and {episode_id}.json into audio_dir.
+
+    Args:
+        episode_id: Episode identifier
+        lines: Per-line results with 'index' and 'audio_file' (relative to audio_dir),
+            in dialogue order
+        audio_dir: Directory containing the audio files
+
+    Returns:
+        Index dict with 'audio_file', 'duration', 'bytes' and 'chapters', or None if
+        there was nothing to stitch
+    """
+    chapters = []
+    byte_offset = 0
+    time_offset = 0.0
+
+    output_filename = f"{episode_id}.mp3"
+    output_path = os.path.join(audio_dir, output_filename)
+    partial_path = f"{output_path}.part"
+
+    with open(partial_path, 'wb') as out:
+        for line in lines:
+            filename = line.get('audio_file')
+            if not filename:
+                continue
+            try:
+                with open(os.path.join(audio_dir, filename), 'rb') as f:
+                    frames, duration = extract_frames(f.read())
+            except OSError:
+                continue
+            if not frames:
+                continue
+
+            out.write(frames)
+            chapters.append({
+                'index': line.get('index'),
+                'source_file': filename,
+                'byte_start': byte_offset,
+                'byte_end': byte_offset + len(frames),
+                'time_start': round(time_offset, 3),
+                'time_end': round(time_offset + duration, 3)
+            })
+            byte_offset += len(frames)
+            time_offset += duration
+
+    if not chapters:
+        os.remove(partial_path)
+        return None
+
+    os.replace(partial_path, output_path)
+
+    index = {
+        'episode_id': episode_id,
+        'audio_file': output_filename,
+        'duration': round(time_offset, 3),
+        'bytes': byte_offset,
+        'chapters': chapters
+    }
+
+    index_path = os.path.join(audio_dir, f"{episode_id}.json")
+    with open(f"{index_path}.part", 'w') as f:
+        json.dump(index, f, indent=2)
+    os.replace(f"{index_path}.part", index_path)
+
+    return index
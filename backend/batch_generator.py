@@ -3,6 +3,7 @@ import json
 import time
 from datetime import datetime
 from podcast_generator import PodcastGenerator
+from claude_scheduler import PRIORITY_BATCH, claude_priority
 import argparse
 
 
@@ -51,11 +52,12 @@ def generate_batch(topics, output_dir='output', delay=2):
         
         try:
             # Generate episode
-            result = generator.generate(
-                topic=topic_data['topic'],
-                real_world_context=topic_data.get('context'),
-                force_sponsor=topic_data.get('sponsor')
-            )
+            with claude_priority(PRIORITY_BATCH):
+                result = generator.generate(
+                    topic=topic_data['topic'],
+                    real_world_context=topic_data.get('context'),
+                    force_sponsor=topic_data.get('sponsor')
+                )
             
             # Add metadata
             result['generated_at'] = datetime.now().isoformat()
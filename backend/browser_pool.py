@@ -0,0 +1,263 @@
+"""
+Process-wide pool of long-lived browsers for scraping.
+Chrome (launched locally) and Lightpanda Cloud (connected over CDP) are started
+once and shared by every scrape in the process, instead of paying a Chromium
+cold start or a CDP WebSocket handshake per URL.
+
+Playwright objects belong to the event loop that created them, so the pool runs
+its own loop on a background thread; callers hand it coroutines with run().
+"""
+import asyncio
+import atexit
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from playwright.async_api import async_playwright
+from resource_filter import get_resource_filter, install_resource_filter
+from config import BROWSER_POOL_MAX_PAGES, BROWSER_POOL_RECYCLE_AFTER, BROWSER_POOL_RETRY_AFTER
+
+CHROME_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+LIGHTPANDA_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+LIGHTPANDA_CDP_URLS = {
+    'eu': "wss://euwest.cloud.lightpanda.io/ws?token={token}",
+    'us': "wss://uswest.cloud.lightpanda.io/ws?token={token}",
+}
+
+
+class _PooledBrowser:
+    """A browser, its shared context and its page accounting."""
+
+    def __init__(self, browser, context):
+        self.browser = browser
+        self.context = context
+        self.created_at = time.time()
+        self.pages_served = 0
+        self.active_pages = 0
+        self.retiring = False
+
+    def is_healthy(self) -> bool:
+        return not self.retiring and self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Long-lived browsers shared across requests and SmartScraper instances.
+    Each browser serves at most max_pages pages at once and is replaced after
+    recycle_after pages (or as soon as it disconnects).
+    """
+
+    def __init__(self, max_pages: int = BROWSER_POOL_MAX_PAGES,
+                 recycle_after: int = BROWSER_POOL_RECYCLE_AFTER,
+                 retry_after: float = BROWSER_POOL_RETRY_AFTER):
+        """
+        Initialize the pool and start its event loop thread.
+
+        Args:
+            max_pages: Maximum concurrently open pages per browser
+            recycle_after: Replace a browser after it has served this many pages
+            retry_after: Seconds to wait before retrying a browser that failed to start
+        """
+        self.max_pages = max_pages
+        self.recycle_after = recycle_after
+        self.retry_after = retry_after
+
+        self._playwright = None
+        self._browsers: Dict[str, _PooledBrowser] = {}
+        self._failed_until: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._slot_freed: Optional[asyncio.Condition] = None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='browser-pool', daemon=True)
+        self._thread.start()
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """
+        Run a coroutine on the pool's event loop and wait for its result.
+
+        Args:
+            coro: Coroutine that may use page()
+            timeout: Optional seconds to wait before cancelling it
+
+        Returns:
+            The coroutine's result
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except Exception:
+            future.cancel()
+            raise
+
+    @asynccontextmanager
+    async def page(self, kind: str = 'chrome', **options):
+        """
+        Borrow a fresh page from a pooled browser (use inside run()).
+
+        Args:
+            kind: 'chrome' or 'lightpanda'
+            **options: For 'lightpanda', api_token and region
+
+        Yields:
+            A new Playwright page, closed when the block exits
+        """
+        pooled = await self._acquire(kind, **options)
+        page = None
+        try:
+            page = await pooled.context.new_page()
+            yield page
+        finally:
+            if page:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            await self._release(pooled)
+
+    async def _acquire(self, kind: str, **options) -> _PooledBrowser:
+        name = kind if kind == 'chrome' else f"{kind}-{options.get('region', 'eu')}"
+        if self._slot_freed is None:
+            self._slot_freed = asyncio.Condition()
+
+        while True:
+            # Started outside the condition so a slow CDP connect doesn't block other browsers
+            pooled = await self._get_browser(name, kind, **options)
+            async with self._slot_freed:
+                if not pooled.is_healthy():
+                    continue
+                if pooled.active_pages >= self.max_pages:
+                    await self._slot_freed.wait()
+                    continue
+
+                pooled.active_pages += 1
+                pooled.pages_served += 1
+                if pooled.pages_served >= self.recycle_after:
+                    # Finish the pages already open, then close; new pages get a fresh browser
+                    pooled.retiring = True
+                return pooled
+
+    async def _release(self, pooled: _PooledBrowser):
+        async with self._slot_freed:
+            pooled.active_pages -= 1
+            self._slot_freed.notify_all()
+        if pooled.active_pages == 0 and (pooled.retiring or not pooled.browser.is_connected()):
+            await self._close_browser(pooled)
+
+    async def _get_browser(self, name: str, kind: str, **options) -> _PooledBrowser:
+        """Get a healthy browser for a name, starting a replacement if needed."""
+        pooled = self._browsers.get(name)
+        if pooled and pooled.is_healthy():
+            return pooled
+
+        if time.time() < self._failed_until.get(name, 0):
+            raise RuntimeError(f"{name} browser unavailable (recently failed to start)")
+
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            pooled = self._browsers.get(name)
+            if pooled and pooled.is_healthy():
+                return pooled
+
+            if pooled and pooled.active_pages == 0:
+                await self._close_browser(pooled)
+
+            try:
+                pooled = await self._start_browser(kind, **options)
+            except Exception:
+                self._failed_until[name] = time.time() + self.retry_after
+                raise
+
+            self._browsers[name] = pooled
+            return pooled
+
+    async def _start_browser(self, kind: str, api_token: Optional[str] = None,
+                             region: str = 'eu') -> _PooledBrowser:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+        if kind == 'chrome':
+            print(f"      → Launching pooled Chrome...")
+            browser = await self._playwright.chromium.launch(headless=True)
+            context = await browser.new_context(user_agent=CHROME_USER_AGENT)
+        elif kind == 'lightpanda':
+            if region not in LIGHTPANDA_CDP_URLS:
+                raise ValueError(f"Invalid region: {region}. Must be 'eu' or 'us'")
+            print(f"      → Connecting to Lightpanda Cloud ({region.upper()}) via CDP...")
+            browser = await self._playwright.chromium.connect_over_cdp(
+                LIGHTPANDA_CDP_URLS[region].format(token=api_token),
+                timeout=30000
+            )
+            contexts = browser.contexts
+            context = contexts[0] if contexts else await browser.new_context(user_agent=LIGHTPANDA_USER_AGENT)
+        else:
+            raise ValueError(f"Unknown browser kind: {kind}")
+
+        try:
+            await install_resource_filter(context)
+        except Exception as e:
+            # Not every CDP backend supports request interception
+            print(f"      ⚠️  Request blocking unavailable for {kind}: {str(e)[:60]}")
+
+        return _PooledBrowser(browser, context)
+
+    async def _close_browser(self, pooled: _PooledBrowser):
+        for name, current in list(self._browsers.items()):
+            if current is pooled:
+                del self._browsers[name]
+        try:
+            await pooled.context.close()
+            await pooled.browser.close()
+        except Exception:
+            pass
+
+    def health(self) -> Dict:
+        """Get the state of every pooled browser and the request blocking counters."""
+        now = time.time()
+        resource_filter = get_resource_filter()
+        browsers = {
+            name: {
+                'connected': pooled.browser.is_connected(),
+                'retiring': pooled.retiring,
+                'active_pages': pooled.active_pages,
+                'pages_served': pooled.pages_served,
+                'age_seconds': round(now - pooled.created_at, 1)
+            }
+            for name, pooled in list(self._browsers.items())
+        }
+        return {
+            'browsers': browsers,
+            'resource_filter': resource_filter.stats() if resource_filter else None
+        }
+
+    def close(self):
+        """Close all browsers and stop the event loop."""
+        async def _close():
+            for pooled in list(self._browsers.values()):
+                await self._close_browser(pooled)
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+
+        if self._loop.is_running():
+            try:
+                self.run(_close(), timeout=10)
+            except Exception:
+                pass
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Get the process-wide browser pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BrowserPool()
+                atexit.register(_pool.close)
+    return _pool
@@ -0,0 +1,144 @@
+"""
+Memoization of deterministic Claude calls.
+Short classification calls (tags, sponsor choice, scrape targets) see the same
+inputs again and again; their responses are cached in a process LRU and in
+Redis (shared across workers), keyed by everything that affects the output.
+Call sites opt in per call via ClaudeClient.generate(memoize=True).
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+import redis
+from config import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD, REDIS_VERBOSE_LOGGING,
+    CLAUDE_MEMO_ENABLED, CLAUDE_MEMO_TTL, CLAUDE_MEMO_LOCAL_ENTRIES
+)
+
+
+def _strip_cache_control(value):
+    """Drop prompt-caching markers, which don't change the response."""
+    if isinstance(value, list):
+        return [_strip_cache_control(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _strip_cache_control(v) for k, v in value.items() if k != 'cache_control'}
+    return value
+
+
+def response_key(message_params: Dict) -> str:
+    """Hash the model, system prompt, messages and sampling parameters of a request."""
+    canonical = json.dumps(_strip_cache_control(message_params), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ClaudeResponseCache:
+    """
+    Two-tier (process LRU + Redis) cache of Claude responses.
+    Falls back to the local tier alone when Redis is not available.
+    """
+
+    KEY_PREFIX = "claude:response:"
+
+    def __init__(self, redis_client=None, local_entries: int = CLAUDE_MEMO_LOCAL_ENTRIES):
+        """
+        Initialize the cache.
+
+        Args:
+            redis_client: Optional existing Redis client to reuse
+            local_entries: Maximum responses kept in the in-process tier
+        """
+        self.local_entries = local_entries
+        self._local: OrderedDict = OrderedDict()  # key -> (expires_at, response)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+        self.redis_client = redis_client
+        if self.redis_client is None:
+            try:
+                self.redis_client = redis.Redis(
+                    host=REDIS_HOST,
+                    port=REDIS_PORT,
+                    db=REDIS_DB,
+                    password=REDIS_PASSWORD,
+                    decode_responses=True
+                )
+                self.redis_client.ping()
+            except Exception as e:
+                if REDIS_VERBOSE_LOGGING:
+                    print(f"⚠️  Redis not available for Claude response cache, using local cache only: {e}")
+                self.redis_client = None
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a response.
+
+        Returns:
+            Stored response dict ('text', 'model', 'stop_reason'), or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            item = self._local.get(key)
+            if item and item[0] > now:
+                self._local.move_to_end(key)
+                self.stats['hits'] += 1
+                return item[1]
+
+        if self.redis_client:
+            try:
+                payload = self.redis_client.get(f"{self.KEY_PREFIX}{key}")
+                if payload:
+                    response = json.loads(payload)
+                    ttl = self.redis_client.ttl(f"{self.KEY_PREFIX}{key}")
+                    self._remember(key, response, ttl if ttl and ttl > 0 else CLAUDE_MEMO_TTL)
+                    with self._lock:
+                        self.stats['hits'] += 1
+                    return response
+            except Exception as e:
+                if REDIS_VERBOSE_LOGGING:
+                    print(f"⚠️  Claude response cache read failed: {e}")
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def set(self, key: str, response: Dict, ttl: int = CLAUDE_MEMO_TTL):
+        """
+        Store a response.
+
+        Args:
+            key: Key from response_key()
+            response: Dict with 'text', 'model' and 'stop_reason'
+            ttl: Seconds to keep it
+        """
+        self._remember(key, response, ttl)
+        if self.redis_client:
+            try:
+                self.redis_client.set(f"{self.KEY_PREFIX}{key}", json.dumps(response), ex=int(ttl))
+            except Exception as e:
+                if REDIS_VERBOSE_LOGGING:
+                    print(f"⚠️  Claude response cache write failed: {e}")
+
+    def _remember(self, key: str, response: Dict, ttl: float):
+        with self._lock:
+            self._local[key] = (time.time() + ttl, response)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_entries:
+                self._local.popitem(last=False)
+
+
+_cache: Optional[ClaudeResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ClaudeResponseCache]:
+    """Get the process-wide Claude response cache, or None if memoization is disabled."""
+    global _cache
+    if not CLAUDE_MEMO_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ClaudeResponseCache()
+    return _cache
@@ -1,7 +1,100 @@
 """Anthropic Claude API client for podcast generation."""
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import anthropic
-from typing import Optional
-from config import ANTHROPIC_API_KEY, MODEL_NAME, MAX_TOKENS, DEFAULT_TEMPERATURE
+from typing import Callable, Dict, List, Optional, Union
+from config import (
+    ANTHROPIC_API_KEY, MODEL_NAME, MAX_TOKENS, DEFAULT_TEMPERATURE, CLAUDE_PROMPT_CACHING, CLAUDE_MEMO_TTL,
+    CLAUDE_MAX_CONCURRENCY, CLAUDE_CACHE_MIN_TOKENS
+)
+from claude_cache import get_response_cache, response_key
+from claude_scheduler import get_claude_scheduler
+from retry_policy import DEFAULT_RETRY, RetryPolicy, time_left
+
+# A prompt is plain text or a list of segments (text, or blocks from cacheable())
+Prompt = Union[str, List[Union[str, Dict]]]
+
+# Rough characters per token, on the low side so prefixes near the minimum keep their marker
+_CHARS_PER_TOKEN = 3
+
+
+def cacheable(text: str) -> Dict:
+    """
+    Mark a prompt segment as a cache breakpoint.
+    Everything up to and including this segment is cached by Anthropic and
+    reused by later calls that start with the same prefix, so put the stable
+    text (instructions, rules, examples) in it and the per-call text after it.
+    """
+    return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+
+def _content_blocks(prompt: Prompt, cache: bool = False) -> Union[str, List[Dict]]:
+    """Convert a prompt to API content, optionally caching the whole of it."""
+    if isinstance(prompt, str):
+        if cache and CLAUDE_PROMPT_CACHING:
+            return [cacheable(prompt)]
+        return prompt
+    
+    blocks = []
+    for segment in prompt:
+        if isinstance(segment, str):
+            blocks.append({"type": "text", "text": segment})
+        elif CLAUDE_PROMPT_CACHING:
+            blocks.append(segment)
+        else:
+            blocks.append({k: v for k, v in segment.items() if k != 'cache_control'})
+    return blocks
+
+
+def _drop_short_breakpoints(message_params: Dict) -> Dict:
+    """
+    Remove cache breakpoints whose prefix is below CLAUDE_CACHE_MIN_TOKENS.
+    
+    Anthropic silently ignores them, so sending them only suggests caching
+    that never happens. The prefix of a breakpoint is everything before it:
+    the system prompt, then the message content in order. Blocks that lose
+    their marker are copied, so the caller's cacheable() dicts are untouched.
+    """
+    min_chars = CLAUDE_CACHE_MIN_TOKENS * _CHARS_PER_TOKEN
+    prefix_chars = 0
+    
+    def strip(content):
+        nonlocal prefix_chars
+        if not isinstance(content, list):
+            prefix_chars += len(content)
+            return content
+        blocks = []
+        for block in content:
+            prefix_chars += len(block.get('text', ''))
+            if 'cache_control' in block and prefix_chars < min_chars:
+                block = {k: v for k, v in block.items() if k != 'cache_control'}
+            blocks.append(block)
+        return blocks
+    
+    if 'system' in message_params:
+        message_params['system'] = strip(message_params['system'])
+    message_params['messages'] = [
+        dict(message, content=strip(message['content'])) for message in message_params['messages']
+    ]
+    return message_params
+
+
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_pool_lock = threading.Lock()
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    """Threads that run hedged sync requests (the original and its duplicate)."""
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _hedge_pool_lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(max_workers=CLAUDE_MAX_CONCURRENCY * 2,
+                                                 thread_name_prefix='claude-hedge')
+    return _hedge_pool
 
 
 class ClaudeClient:
@@ -20,48 +113,208 @@ class ClaudeClient:
                 "ANTHROPIC_API_KEY not found. Please set it in your .env file or pass it directly."
             )
         
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        # Retries are done here (see _retry_delay) so 429s reach the shared scheduler
+        # and waits respect stage deadlines
+        self.client = anthropic.Anthropic(api_key=self.api_key, max_retries=0)
         self.model_name = MODEL_NAME
+        self.scheduler = get_claude_scheduler()
+        
+        # Token usage summed over all calls made through this client
+        self.usage_totals = {
+            'calls': 0, 'input_tokens': 0, 'output_tokens': 0,
+            'cache_read_input_tokens': 0, 'cache_creation_input_tokens': 0
+        }
+        self._usage_lock = threading.Lock()
+    
+    def _message_params(self, prompt: Prompt, system_prompt: Optional[Prompt], max_tokens: int,
+                        temperature: float, cache_system: bool) -> Dict:
+        message_params = {
+            "model": self.model_name,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": _content_blocks(prompt)
+                }
+            ]
+        }
+        
+        if system_prompt:
+            message_params["system"] = _content_blocks(system_prompt, cache=cache_system)
+        
+        return _drop_short_breakpoints(message_params)
+    
+    def _retry_delay(self, error: Exception, attempt: int, policy: RetryPolicy) -> Optional[float]:
+        """
+        Decide whether a failed call is retried.
+        
+        Returns:
+            Seconds to sleep before retrying, or None to give up
+        """
+        if isinstance(error, anthropic.RateLimitError):
+            # The scheduler holds this and every other call back until the pause ends
+            pause = self.scheduler.note_rate_limited(error.response.headers, fallback_delay=policy.backoff(attempt))
+            return None if policy.next_delay(error, attempt, min_delay=pause) is None else 0.0
+        return policy.next_delay(error, attempt)
+    
+    @staticmethod
+    def _request_options() -> Dict:
+        """Per-request options: inside a stage deadline, time out when the stage would."""
+        remaining = time_left()
+        return {} if remaining is None else {'timeout': remaining}
+    
+    def _create(self, message_params: Dict, policy: RetryPolicy = DEFAULT_RETRY):
+        """Send a request through the shared scheduler, retrying transient failures."""
+        attempt = 0
+        while True:
+            try:
+                with self.scheduler.slot(timeout=time_left()):
+                    raw = self.client.messages.with_raw_response.create(**message_params, **self._request_options())
+                self.scheduler.observe(raw.headers)
+                return raw.parse()
+            except anthropic.APIError as e:
+                delay = self._retry_delay(e, attempt, policy)
+                if delay is None:
+                    raise
+                attempt += 1
+                print(f"🔁 Claude call failed ({type(e).__name__}), retry {attempt}/{policy.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+    
+    def _create_hedged(self, message_params: Dict, policy: RetryPolicy, hedge_after: float):
+        """
+        Send a request and, if it hasn't answered within hedge_after seconds,
+        an identical second one; the first success wins.
+        
+        The losing request is left to finish in the background (the sync SDK
+        can't cancel it) and its result is discarded.
+        """
+        pool = _get_hedge_pool()
+        # Each request runs in a copy of the caller's context (priority, deadline)
+        first = pool.submit(contextvars.copy_context().run, self._create, message_params, policy)
+        done, _ = wait([first], timeout=hedge_after)
+        if done or not self.scheduler.has_capacity():
+            # Answered in time, or hedging would only add load to a busy/limited API
+            return first.result()
+        
+        print(f"🪞 Claude call slower than {hedge_after:.1f}s, sending a hedged duplicate")
+        second = pool.submit(contextvars.copy_context().run, self._create, message_params, policy)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = error or e
+        raise error
+    
+    def _record_usage(self, usage) -> Dict:
+        """Convert an API usage object to a dict and add it to the running totals."""
+        usage_dict = {
+            'input_tokens': getattr(usage, 'input_tokens', 0) or 0,
+            'output_tokens': getattr(usage, 'output_tokens', 0) or 0,
+            # Tokens served from / written to the prompt cache (billed apart from input_tokens)
+            'cache_read_input_tokens': getattr(usage, 'cache_read_input_tokens', 0) or 0,
+            'cache_creation_input_tokens': getattr(usage, 'cache_creation_input_tokens', 0) or 0
+        }
+        with self._usage_lock:
+            self.usage_totals['calls'] += 1
+            for key, value in usage_dict.items():
+                self.usage_totals[key] += value
+        return usage_dict
     
     def generate(
         self, 
-        prompt: str, 
-        system_prompt: Optional[str] = None,
+        prompt: Prompt, 
+        system_prompt: Optional[Prompt] = None,
         max_tokens: int = MAX_TOKENS,
-        temperature: float = DEFAULT_TEMPERATURE
+        temperature: float = DEFAULT_TEMPERATURE,
+        cache_system: bool = False,
+        memoize: bool = False,
+        memoize_ttl: int = CLAUDE_MEMO_TTL,
+        retry: RetryPolicy = DEFAULT_RETRY,
+        hedge_after: Optional[float] = None,
+        validate: Optional[Callable[[str], bool]] = None
     ) -> str:
         """
         Generate text using Claude.
         
         Args:
-            prompt: The user prompt
+            prompt: The user prompt (text, or segments with cacheable() prefixes)
             system_prompt: Optional system prompt to set context
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature (0.0-1.0)
+            cache_system: Cache the system prompt (for long prompts that never change)
+            memoize: Reuse an earlier response to the identical request (for
+                short, near-deterministic calls whose inputs repeat)
+            memoize_ttl: Seconds a memoized response is reused
+            validate: With memoize, a check the response text must pass to be
+                stored or reused (e.g. that it parses), so a bad reply isn't
+                replayed for the whole TTL
+            retry: Retry policy for transient failures
+            hedge_after: Send a duplicate request if there's no answer after this
+                many seconds (for short calls with a long latency tail)
         
         Returns:
             Generated text response
         """
+        return self.generate_with_metadata(
+            prompt, system_prompt, max_tokens, temperature, cache_system, memoize, memoize_ttl,
+            retry, hedge_after, validate
+        )['text']
+    
+    def generate_with_metadata(
+        self,
+        prompt: Prompt,
+        system_prompt: Optional[Prompt] = None,
+        max_tokens: int = MAX_TOKENS,
+        temperature: float = DEFAULT_TEMPERATURE,
+        cache_system: bool = False,
+        memoize: bool = False,
+        memoize_ttl: int = CLAUDE_MEMO_TTL,
+        retry: RetryPolicy = DEFAULT_RETRY,
+        hedge_after: Optional[float] = None,
+        validate: Optional[Callable[[str], bool]] = None
+    ) -> Dict:
+        """
+        Generate text using Claude and return it with response metadata.
+        
+        Args:
+            Same as generate()
+        
+        Returns:
+            Dict with 'text', 'model', 'stop_reason', 'usage' (input, output,
+            cache read and cache write token counts) and 'memoized' (True if
+            served from the response cache without calling the API)
+        """
         try:
-            message_params = {
-                "model": self.model_name,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            }
+            message_params = self._message_params(prompt, system_prompt, max_tokens, temperature, cache_system)
             
-            if system_prompt:
-                message_params["system"] = system_prompt
+            response_cache = get_response_cache() if memoize else None
+            if response_cache:
+                key = response_key(message_params)
+                cached = response_cache.get(key)
+                if cached and (validate is None or validate(cached['text'])):
+                    return dict(cached, usage=None, memoized=True)
             
-            response = self.client.messages.create(**message_params)
+            if hedge_after is not None:
+                response = self._create_hedged(message_params, retry, hedge_after)
+            else:
+                response = self._create(message_params, retry)
             
             # Extract text from response
-            return response.content[0].text
+            result = {
+                'text': response.content[0].text,
+                'model': response.model,
+                'stop_reason': response.stop_reason
+            }
+            if (response_cache and result['text'] and response.stop_reason != 'max_tokens'
+                    and (validate is None or validate(result['text']))):
+                response_cache.set(key, result, ttl=memoize_ttl)
+            
+            return dict(result, usage=self._record_usage(response.usage), memoized=False)
             
         except anthropic.APIError as e:
             print(f"Anthropic API Error: {e}")
@@ -72,42 +325,59 @@ class ClaudeClient:
     
     def generate_streaming(
         self,
-        prompt: str,
-        system_prompt: Optional[str] = None,
+        prompt: Prompt,
+        system_prompt: Optional[Prompt] = None,
         max_tokens: int = MAX_TOKENS,
-        temperature: float = DEFAULT_TEMPERATURE
+        temperature: float = DEFAULT_TEMPERATURE,
+        cache_system: bool = False,
+        metadata: Optional[Dict] = None,
+        retry: RetryPolicy = DEFAULT_RETRY
     ):
         """
         Generate text using Claude with streaming.
         
         Args:
-            prompt: The user prompt
+            prompt: The user prompt (text, or segments with cacheable() prefixes)
             system_prompt: Optional system prompt
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature
+            cache_system: Cache the system prompt (for long prompts that never change)
+            metadata: Optional dict filled with 'model', 'stop_reason' and 'usage'
+                once the stream finishes
+            retry: Retry policy for failures before the first chunk arrives
         
         Yields:
             Text chunks as they arrive
         """
         try:
-            message_params = {
-                "model": self.model_name,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            }
+            message_params = self._message_params(prompt, system_prompt, max_tokens, temperature, cache_system)
             
-            if system_prompt:
-                message_params["system"] = system_prompt
+            attempt = 0
+            started = False
+            while True:
+                try:
+                    with self.scheduler.slot(timeout=time_left()):
+                        with self.client.messages.stream(**message_params, **self._request_options()) as stream:
+                            self.scheduler.observe(stream.response.headers)
+                            for text in stream.text_stream:
+                                started = True
+                                yield text
+                            
+                            final = stream.get_final_message()
+                    break
+                except anthropic.APIError as e:
+                    # Text already handed out can't be taken back, so only failures
+                    # before the first chunk are retried
+                    delay = None if started else self._retry_delay(e, attempt, retry)
+                    if delay is None:
+                        raise
+                    attempt += 1
+                    print(f"🔁 Claude stream failed ({type(e).__name__}), retry {attempt}/{retry.max_retries} in {delay:.1f}s")
+                    time.sleep(delay)
             
-            with self.client.messages.stream(**message_params) as stream:
-                for text in stream.text_stream:
-                    yield text
+            usage = self._record_usage(final.usage)
+            if metadata is not None:
+                metadata.update(model=final.model, stop_reason=final.stop_reason, usage=usage)
                     
         except anthropic.APIError as e:
             print(f"Anthropic API Error: {e}")
@@ -117,3 +387,174 @@ class ClaudeClient:
             raise
 
 
+class AsyncClaudeClient(ClaudeClient):
+    """
+    Async variant of ClaudeClient built on anthropic.AsyncAnthropic.
+    Calls wait for a slot from the same process-wide scheduler as the sync
+    client, without tying up a thread while queued or in flight.
+    """
+    
+    def __init__(self, api_key: Optional[str] = None):
+        """
+        Initialize async Claude client.
+        
+        Args:
+            api_key: Optional API key. Uses ANTHROPIC_API_KEY from env if not provided.
+        """
+        super().__init__(api_key)
+        self.client = anthropic.AsyncAnthropic(api_key=self.api_key, max_retries=0)
+    
+    async def _create(self, message_params: Dict, policy: RetryPolicy = DEFAULT_RETRY):
+        """Send a request through the shared scheduler, retrying transient failures."""
+        attempt = 0
+        while True:
+            try:
+                async with self.scheduler.async_slot(timeout=time_left()):
+                    raw = await self.client.messages.with_raw_response.create(**message_params, **self._request_options())
+                self.scheduler.observe(raw.headers)
+                return raw.parse()
+            except anthropic.APIError as e:
+                delay = self._retry_delay(e, attempt, policy)
+                if delay is None:
+                    raise
+                attempt += 1
+                print(f"🔁 Claude call failed ({type(e).__name__}), retry {attempt}/{policy.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+    
+    async def _create_hedged(self, message_params: Dict, policy: RetryPolicy, hedge_after: float):
+        """Like ClaudeClient._create_hedged, but the losing request is cancelled."""
+        first = asyncio.ensure_future(self._create(message_params, policy))
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if done or not self.scheduler.has_capacity():
+            return await first
+        
+        print(f"🪞 Claude call slower than {hedge_after:.1f}s, sending a hedged duplicate")
+        pending = {first, asyncio.ensure_future(self._create(message_params, policy))}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return task.result()
+                error = error or task.exception()
+        raise error
+    
+    async def generate(
+        self,
+        prompt: Prompt,
+        system_prompt: Optional[Prompt] = None,
+        max_tokens: int = MAX_TOKENS,
+        temperature: float = DEFAULT_TEMPERATURE,
+        cache_system: bool = False,
+        memoize: bool = False,
+        memoize_ttl: int = CLAUDE_MEMO_TTL,
+        retry: RetryPolicy = DEFAULT_RETRY,
+        hedge_after: Optional[float] = None,
+        validate: Optional[Callable[[str], bool]] = None
+    ) -> str:
+        """Generate text using Claude (see ClaudeClient.generate)."""
+        result = await self.generate_with_metadata(
+            prompt, system_prompt, max_tokens, temperature, cache_system, memoize, memoize_ttl,
+            retry, hedge_after, validate
+        )
+        return result['text']
+    
+    async def generate_with_metadata(
+        self,
+        prompt: Prompt,
+        system_prompt: Optional[Prompt] = None,
+        max_tokens: int = MAX_TOKENS,
+        temperature: float = DEFAULT_TEMPERATURE,
+        cache_system: bool = False,
+        memoize: bool = False,
+        memoize_ttl: int = CLAUDE_MEMO_TTL,
+        retry: RetryPolicy = DEFAULT_RETRY,
+        hedge_after: Optional[float] = None,
+        validate: Optional[Callable[[str], bool]] = None
+    ) -> Dict:
+        """Generate text using Claude and return it with response metadata (see ClaudeClient.generate_with_metadata)."""
+        try:
+            message_params = self._message_params(prompt, system_prompt, max_tokens, temperature, cache_system)
+            
+            response_cache = get_response_cache() if memoize else None
+            if response_cache:
+                key = response_key(message_params)
+                cached = response_cache.get(key)
+                if cached and (validate is None or validate(cached['text'])):
+                    return dict(cached, usage=None, memoized=True)
+            
+            if hedge_after is not None:
+                response = await self._create_hedged(message_params, retry, hedge_after)
+            else:
+                response = await self._create(message_params, retry)
+            
+            result = {
+                'text': response.content[0].text,
+                'model': response.model,
+                'stop_reason': response.stop_reason
+            }
+            if (response_cache and result['text'] and response.stop_reason != 'max_tokens'
+                    and (validate is None or validate(result['text']))):
+                response_cache.set(key, result, ttl=memoize_ttl)
+            
+            return dict(result, usage=self._record_usage(response.usage), memoized=False)
+            
+        except anthropic.APIError as e:
+            print(f"Anthropic API Error: {e}")
+            raise
+        except Exception as e:
+            print(f"Error calling Claude: {e}")
+            raise
+    
+    async def generate_streaming(
+        self,
+        prompt: Prompt,
+        system_prompt: Optional[Prompt] = None,
+        max_tokens: int = MAX_TOKENS,
+        temperature: float = DEFAULT_TEMPERATURE,
+        cache_system: bool = False,
+        metadata: Optional[Dict] = None,
+        retry: RetryPolicy = DEFAULT_RETRY
+    ):
+        """
+        Generate text using Claude with streaming (see ClaudeClient.generate_streaming).
+        
+        Yields:
+            Text chunks as they arrive
+        """
+        try:
+            message_params = self._message_params(prompt, system_prompt, max_tokens, temperature, cache_system)
+            
+            attempt = 0
+            started = False
+            while True:
+                try:
+                    async with self.scheduler.async_slot(timeout=time_left()):
+                        async with self.client.messages.stream(**message_params, **self._request_options()) as stream:
+                            self.scheduler.observe(stream.response.headers)
+                            async for text in stream.text_stream:
+                                started = True
+                                yield text
+                            
+                            final = await stream.get_final_message()
+                    break
+                except anthropic.APIError as e:
+                    delay = None if started else self._retry_delay(e, attempt, retry)
+                    if delay is None:
+                        raise
+                    attempt += 1
+                    print(f"🔁 Claude stream failed ({type(e).__name__}), retry {attempt}/{retry.max_retries} in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+            
+            usage = self._record_usage(final.usage)
+            if metadata is not None:
+                metadata.update(model=final.model, stop_reason=final.stop_reason, usage=usage)
+                
+        except anthropic.APIError as e:
+            print(f"Anthropic API Error: {e}")
+            raise
+        except Exception as e:
+            print(f"Error in streaming: {e}")
+            raise
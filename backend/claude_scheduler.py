@@ -0,0 +1,287 @@
+"""
+Process-wide admission control for Claude API calls.
+Every call, from the sync and the async client, from any thread or event
+loop, takes a slot from one scheduler. Waiting calls are admitted in priority
+order (interactive /generate before batch and sequence jobs). The scheduler
+reads Anthropic's rate-limit response headers: when a budget runs low, or a
+429 arrives, it pauses admission until the reset time and halves its
+concurrency. It then grows concurrency back one slot at a time as calls
+succeed.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+from config import CLAUDE_MAX_CONCURRENCY, CLAUDE_RATELIMIT_MIN_REQUESTS, CLAUDE_RATELIMIT_MIN_TOKENS
+from retry_policy import DeadlineExceeded
+
+# Lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+_priority: contextvars.ContextVar = contextvars.ContextVar('claude_priority', default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def claude_priority(priority: int):
+    """Run the enclosed Claude calls (in this thread/task and its step graphs) at a priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    """Get the priority Claude calls made here are queued at."""
+    return _priority.get()
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """Parse an RFC 3339 rate-limit reset header into a Unix timestamp."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+class _Waiter:
+    __slots__ = ('wake', 'granted', 'cancelled')
+
+    def __init__(self, wake):
+        self.wake = wake
+        self.granted = False
+        self.cancelled = False
+
+
+class ClaudeScheduler:
+    """Priority-ordered, rate-limit-aware concurrency limiter for Claude calls."""
+
+    def __init__(self, max_concurrency: int = CLAUDE_MAX_CONCURRENCY,
+                 min_requests: int = CLAUDE_RATELIMIT_MIN_REQUESTS,
+                 min_tokens: int = CLAUDE_RATELIMIT_MIN_TOKENS):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Most Claude calls in flight at once
+            min_requests: Pause when fewer requests than this remain in the rate-limit window
+            min_tokens: Pause when fewer tokens than this remain in the rate-limit window
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency  # Current (adaptive) concurrency
+        self.min_requests = min_requests
+        self.min_tokens = min_tokens
+        self.active = 0
+        self.paused_until = 0.0
+        self.stats = {'admitted': 0, 'rate_limited': 0, 'pauses': 0, 'max_queued': 0}
+        self._waiters = []  # Heap of (priority, seq, waiter)
+        self._seq = itertools.count()
+        self._successes = 0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    # --- Admission -------------------------------------------------------
+
+    def _enqueue(self, priority: int, waiter: _Waiter):
+        with self._lock:
+            heapq.heappush(self._waiters, (priority, next(self._seq), waiter))
+            self.stats['max_queued'] = max(self.stats['max_queued'], len(self._waiters))
+            self._dispatch()
+
+    def _dispatch(self):
+        """Admit waiters while slots are free and we're not paused. Caller holds the lock."""
+        now = time.time()
+        if now < self.paused_until:
+            if self._waiters and self._timer is None:
+                self._timer = threading.Timer(self.paused_until - now, self._resume)
+                self._timer.daemon = True
+                self._timer.start()
+            return
+
+        while self._waiters and self.active < self.limit:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.cancelled:
+                continue
+            waiter.granted = True
+            self.active += 1
+            self.stats['admitted'] += 1
+            waiter.wake()
+
+    def _resume(self):
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+    def _abandon(self, waiter: _Waiter):
+        """Withdraw a waiter that gave up, returning its slot if it was granted meanwhile."""
+        with self._lock:
+            granted = waiter.granted
+            waiter.cancelled = True
+        if granted:
+            self.release()
+
+    def acquire(self, priority: Optional[int] = None, timeout: Optional[float] = None):
+        """
+        Block the calling thread until a slot is free.
+
+        Raises:
+            DeadlineExceeded: If no slot was free within timeout seconds
+        """
+        event = threading.Event()
+        waiter = _Waiter(event.set)
+        self._enqueue(current_priority() if priority is None else priority, waiter)
+        if not event.wait(timeout):
+            self._abandon(waiter)
+            raise DeadlineExceeded("Timed out waiting for a Claude call slot")
+
+    async def acquire_async(self, priority: Optional[int] = None, timeout: Optional[float] = None):
+        """
+        Wait (without blocking the event loop) until a slot is free.
+
+        Raises:
+            DeadlineExceeded: If no slot was free within timeout seconds
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = _Waiter(wake)
+        self._enqueue(current_priority() if priority is None else priority, waiter)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            raise DeadlineExceeded("Timed out waiting for a Claude call slot")
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+    def release(self):
+        """Return a slot."""
+        with self._lock:
+            self.active -= 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, priority: Optional[int] = None, timeout: Optional[float] = None):
+        """Hold a slot for the duration of a (sync) Claude call."""
+        self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def async_slot(self, priority: Optional[int] = None, timeout: Optional[float] = None):
+        """Hold a slot for the duration of an async Claude call."""
+        await self.acquire_async(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def has_capacity(self) -> bool:
+        """Check whether a new call would start right away (free slot, no queue, not paused)."""
+        with self._lock:
+            return (self.active < self.limit and time.time() >= self.paused_until
+                    and not any(not w.cancelled for _, _, w in self._waiters))
+
+    # --- Rate-limit feedback --------------------------------------------
+
+    def observe(self, headers):
+        """
+        Learn from a successful response's rate-limit headers.
+
+        Pauses admission until the window resets when the remaining request or
+        token budget is low, and grows concurrency back after a run of successes.
+        """
+        pause_until = None
+        for budget, minimum in (('requests', self.min_requests), ('tokens', self.min_tokens),
+                                ('input-tokens', self.min_tokens), ('output-tokens', 0)):
+            remaining = headers.get(f'anthropic-ratelimit-{budget}-remaining') if headers else None
+            if remaining is None:
+                continue
+            try:
+                low = int(remaining) <= minimum
+            except ValueError:
+                continue
+            reset = _parse_reset(headers.get(f'anthropic-ratelimit-{budget}-reset'))
+            if low and reset:
+                pause_until = max(pause_until or 0, reset)
+
+        with self._lock:
+            if pause_until and pause_until > self.paused_until:
+                self.paused_until = pause_until
+                self.stats['pauses'] += 1
+                print(f"⏸️  Claude rate-limit budget low, pausing new calls for {pause_until - time.time():.1f}s")
+            self._successes += 1
+            if self.limit < self.max_concurrency and self._successes >= self.limit:
+                self.limit += 1
+                self._successes = 0
+            self._dispatch()
+
+    def note_rate_limited(self, headers=None, fallback_delay: float = 1.0) -> float:
+        """
+        Record a 429: halve concurrency and pause until the server says to retry.
+
+        Args:
+            headers: Headers of the 429 response
+            fallback_delay: Pause used when the response has no retry-after
+
+        Returns:
+            Seconds until calls are admitted again
+        """
+        delay = fallback_delay
+        retry_after = headers.get('retry-after') if headers else None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                reset = _parse_reset(retry_after)
+                if reset:
+                    delay = reset - time.time()
+        delay = max(0.0, delay)
+
+        with self._lock:
+            self.limit = max(1, self.limit // 2)
+            self._successes = 0
+            self.paused_until = max(self.paused_until, time.time() + delay)
+            self.stats['rate_limited'] += 1
+        print(f"⏸️  Claude rate limited: concurrency now {self.limit}, retrying in {delay:.1f}s")
+        return delay
+
+    def health(self) -> Dict:
+        """Current limits, queue depth and counters."""
+        with self._lock:
+            return dict(
+                self.stats,
+                limit=self.limit,
+                max_concurrency=self.max_concurrency,
+                active=self.active,
+                queued=sum(1 for _, _, w in self._waiters if not w.cancelled),
+                paused_for=max(0.0, round(self.paused_until - time.time(), 1))
+            )
+
+
+_scheduler: Optional[ClaudeScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_claude_scheduler() -> ClaudeScheduler:
+    """Get the process-wide Claude scheduler, creating it on first use."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = ClaudeScheduler()
+    return _scheduler
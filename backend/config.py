@@ -10,6 +10,40 @@ ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
 # Lightpanda API Configuration
 LIGHTPANDA_API_KEY = os.getenv('LIGHTPANDA_API_KEY')
 
+# Scraping Configuration
+SCRAPE_DEADLINE = float(os.getenv('SCRAPE_DEADLINE', 60))  # Seconds for all targets together
+SCRAPE_MAX_CONCURRENCY = int(os.getenv('SCRAPE_MAX_CONCURRENCY', 4))  # Targets scraped at once
+SCRAPE_READY_MIN_CHARS = int(os.getenv('SCRAPE_READY_MIN_CHARS', 1500))  # <article>/<main> text that counts as loaded
+SCRAPE_READY_POLL_INTERVAL = float(os.getenv('SCRAPE_READY_POLL_INTERVAL', 0.25))  # Seconds between readiness polls
+SCRAPE_READY_STABLE_POLLS = int(os.getenv('SCRAPE_READY_STABLE_POLLS', 3))  # Unchanged polls that count as loaded
+SCRAPE_BLOCK_RESOURCES = os.getenv('SCRAPE_BLOCK_RESOURCES', 'true').lower() == 'true'  # Abort requests we never read
+SCRAPE_BLOCKED_RESOURCE_TYPES = [t.strip() for t in os.getenv('SCRAPE_BLOCKED_RESOURCE_TYPES', 'image,font,media,stylesheet').split(',') if t.strip()]
+SCRAPE_BLOCKED_DOMAINS = tuple(d.strip() for d in os.getenv('SCRAPE_BLOCKED_DOMAINS', '').split(',') if d.strip())  # Extra hosts to block
+SCRAPE_MAX_CHARS = int(os.getenv('SCRAPE_MAX_CHARS', 20000))  # Text extracted per page before stopping
+SCRAPE_EXTRACT_IN_BROWSER = os.getenv('SCRAPE_EXTRACT_IN_BROWSER', 'true').lower() == 'true'  # Extract via page.evaluate
+TEXT_EXTRACTOR = os.getenv('TEXT_EXTRACTOR', 'auto')  # auto, selectolax, lxml or bs4
+SCRAPE_MIN_QUALITY_CHARS = int(os.getenv('SCRAPE_MIN_QUALITY_CHARS', 500))  # Less text than this escalates to a browser
+SCRAPE_TIER_MEMORY_TTL = int(os.getenv('SCRAPE_TIER_MEMORY_TTL', 7 * 86400))  # Seconds to remember a domain's scrape tier
+SCRAPE_BREAKER_THRESHOLD = int(os.getenv('SCRAPE_BREAKER_THRESHOLD', 2))  # Consecutive failures that open a domain's breaker
+SCRAPE_BREAKER_BASE_BACKOFF = float(os.getenv('SCRAPE_BREAKER_BASE_BACKOFF', 300))  # First open window (seconds), doubles per failure
+SCRAPE_BREAKER_MAX_BACKOFF = float(os.getenv('SCRAPE_BREAKER_MAX_BACKOFF', 21600))  # Longest open window (seconds)
+BROWSER_POOL_MAX_PAGES = int(os.getenv('BROWSER_POOL_MAX_PAGES', 4))  # Open pages per pooled browser
+BROWSER_POOL_RECYCLE_AFTER = int(os.getenv('BROWSER_POOL_RECYCLE_AFTER', 50))  # Replace a browser after N pages
+BROWSER_POOL_RETRY_AFTER = float(os.getenv('BROWSER_POOL_RETRY_AFTER', 30))  # Seconds before retrying a failed browser
+
+# Scraped Page Cache Configuration
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+PAGE_CACHE_TTL = int(os.getenv('PAGE_CACHE_TTL', 1800))  # Seconds a page stays fresh
+# Per-domain freshness overrides, e.g. "news.ycombinator.com=300,nature.com=21600"
+PAGE_CACHE_DOMAIN_TTLS = {
+    domain.strip().lower(): int(ttl)
+    for domain, _, ttl in (item.partition('=') for item in os.getenv('PAGE_CACHE_DOMAIN_TTLS', '').split(','))
+    if domain.strip() and ttl.strip()
+}
+PAGE_CACHE_STALE_TTL = int(os.getenv('PAGE_CACHE_STALE_TTL', 86400))  # Seconds a stale page may be served while refreshing
+PAGE_CACHE_LOCAL_ENTRIES = int(os.getenv('PAGE_CACHE_LOCAL_ENTRIES', 256))  # Pages kept in the in-process tier
+PAGE_CACHE_MAX_CHARS = int(os.getenv('PAGE_CACHE_MAX_CHARS', 20000))  # Extracted text kept per page
+
 # Redis Configuration
 REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
 REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
@@ -20,6 +54,19 @@ REDIS_PASSWORD = os.getenv('REDIS_PASSWORD', None)
 MODEL_NAME = os.getenv('MODEL_NAME', 'claude-3-5-sonnet-20241022')
 MAX_TOKENS = int(os.getenv('MAX_TOKENS', 4096))
 DEFAULT_TEMPERATURE = float(os.getenv('DEFAULT_TEMPERATURE', 0.7))
+CLAUDE_PROMPT_CACHING = os.getenv('CLAUDE_PROMPT_CACHING', 'true').lower() == 'true'  # Send cache_control on stable prompt prefixes
+CLAUDE_CACHE_MIN_TOKENS = int(os.getenv('CLAUDE_CACHE_MIN_TOKENS', 1024))  # Shortest prefix Anthropic will cache (2048 on Haiku)
+CLAUDE_MAX_CONCURRENCY = int(os.getenv('CLAUDE_MAX_CONCURRENCY', 8))  # Claude calls in flight per process (all clients)
+CLAUDE_MAX_RETRIES = int(os.getenv('CLAUDE_MAX_RETRIES', 3))  # Retries for 429s, 5xx/529 and connection errors
+CLAUDE_RETRY_BASE_DELAY = float(os.getenv('CLAUDE_RETRY_BASE_DELAY', 1.0))  # Backoff ceiling for the first retry (doubles, full jitter)
+CLAUDE_RETRY_MAX_DELAY = float(os.getenv('CLAUDE_RETRY_MAX_DELAY', 30))  # Largest backoff ceiling (seconds)
+CLAUDE_HEDGE_AFTER = float(os.getenv('CLAUDE_HEDGE_AFTER', 4.0))  # Duplicate short classification calls still unanswered after this
+CLAUDE_RATELIMIT_MIN_REQUESTS = int(os.getenv('CLAUDE_RATELIMIT_MIN_REQUESTS', 1))  # Pause when fewer requests remain in the window
+CLAUDE_RATELIMIT_MIN_TOKENS = int(os.getenv('CLAUDE_RATELIMIT_MIN_TOKENS', 4000))  # Pause when fewer tokens remain in the window
+CLAUDE_MEMO_ENABLED = os.getenv('CLAUDE_MEMO_ENABLED', 'true').lower() == 'true'  # Reuse responses of calls made with memoize=True
+CLAUDE_MEMO_TTL = int(os.getenv('CLAUDE_MEMO_TTL', 7 * 86400))  # Default seconds a memoized response is reused
+CLAUDE_MEMO_TARGETS_TTL = int(os.getenv('CLAUDE_MEMO_TARGETS_TTL', 6 * 3600))  # Scrape target picks (fresher sources matter)
+CLAUDE_MEMO_LOCAL_ENTRIES = int(os.getenv('CLAUDE_MEMO_LOCAL_ENTRIES', 512))  # Responses kept in the in-process tier
 
 # Podcast Configuration
 AVAILABLE_SPONSORS = [
@@ -31,18 +78,45 @@ AVAILABLE_SPONSORS = [
     "Skyflow"
 ]
 
+# Generation Pipeline Configuration
+GENERATE_MAX_PARALLEL_STEPS = int(os.getenv('GENERATE_MAX_PARALLEL_STEPS', 6))  # Pre-generation steps run at once
+GENERATE_PREP_DEADLINE = float(os.getenv('GENERATE_PREP_DEADLINE', 150))  # Seconds for tags, lookups, scraping and sponsor
+GENERATE_DRAFT_DEADLINE = float(os.getenv('GENERATE_DRAFT_DEADLINE', 180))  # Seconds for the first draft
+GENERATE_CRITIQUE_DEADLINE = float(os.getenv('GENERATE_CRITIQUE_DEADLINE', 180))  # Seconds for critique (the draft is kept on failure)
+# How scripts are refined: 'single_pass' (self-critique in the draft prompt, one call),
+# 'lint' (critique only when local checks flag the draft) or 'two_pass' (always critique)
+GENERATION_QUALITY_MODES = ('single_pass', 'lint', 'two_pass')
+GENERATION_QUALITY_MODE = os.getenv('GENERATION_QUALITY_MODE', 'two_pass')
+
 # Memory Configuration
 MAX_SPONSOR_HISTORY = 5
 MAX_PHRASE_HISTORY = 20
 
+# Outbound HTTP Configuration (shared pooled sessions)
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 10))  # Per-host pools kept per session
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 10))  # Keep-alive connections per host
+HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 2))
+HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', 0.5))
+HTTP_DEFAULT_TIMEOUT = float(os.getenv('HTTP_DEFAULT_TIMEOUT', 15))
+
 # Redis Logging Configuration
 REDIS_VERBOSE_LOGGING = os.getenv('REDIS_VERBOSE_LOGGING', 'true').lower() == 'true'
 
+# Episode Progress Events (Server-Sent Events over Redis pub/sub)
+EPISODE_EVENTS_TTL = int(os.getenv('EPISODE_EVENTS_TTL', 3600))  # Seconds to keep the replay log
+EPISODE_EVENTS_TIMEOUT = int(os.getenv('EPISODE_EVENTS_TIMEOUT', 900))  # Max seconds an event stream stays open
+
 # Sanity CMS Configuration
 SANITY_PROJECT_ID = os.getenv('SANITY_PROJECT_ID')
 SANITY_DATASET = os.getenv('SANITY_DATASET', 'production')
 SANITY_API_TOKEN = os.getenv('SANITY_API_TOKEN')
 SANITY_SAVE_EPISODES = os.getenv('SANITY_SAVE_EPISODES', 'true').lower() == 'true'
+SANITY_ASYNC_WRITES = os.getenv('SANITY_ASYNC_WRITES', 'true').lower() == 'true'  # Save episodes via the background outbox
+SANITY_OUTBOX_DIR = os.getenv('SANITY_OUTBOX_DIR', os.path.join(os.path.dirname(__file__), '..', 'sanity_outbox'))  # Journal used without Redis
+SANITY_OUTBOX_BATCH_SIZE = int(os.getenv('SANITY_OUTBOX_BATCH_SIZE', 10))  # Documents per Sanity transaction
+SANITY_OUTBOX_FLUSH_INTERVAL = float(os.getenv('SANITY_OUTBOX_FLUSH_INTERVAL', 2))  # Seconds the writer waits for new entries
+SANITY_OUTBOX_MAX_BACKOFF = float(os.getenv('SANITY_OUTBOX_MAX_BACKOFF', 300))  # Longest wait between retries (seconds)
+SANITY_OUTBOX_CLAIM_IDLE = float(os.getenv('SANITY_OUTBOX_CLAIM_IDLE', 120))  # Seconds before a dead worker's entries are taken over
 
 # ElevenLabs API Configuration
 ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY')
@@ -50,4 +124,15 @@ ELEVENLABS_VOICE_ID_ALEX = os.getenv('ELEVENLABS_VOICE_ID_ALEX', 'default')
 ELEVENLABS_VOICE_ID_MAYA = os.getenv('ELEVENLABS_VOICE_ID_MAYA', 'default')
 ELEVENLABS_API_URL = "https://api.elevenlabs.io/v1/text-to-speech"
 ELEVENLABS_MODEL_ID = os.getenv('ELEVENLABS_MODEL_ID', 'eleven_turbo_v2')  # Free-tier compatible
+ELEVENLABS_MAX_PARALLEL = int(os.getenv('ELEVENLABS_MAX_PARALLEL', 4))  # Total concurrent TTS requests
+ELEVENLABS_MAX_PARALLEL_PER_VOICE = int(os.getenv('ELEVENLABS_MAX_PARALLEL_PER_VOICE', 2))  # Concurrent requests per voice
+ELEVENLABS_STREAMING = os.getenv('ELEVENLABS_STREAMING', 'true').lower() == 'true'  # Use the streaming TTS endpoint
+ELEVENLABS_STREAM_CHUNK_SIZE = int(os.getenv('ELEVENLABS_STREAM_CHUNK_SIZE', 4096))
+AUDIO_CACHE_MAX_AGE = int(os.getenv('AUDIO_CACHE_MAX_AGE', 3600))  # Cache-Control max-age for /audio (seconds)
+ELEVENLABS_PIPELINE = os.getenv('ELEVENLABS_PIPELINE', 'true').lower() == 'true'  # Start TTS while the script streams
+ELEVENLABS_STITCH_EPISODES = os.getenv('ELEVENLABS_STITCH_EPISODES', 'true').lower() == 'true'  # Also build one file per episode
 
+# TTS Audio Cache Configuration
+TTS_CACHE_ENABLED = os.getenv('TTS_CACHE_ENABLED', 'true').lower() == 'true'
+TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', os.path.join(os.path.dirname(__file__), '..', 'audio_cache'))
+TTS_CACHE_MAX_BYTES = int(os.getenv('TTS_CACHE_MAX_BYTES', 500 * 1024 * 1024))  # 500 MB
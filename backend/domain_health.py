@@ -0,0 +1,205 @@
+"""
+Per-domain health store and circuit breaker for scraping.
+Domains that keep failing (403s, 404s, timeouts) get their breaker opened for
+an exponentially growing backoff window. While it is open, scrapes of the
+domain are skipped and Claude is asked not to pick it.
+"""
+import threading
+import time
+from typing import Dict, List, Optional
+import redis
+from config import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD, REDIS_VERBOSE_LOGGING,
+    SCRAPE_BREAKER_THRESHOLD, SCRAPE_BREAKER_BASE_BACKOFF, SCRAPE_BREAKER_MAX_BACKOFF
+)
+from scrape_tiers import domain_of
+
+# Statuses that mean the site is refusing us, not a transient hiccup
+_BLOCKING_STATUSES = (401, 403, 429)
+
+
+class DomainHealth:
+    """
+    Shared per-domain error counts, last status and breaker windows.
+    Falls back to in-process state when Redis is not available.
+    """
+
+    KEY_PREFIX = "scrape:health:"
+    OPEN_KEY = "scrape:health:open"  # Sorted set: domain -> open_until
+
+    def __init__(self, redis_client=None, threshold: int = SCRAPE_BREAKER_THRESHOLD,
+                 base_backoff: float = SCRAPE_BREAKER_BASE_BACKOFF,
+                 max_backoff: float = SCRAPE_BREAKER_MAX_BACKOFF):
+        """
+        Initialize the health store.
+
+        Args:
+            redis_client: Optional existing Redis client to reuse
+            threshold: Consecutive failures that open a domain's breaker
+            base_backoff: Seconds the breaker first stays open (doubles on each further failure)
+            max_backoff: Longest the breaker stays open
+        """
+        self.threshold = threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._local: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+        self.redis_client = redis_client
+        if self.redis_client is None:
+            try:
+                self.redis_client = redis.Redis(
+                    host=REDIS_HOST,
+                    port=REDIS_PORT,
+                    db=REDIS_DB,
+                    password=REDIS_PASSWORD,
+                    decode_responses=True
+                )
+                self.redis_client.ping()
+            except Exception as e:
+                if REDIS_VERBOSE_LOGGING:
+                    print(f"⚠️  Redis not available for domain health, using in-process fallback: {e}")
+                self.redis_client = None
+
+    def get(self, url: str) -> Dict:
+        """
+        Get a domain's health record.
+
+        Returns:
+            Dict with 'failures', 'last_status', 'last_error', 'last_failure' and 'open_until'
+        """
+        domain = domain_of(url)
+        record = None
+        if self.redis_client:
+            try:
+                record = self.redis_client.hgetall(f"{self.KEY_PREFIX}{domain}")
+            except Exception:
+                record = None
+        if record is None:
+            with self._lock:
+                record = dict(self._local.get(domain, {}))
+
+        return {
+            'domain': domain,
+            'failures': int(record.get('failures', 0)),
+            'last_status': int(record['last_status']) if record.get('last_status') else None,
+            'last_error': record.get('last_error') or None,
+            'last_failure': float(record.get('last_failure', 0)),
+            'open_until': float(record.get('open_until', 0))
+        }
+
+    def is_open(self, url: str) -> bool:
+        """Check whether a domain's breaker is open (scrapes should be skipped)."""
+        return self.get(url)['open_until'] > time.time()
+
+    def is_degraded(self, url: str) -> bool:
+        """Check whether a domain has failed recently without tripping its breaker."""
+        return self.get(url)['failures'] > 0
+
+    def record_success(self, url: str):
+        """Reset a domain after a successful scrape (closes its breaker)."""
+        domain = domain_of(url)
+        if self.redis_client:
+            try:
+                pipe = self.redis_client.pipeline()
+                pipe.delete(f"{self.KEY_PREFIX}{domain}")
+                pipe.zrem(self.OPEN_KEY, domain)
+                pipe.execute()
+                return
+            except Exception:
+                pass
+        with self._lock:
+            self._local.pop(domain, None)
+
+    def record_failure(self, url: str, status: Optional[int] = None, error: Optional[str] = None) -> Dict:
+        """
+        Record a failed scrape and open the breaker once failures reach the threshold.
+
+        Args:
+            url: Page URL
+            status: HTTP status, if the failure had one
+            error: Short error description (e.g. 'timeout')
+
+        Returns:
+            Updated health record
+        """
+        domain = domain_of(url)
+        now = time.time()
+        key = f"{self.KEY_PREFIX}{domain}"
+        fields = {
+            'last_status': status or '',
+            'last_error': (error or '')[:200],
+            'last_failure': now
+        }
+
+        failures = None
+        if self.redis_client:
+            try:
+                pipe = self.redis_client.pipeline()
+                pipe.hincrby(key, 'failures', 1)
+                pipe.hset(key, mapping=fields)
+                failures = pipe.execute()[0]
+            except Exception:
+                failures = None
+        if failures is None:
+            with self._lock:
+                record = self._local.setdefault(domain, {})
+                record['failures'] = int(record.get('failures', 0)) + 1
+                record.update(fields)
+                failures = record['failures']
+
+        # A site refusing scrapers counts as having already reached the threshold,
+        # so the first refusal opens the breaker and each further one still doubles it
+        level = failures + (self.threshold - 1 if status in _BLOCKING_STATUSES else 0)
+
+        open_until = 0.0
+        if level >= self.threshold:
+            backoff = min(self.base_backoff * 2 ** (level - self.threshold), self.max_backoff)
+            open_until = now + backoff
+            self._open(domain, open_until)
+            print(f"      🚫 Circuit open for {domain} for {backoff:.0f}s "
+                  f"({failures} failures, last: {status or error})")
+
+        return dict(fields, domain=domain, failures=failures, open_until=open_until)
+
+    def _open(self, domain: str, open_until: float):
+        key = f"{self.KEY_PREFIX}{domain}"
+        if self.redis_client:
+            try:
+                pipe = self.redis_client.pipeline()
+                pipe.hset(key, 'open_until', open_until)
+                # Keep the failure count long enough for the next backoff step
+                pipe.expire(key, int(self.max_backoff * 2))
+                pipe.zadd(self.OPEN_KEY, {domain: open_until})
+                pipe.execute()
+                return
+            except Exception:
+                pass
+        with self._lock:
+            self._local.setdefault(domain, {})['open_until'] = open_until
+
+    def known_bad_domains(self) -> List[str]:
+        """List the domains whose breaker is currently open."""
+        now = time.time()
+        if self.redis_client:
+            try:
+                self.redis_client.zremrangebyscore(self.OPEN_KEY, 0, now)
+                return list(self.redis_client.zrangebyscore(self.OPEN_KEY, now, '+inf'))
+            except Exception:
+                pass
+        with self._lock:
+            return [d for d, r in self._local.items() if float(r.get('open_until', 0)) > now]
+
+
+_health: Optional[DomainHealth] = None
+_health_lock = threading.Lock()
+
+
+def get_domain_health() -> DomainHealth:
+    """Get the process-wide domain health store, creating it on first use."""
+    global _health
+    if _health is None:
+        with _health_lock:
+            if _health is None:
+                _health = DomainHealth()
+    return _health
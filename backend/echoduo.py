@@ -2,6 +2,7 @@
 import argparse
 from podcast_generator import PodcastGenerator
 from memory_manager import MemoryManager
+from config import GENERATION_QUALITY_MODES
 
 
 def main():
@@ -26,6 +27,12 @@ def main():
         default=None,
         help='Optional: Force a specific sponsor (Calm, Nike, Notion, Coder, Forethought, Skyflow)'
     )
+    parser.add_argument(
+        '--quality-mode',
+        choices=GENERATION_QUALITY_MODES,
+        default=None,
+        help='Optional: single_pass (one call), lint (critique only flagged drafts) or two_pass (always critique)'
+    )
     parser.add_argument(
         '--clear-memory',
         action='store_true',
@@ -66,7 +73,8 @@ def main():
     result = generator.generate(
         topic=args.topic,
         real_world_context=args.context,
-        force_sponsor=args.sponsor
+        force_sponsor=args.sponsor,
+        quality_mode=args.quality_mode
     )
     
     print()
@@ -80,6 +88,9 @@ def main():
     print(f"✨ Episode Info:")
     print(f"   Topic: {result['topic']}")
     print(f"   Sponsor: {result['sponsor']}")
+    quality = result['quality']
+    print(f"   Quality: {quality['mode']} ({'critiqued' if quality['critiqued'] else 'no critique'}), "
+          f"{quality['seconds']}s, {quality['output_tokens']} output tokens")
     print("=" * 60)
 
 
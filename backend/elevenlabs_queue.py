@@ -4,15 +4,97 @@ Alternates between Alex and Maya dialogues, processing them in parallel when pos
 """
 import redis
 import json
-import requests
 import time
 import os
-from typing import Dict, List, Optional
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
 from config import (
     REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD, REDIS_VERBOSE_LOGGING,
     ELEVENLABS_API_KEY, ELEVENLABS_VOICE_ID_ALEX, ELEVENLABS_VOICE_ID_MAYA, 
-    ELEVENLABS_API_URL, ELEVENLABS_MODEL_ID
+    ELEVENLABS_API_URL, ELEVENLABS_MODEL_ID,
+    ELEVENLABS_MAX_PARALLEL, ELEVENLABS_MAX_PARALLEL_PER_VOICE, TTS_CACHE_ENABLED,
+    ELEVENLABS_STREAMING, ELEVENLABS_STREAM_CHUNK_SIZE, ELEVENLABS_STITCH_EPISODES
 )
+from audio_stitcher import stitch_episode
+from tts_cache import TTSCache
+from http_session import get_session
+from episode_events import EpisodeEvents
+
+AUDIO_DIR = os.path.join(os.path.dirname(__file__), '..', 'audio')
+
+# In-progress audio is written to "<file>.part" and renamed when complete
+PARTIAL_AUDIO_SUFFIX = '.part'
+
+
+class _VoiceDispatcher:
+    """
+    Submits synthesis jobs to a worker pool with at most per_voice running per voice.
+    Jobs over their voice's budget wait here, not in a pool thread, so a run of
+    same-voice lines never ties up workers that the other voice could use.
+    """
+    
+    def __init__(self, pool: ThreadPoolExecutor, per_voice: int):
+        self.pool = pool
+        self.per_voice = max(1, per_voice)
+        self._running: Dict[str, int] = {}
+        self._waiting: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, voice_id: str, fn, *args) -> Future:
+        """Run fn(*args) once the voice has a free slot (never blocks the caller)."""
+        future = Future()
+        with self._lock:
+            start = self._running.get(voice_id, 0) < self.per_voice
+            if start:
+                self._running[voice_id] = self._running.get(voice_id, 0) + 1
+            else:
+                self._waiting.setdefault(voice_id, deque()).append((future, fn, args))
+        if start:
+            self._start(voice_id, future, fn, args)
+        return future
+    
+    def _start(self, voice_id: str, future: Future, fn, args):
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+        
+        try:
+            job = self.pool.submit(run)
+        except RuntimeError as e:  # Pool shut down (pipeline cancelled)
+            if future.set_running_or_notify_cancel():
+                future.set_exception(e)
+            self._finished(voice_id)
+            return
+        
+        def done(job):
+            if job.cancelled():
+                future.cancel()
+            self._finished(voice_id)
+        job.add_done_callback(done)
+    
+    def _finished(self, voice_id: str):
+        """Hand a finished job's slot to the voice's next waiting job."""
+        with self._lock:
+            waiting = self._waiting.get(voice_id)
+            following = waiting.popleft() if waiting else None
+            if following is None:
+                self._running[voice_id] -= 1
+        if following:
+            self._start(voice_id, *following)
+    
+    def cancel(self):
+        """Cancel jobs still waiting for a voice slot."""
+        with self._lock:
+            waiting = [job for queue in self._waiting.values() for job in queue]
+            self._waiting.clear()
+        for future, _, _ in waiting:
+            future.cancel()
 
 
 class ElevenLabsQueue:
@@ -21,6 +103,11 @@ class ElevenLabsQueue:
     Alternates between Alex and Maya, processing in parallel when possible.
     """
     
+    VOICE_SETTINGS = {
+        "stability": 0.5,
+        "similarity_boost": 0.5
+    }
+    
     def __init__(self):
         """Initialize Redis connection and ElevenLabs queue."""
         self.redis_client = None
@@ -42,6 +129,11 @@ class ElevenLabsQueue:
         self.api_key = ELEVENLABS_API_KEY
         self.voice_alex = ELEVENLABS_VOICE_ID_ALEX
         self.voice_maya = ELEVENLABS_VOICE_ID_MAYA
+        self.session = get_session('elevenlabs')
+        
+        self.streaming = ELEVENLABS_STREAMING
+        self.tts_cache = TTSCache(redis_client=self.redis_client) if TTS_CACHE_ENABLED else None
+        self.events = EpisodeEvents(redis_client=self.redis_client)
         
         if not self.api_key:
             print("⚠️  ElevenLabs API key not configured")
@@ -63,33 +155,38 @@ class ElevenLabsQueue:
             List of dialogue dicts with 'speaker', 'text', 'index'
         """
         dialogues = []
-        lines = conversation.split('\n')
+        for line in conversation.split('\n'):
+            dialogue = self._parse_line(line, len(dialogues))
+            if dialogue:
+                dialogues.append(dialogue)
         
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                continue
+        return dialogues
+    
+    def _parse_line(self, line: str, index: int) -> Optional[Dict]:
+        """
+        Parse a single "Alex:" / "Maya:" line into a dialogue dict.
+        
+        Args:
+            line: One line of the conversation
+            index: Dialogue index to assign if the line is dialogue
             
-            if line.startswith('Alex:'):
-                text = line.replace('Alex:', '').strip()
-                # Remove sponsor markers for audio generation
-                text = text.replace('*sponsor*', '')
-                dialogues.append({
-                    'speaker': 'alex',
-                    'text': text,
-                    'index': len(dialogues)
-                })
-            elif line.startswith('Maya:'):
-                text = line.replace('Maya:', '').strip()
+        Returns:
+            Dialogue dict with 'speaker', 'text', 'index', or None for non-dialogue lines
+        """
+        line = line.strip()
+        
+        for prefix, speaker in (('Alex:', 'alex'), ('Maya:', 'maya')):
+            if line.startswith(prefix):
+                text = line.replace(prefix, '').strip()
                 # Remove sponsor markers for audio generation
                 text = text.replace('*sponsor*', '')
-                dialogues.append({
-                    'speaker': 'maya',
+                return {
+                    'speaker': speaker,
                     'text': text,
-                    'index': len(dialogues)
-                })
+                    'index': index
+                }
         
-        return dialogues
+        return None
     
     def queue_dialogues(self, conversation: str, episode_id: str) -> Dict:
         """
@@ -161,14 +258,15 @@ class ElevenLabsQueue:
             'queued': len(queued)
         }
     
-    def process_queue(self, episode_id: str, max_parallel: int = 2) -> Dict:
+    def process_queue(self, episode_id: str, max_parallel: int = ELEVENLABS_MAX_PARALLEL) -> Dict:
         """
-        Process queued dialogues for an episode sequentially.
-        Processes dialogues in order, alternating between Alex and Maya voices.
+        Process queued dialogues for an episode concurrently.
+        Lines are synthesized by a bounded worker pool (with a separate budget
+        per voice) and collected back in dialogue order.
         
         Args:
             episode_id: Episode identifier
-            max_parallel: Not used (kept for compatibility)
+            max_parallel: Maximum number of concurrent ElevenLabs requests
             
         Returns:
             Dict with processing status and audio files
@@ -179,18 +277,7 @@ class ElevenLabsQueue:
                 'error': 'Redis or ElevenLabs not configured'
             }
         
-        queue_key = f"elevenlabs:queue:{episode_id}"
-        episode_key = f"elevenlabs:episode:{episode_id}"
-        
-        # Get all queued items (they're stored in order)
-        queue_items = []
-        # Read all items without removing them first
-        all_items = self.redis_client.lrange(queue_key, 0, -1)
-        for item_json in all_items:
-            queue_items.append(json.loads(item_json))
-        
-        # Now remove them from queue
-        self.redis_client.delete(queue_key)
+        queue_items = self._take_queue_items(episode_id)
         
         if not queue_items:
             return {
@@ -198,44 +285,128 @@ class ElevenLabsQueue:
                 'error': 'No items in queue'
             }
         
-        # Sort by index to maintain order
-        queue_items.sort(key=lambda x: x['index'])
-        
-        processed = []
-        failed = []
+        results = list(self._synthesize_ordered(queue_items, episode_id, max_parallel))
+        return self._summarize_results(episode_id, results)
+    
+    def open_pipeline(self, episode_id: str, max_parallel: int = ELEVENLABS_MAX_PARALLEL) -> Optional['TTSPipeline']:
+        """
+        Start an incremental synthesis pipeline for an episode.
+        Lines can be added while the script is still being generated.
         
-        # Process dialogues sequentially
-        for item in queue_items:
-            speaker = item['speaker']
-            text = item['text']
-            
-            # Determine voice based on speaker
-            voice_id = self.voice_alex if speaker == 'alex' else self.voice_maya
-            
-            if REDIS_VERBOSE_LOGGING:
-                print(f"🎤 Processing {speaker} dialogue {item['index']}...")
-            
-            result = self._call_elevenlabs(text, voice_id, item['index'], episode_id)
-            
-            if result['success']:
-                processed.append(result)
-            else:
-                failed.append(result)
+        Args:
+            episode_id: Episode identifier
+            max_parallel: Maximum number of concurrent ElevenLabs requests
             
-            # Update episode status
-            self.redis_client.hset(episode_key, 'processed', str(len(processed)))
+        Returns:
+            TTSPipeline, or None if Redis or ElevenLabs is not configured
+        """
+        if not self.redis_client or not self.api_key:
+            return None
+        return TTSPipeline(self, episode_id, max_parallel)
+    
+    def _summarize_results(self, episode_id: str, results: List[Dict]) -> Dict:
+        """Build the process_queue result (and stitched episode audio) from per-line results."""
+        processed = [r for r in results if r['success']]
+        failed = [r for r in results if not r['success']]
         
-        # Mark as completed
-        self.redis_client.hset(episode_key, 'status', 'completed')
+        # Stitch lines into one seekable episode file with a chapter index
+        episode_index = None
+        if ELEVENLABS_STITCH_EPISODES and processed:
+            try:
+                episode_index = stitch_episode(episode_id, processed, AUDIO_DIR)
+                if episode_index and REDIS_VERBOSE_LOGGING:
+                    print(f"🎞️  Stitched {len(episode_index['chapters'])} lines into {episode_index['audio_file']} "
+                          f"({episode_index['duration']:.1f}s)")
+            except Exception as e:
+                print(f"⚠️  Episode audio stitching failed: {e}")
         
         return {
             'success': True,
             'processed': len(processed),
             'failed': len(failed),
-            'total': len(queue_items),
-            'audio_files': [p.get('audio_file') for p in processed if p.get('audio_file')]
+            'total': len(results),
+            'cached': sum(1 for p in processed if p.get('cached')),
+            'audio_files': [p.get('audio_file') for p in processed if p.get('audio_file')],
+            'episode_audio': episode_index['audio_file'] if episode_index else None,
+            'episode_index': episode_index
         }
     
+    def _take_queue_items(self, episode_id: str) -> List[Dict]:
+        """Read and remove all queued items for an episode, sorted by index."""
+        queue_key = f"elevenlabs:queue:{episode_id}"
+        
+        # Read all items, then remove them from the queue
+        all_items = self.redis_client.lrange(queue_key, 0, -1)
+        self.redis_client.delete(queue_key)
+        
+        queue_items = [json.loads(item_json) for item_json in all_items]
+        queue_items.sort(key=lambda x: x['index'])
+        return queue_items
+    
+    def _voice_id(self, item: Dict) -> str:
+        return self.voice_alex if item['speaker'] == 'alex' else self.voice_maya
+    
+    def _submit_item(self, dispatcher: _VoiceDispatcher, item: Dict, episode_id: str) -> Future:
+        """Queue a dialogue for synthesis within its voice's budget."""
+        return dispatcher.submit(self._voice_id(item), self._synthesize_item, item, episode_id)
+    
+    def _synthesize_item(self, item: Dict, episode_id: str) -> Dict:
+        """Synthesize a single queued dialogue."""
+        speaker = item['speaker']
+        
+        if REDIS_VERBOSE_LOGGING:
+            print(f"🎤 Processing {speaker} dialogue {item['index']}...")
+        
+        result = self._call_elevenlabs(item['text'], self._voice_id(item), item['index'], episode_id)
+        
+        if result['success']:
+            # Atomic increment so concurrent workers never lose an update
+            self.redis_client.hincrby(f"elevenlabs:episode:{episode_id}", 'processed', 1)
+            self._publish_event(episode_id, 'line_audio_ready', {
+                'index': item['index'],
+                'speaker': speaker,
+                'audio_file': result.get('audio_file'),
+                'cached': result.get('cached', False)
+            })
+        else:
+            self._publish_event(episode_id, 'line_audio_failed', {
+                'index': item['index'],
+                'error': result.get('error')
+            })
+        
+        return result
+    
+    def _synthesize_ordered(self, queue_items: List[Dict], episode_id: str,
+                            max_parallel: int) -> Iterator[Dict]:
+        """Run synthesis for all items on a worker pool and yield results in order."""
+        episode_key = f"elevenlabs:episode:{episode_id}"
+        
+        if not queue_items:
+            return
+        
+        self.redis_client.hset(episode_key, 'status', 'processing')
+        
+        workers = max(1, min(max_parallel, len(queue_items)))
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='elevenlabs') as pool:
+                dispatcher = _VoiceDispatcher(pool, ELEVENLABS_MAX_PARALLEL_PER_VOICE)
+                futures = [self._submit_item(dispatcher, item, episode_id) for item in queue_items]
+                
+                # Futures are in index order; waiting on each in turn keeps the
+                # output ordered while later lines keep synthesizing in the background
+                for item, future in zip(queue_items, futures):
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        yield {
+                            'success': False,
+                            'error': str(e),
+                            'index': item['index']
+                        }
+        finally:
+            # Also when the caller stops consuming early
+            self.redis_client.hset(episode_key, 'status', 'completed')
+    
     def _call_elevenlabs(self, text: str, voice_id: str, index: int, episode_id: str) -> Dict:
         """
         Call ElevenLabs API for text-to-speech.
@@ -255,6 +426,26 @@ class ElevenLabsQueue:
                 'error': 'API key not configured'
             }
         
+        # Save audio to file - use absolute path
+        os.makedirs(AUDIO_DIR, exist_ok=True)
+        audio_filename = f"{episode_id}_dialogue_{index}.mp3"
+        audio_path = os.path.join(AUDIO_DIR, audio_filename)
+        
+        # Reuse previously synthesized audio for identical requests
+        cache_key = None
+        if self.tts_cache:
+            cache_key = TTSCache.make_key(voice_id, ELEVENLABS_MODEL_ID, self.VOICE_SETTINGS, text)
+            if self.tts_cache.fetch(cache_key, audio_path):
+                if REDIS_VERBOSE_LOGGING:
+                    print(f"♻️  Reused cached audio for dialogue {index}: {audio_filename}")
+                return {
+                    'success': True,
+                    'audio_file': audio_filename,
+                    'index': index,
+                    'episode_id': episode_id,
+                    'cached': True
+                }
+        
         url = f"{ELEVENLABS_API_URL}/{voice_id}"
         headers = {
             "Accept": "audio/mpeg",
@@ -265,27 +456,32 @@ class ElevenLabsQueue:
         data = {
             "text": text,
             "model_id": ELEVENLABS_MODEL_ID,  # Uses config value (default: eleven_turbo_v2)
-            "voice_settings": {
-                "stability": 0.5,
-                "similarity_boost": 0.5
-            }
+            "voice_settings": self.VOICE_SETTINGS
         }
         
         try:
             if REDIS_VERBOSE_LOGGING:
                 print(f"🎤 Calling ElevenLabs for dialogue {index} (voice: {voice_id[:8]}...)")
             
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            if self.streaming:
+                url = f"{url}/stream"
+            
+            response = self.session.post(url, json=data, headers=headers, timeout=30, stream=self.streaming)
             
             if response.status_code == 200:
-                # Save audio to file - use absolute path
-                audio_dir = os.path.join(os.path.dirname(__file__), '..', 'audio')
-                os.makedirs(audio_dir, exist_ok=True)
-                audio_filename = f"{episode_id}_dialogue_{index}.mp3"
-                audio_path = os.path.join(audio_dir, audio_filename)
+                # Write to a partial file and swap it in when complete. This keeps
+                # readers from seeing half-written audio, and replaces (rather than
+                # overwrites) a file that is hard-linked into the TTS cache.
+                partial_path = f"{audio_path}{PARTIAL_AUDIO_SUFFIX}"
+                if self.streaming:
+                    self._write_stream(response, partial_path, audio_filename, index, episode_id)
+                else:
+                    with open(partial_path, 'wb') as f:
+                        f.write(response.content)
+                os.replace(partial_path, audio_path)
                 
-                with open(audio_path, 'wb') as f:
-                    f.write(response.content)
+                if cache_key:
+                    self.tts_cache.store(cache_key, audio_path)
                 
                 if REDIS_VERBOSE_LOGGING:
                     print(f"✅ Generated audio: {audio_filename}")
@@ -294,7 +490,8 @@ class ElevenLabsQueue:
                     'success': True,
                     'audio_file': audio_filename,  # Just filename for URL
                     'index': index,
-                    'episode_id': episode_id
+                    'episode_id': episode_id,
+                    'cached': False
                 }
             else:
                 error_msg = f"HTTP {response.status_code}: {response.text[:100]}"
@@ -315,6 +512,38 @@ class ElevenLabsQueue:
                 'index': index
             }
     
+    def _write_stream(self, response, partial_path: str, audio_filename: str,
+                      index: int, episode_id: str):
+        """
+        Write a streaming ElevenLabs response to disk chunk by chunk.
+        Publishes an 'audio_first_bytes' event once the first chunk is on disk,
+        so /audio can start serving the line while synthesis continues.
+        """
+        first_chunk = True
+        try:
+            with open(partial_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=ELEVENLABS_STREAM_CHUNK_SIZE):
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    f.flush()
+                    if first_chunk:
+                        first_chunk = False
+                        self._publish_event(episode_id, 'audio_first_bytes', {
+                            'index': index,
+                            'audio_file': audio_filename
+                        })
+        except Exception:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        finally:
+            response.close()
+    
+    def _publish_event(self, episode_id: str, event_type: str, data: Dict):
+        """Publish a progress event on the episode's event stream."""
+        self.events.publish(episode_id, event_type, data)
+    
     def get_queue_status(self, episode_id: str) -> Dict:
         """Get current queue status for an episode."""
         if not self.redis_client:
@@ -335,6 +564,96 @@ class ElevenLabsQueue:
         }
 
 
+class TTSPipeline:
+    """
+    Synthesizes dialogue lines as they are produced.
+    Used while Claude is still streaming the script, so TTS overlaps generation.
+    """
+    
+    def __init__(self, queue: ElevenLabsQueue, episode_id: str, max_parallel: int):
+        """
+        Initialize the pipeline. Use ElevenLabsQueue.open_pipeline() instead of
+        constructing this directly.
+        
+        Args:
+            queue: Queue providing voices, Redis and the ElevenLabs call
+            episode_id: Episode identifier
+            max_parallel: Maximum number of concurrent ElevenLabs requests
+        """
+        self.queue = queue
+        self.episode_id = episode_id
+        self.episode_key = f"elevenlabs:episode:{episode_id}"
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_parallel), thread_name_prefix='elevenlabs')
+        self._dispatcher = _VoiceDispatcher(self._pool, ELEVENLABS_MAX_PARALLEL_PER_VOICE)
+        self._futures = []  # (item, future) in dialogue order
+        self._lock = threading.Lock()
+        
+        self.queue.redis_client.hset(self.episode_key, mapping={
+            'total_dialogues': 0,
+            'processed': '0',
+            'status': 'streaming',
+            'created_at': str(time.time())
+        })
+    
+    def add_line(self, line: str) -> Optional[Dict]:
+        """
+        Start synthesizing a line immediately if it is dialogue.
+        
+        Args:
+            line: One complete line of the script
+            
+        Returns:
+            The queued dialogue dict, or None if the line was not dialogue
+        """
+        with self._lock:
+            item = self.queue._parse_line(line, len(self._futures))
+            if not item or not item['text']:
+                return None
+            
+            future = self.queue._submit_item(self._dispatcher, item, self.episode_id)
+            self._futures.append((item, future))
+        
+        self.queue.redis_client.hincrby(self.episode_key, 'total_dialogues', 1)
+        if REDIS_VERBOSE_LOGGING:
+            print(f"📤 Streamed {item['speaker']} dialogue {item['index']} to ElevenLabs: {item['text'][:50]}...")
+        return item
+    
+    def finish(self) -> Dict:
+        """
+        Wait for all lines to finish and return the same result as process_queue.
+        """
+        results = []
+        with self._lock:
+            futures = list(self._futures)
+        
+        for item, future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({
+                    'success': False,
+                    'error': str(e),
+                    'index': item['index']
+                })
+        
+        self._pool.shutdown(wait=True)
+        self.queue.redis_client.hset(self.episode_key, 'status', 'completed')
+        
+        if not results:
+            return {
+                'success': False,
+                'error': 'No dialogues found in conversation'
+            }
+        
+        return self.queue._summarize_results(self.episode_id, results)
+    
+    def cancel(self):
+        """Abandon the pipeline, dropping lines that have not started yet."""
+        self._dispatcher.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.queue.redis_client.hset(self.episode_key, 'status', 'cancelled')
+
+
 if __name__ == "__main__":
     # Test the queue system
     queue = ElevenLabsQueue()
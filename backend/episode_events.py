@@ -0,0 +1,193 @@
+"""
+Per-episode progress events over Redis pub/sub.
+Events are also appended to a short-lived Redis list so a client that connects
+late (or to a different worker) can replay what it missed before going live.
+"""
+import redis
+import json
+import threading
+import time
+from typing import Dict, Iterator, Optional
+from config import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD, REDIS_VERBOSE_LOGGING,
+    EPISODE_EVENTS_TTL, EPISODE_EVENTS_TIMEOUT
+)
+
+# Events after which no more events are published for an episode
+TERMINAL_EVENTS = ('episode_complete', 'episode_failed')
+
+# Numbers, logs and publishes an event in one atomic step, so concurrent
+# publishers (e.g. parallel TTS workers) can't log or deliver events out of
+# seq order. KEYS: seq counter, log list. ARGV: event JSON without 'seq',
+# TTL, channel. Returns the assigned seq.
+_PUBLISH_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+local payload = '{"seq": ' .. seq .. ', ' .. string.sub(ARGV[1], 2)
+redis.call('RPUSH', KEYS[2], payload)
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+redis.call('PUBLISH', ARGV[3], payload)
+return seq
+"""
+
+
+class EpisodeEvents:
+    """
+    Publishes and streams structured progress events for an episode.
+    Falls back to an in-process log when Redis is not available.
+    """
+
+    # In-process fallback shared by all instances: episode_id -> list of events,
+    # dropped EPISODE_EVENTS_TTL after the episode's last event (like the Redis log)
+    _local_logs: Dict[str, list] = {}
+    _local_expiry: Dict[str, float] = {}
+    _local_condition = threading.Condition()
+
+    def __init__(self, redis_client=None):
+        """
+        Initialize event publishing.
+
+        Args:
+            redis_client: Optional existing Redis client to reuse
+        """
+        self.redis_client = redis_client
+        if self.redis_client is None:
+            try:
+                self.redis_client = redis.Redis(
+                    host=REDIS_HOST,
+                    port=REDIS_PORT,
+                    db=REDIS_DB,
+                    password=REDIS_PASSWORD,
+                    decode_responses=True
+                )
+                self.redis_client.ping()
+            except Exception as e:
+                if REDIS_VERBOSE_LOGGING:
+                    print(f"⚠️  Redis not available for episode events, using in-process fallback: {e}")
+                self.redis_client = None
+
+        self._publish_script = self.redis_client.register_script(_PUBLISH_SCRIPT) if self.redis_client else None
+
+    @staticmethod
+    def _channel(episode_id: str) -> str:
+        return f"episode:events:{episode_id}"
+
+    def publish(self, episode_id: str, event_type: str, data: Optional[Dict] = None) -> Dict:
+        """
+        Publish an event for an episode.
+
+        Args:
+            episode_id: Episode identifier
+            event_type: Event name (e.g. 'tags_extracted', 'line_audio_ready')
+            data: Optional event payload
+
+        Returns:
+            The published event
+        """
+        event = {
+            'type': event_type,
+            'episode_id': episode_id,
+            'timestamp': time.time(),
+            'data': data or {}
+        }
+
+        if self.redis_client:
+            channel = self._channel(episode_id)
+            try:
+                event['seq'] = int(self._publish_script(
+                    keys=[f"{channel}:seq", f"{channel}:log"],
+                    args=[json.dumps(event), EPISODE_EVENTS_TTL, channel]
+                ))
+                return event
+            except Exception as e:
+                print(f"⚠️  Failed to publish episode event: {e}")
+                return event
+
+        with self._local_condition:
+            now = time.time()
+            for expired_id in [eid for eid, expires in self._local_expiry.items() if expires <= now]:
+                self._local_logs.pop(expired_id, None)
+                del self._local_expiry[expired_id]
+            log = self._local_logs.setdefault(episode_id, [])
+            event['seq'] = len(log) + 1
+            log.append(event)
+            self._local_expiry[episode_id] = now + EPISODE_EVENTS_TTL
+            self._local_condition.notify_all()
+        return event
+
+    def listen(self, episode_id: str, timeout: float = EPISODE_EVENTS_TIMEOUT,
+               heartbeat: float = 15.0) -> Iterator[Optional[Dict]]:
+        """
+        Stream an episode's events, replaying earlier ones first.
+
+        Args:
+            episode_id: Episode identifier
+            timeout: Stop after this many seconds without a terminal event
+            heartbeat: Yield None after this many idle seconds so callers can keep
+                the connection alive
+
+        Yields:
+            Event dicts in publish order, or None as an idle heartbeat. Stops after
+            a terminal event.
+        """
+        if self.redis_client:
+            yield from self._listen_redis(episode_id, timeout, heartbeat)
+        else:
+            yield from self._listen_local(episode_id, timeout, heartbeat)
+
+    def _listen_redis(self, episode_id: str, timeout: float, heartbeat: float) -> Iterator[Optional[Dict]]:
+        channel = self._channel(episode_id)
+        pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        # Subscribe before replaying so nothing published in between is lost
+        pubsub.subscribe(channel)
+
+        try:
+            last_seq = 0
+            for payload in self.redis_client.lrange(f"{channel}:log", 0, -1):
+                event = json.loads(payload)
+                last_seq = event.get('seq', last_seq)
+                yield event
+                if event['type'] in TERMINAL_EVENTS:
+                    return
+
+            deadline = time.time() + timeout
+            last_sent = time.time()
+            while time.time() < deadline:
+                message = pubsub.get_message(timeout=1.0)
+                if not message:
+                    if time.time() - last_sent >= heartbeat:
+                        last_sent = time.time()
+                        yield None
+                    continue
+
+                event = json.loads(message['data'])
+                if event.get('seq', 0) <= last_seq:
+                    continue  # Already replayed from the log
+                last_seq = event['seq']
+                last_sent = time.time()
+                yield event
+                if event['type'] in TERMINAL_EVENTS:
+                    return
+        finally:
+            pubsub.close()
+
+    def _listen_local(self, episode_id: str, timeout: float, heartbeat: float) -> Iterator[Optional[Dict]]:
+        deadline = time.time() + timeout
+        position = 0
+        while time.time() < deadline:
+            with self._local_condition:
+                log = self._local_logs.get(episode_id, [])
+                if position >= len(log):
+                    self._local_condition.wait(timeout=heartbeat)
+                    log = self._local_logs.get(episode_id, [])
+                pending = log[position:]
+                position = len(log)
+
+            if not pending:
+                yield None
+                continue
+
+            for event in pending:
+                yield event
+                if event['type'] in TERMINAL_EVENTS:
+                    return
@@ -0,0 +1,102 @@
+"""
+Shared HTTP sessions with connection pooling and keep-alive.
+Every outbound client (ElevenLabs, Sanity, scrapers) gets its sessions from
+here instead of calling requests.get/post, so TCP+TLS connections are reused.
+"""
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Optional
+from config import (
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_FACTOR, HTTP_DEFAULT_TIMEOUT
+)
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+class PooledSession(requests.Session):
+    """requests.Session that applies a default timeout to every request."""
+
+    def __init__(self, timeout: float = HTTP_DEFAULT_TIMEOUT):
+        super().__init__()
+        self.default_timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.default_timeout)
+        return super().request(method, url, **kwargs)
+
+
+def create_session(
+    pool_connections: int = HTTP_POOL_CONNECTIONS,
+    pool_maxsize: int = HTTP_POOL_MAXSIZE,
+    max_retries: int = HTTP_MAX_RETRIES,
+    backoff_factor: float = HTTP_BACKOFF_FACTOR,
+    timeout: float = HTTP_DEFAULT_TIMEOUT
+) -> requests.Session:
+    """
+    Create a pooled session with retry/backoff on transient failures.
+
+    Args:
+        pool_connections: Number of per-host connection pools to keep
+        pool_maxsize: Maximum connections kept alive per host
+        max_retries: Retries for connection errors and 429/5xx responses
+        backoff_factor: Exponential backoff factor between retries (seconds)
+        timeout: Default request timeout when the caller doesn't pass one
+
+    Returns:
+        Configured session
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False  # Hand the final response back so callers can inspect it
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry
+    )
+
+    session = PooledSession(timeout=timeout)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(name: str = 'default', **kwargs) -> requests.Session:
+    """
+    Get the process-wide session for a named client, creating it on first use.
+
+    Args:
+        name: Client name (e.g. 'elevenlabs', 'sanity', 'scraper')
+        **kwargs: Options for create_session, used only when the session is created
+
+    Returns:
+        Shared session for that client
+    """
+    session = _sessions.get(name)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        if name not in _sessions:
+            _sessions[name] = create_session(**kwargs)
+        return _sessions[name]
+
+
+def close_sessions(name: Optional[str] = None):
+    """Close one named session, or all of them."""
+    with _sessions_lock:
+        names = [name] if name else list(_sessions)
+        for n in names:
+            session = _sessions.pop(n, None)
+            if session:
+                session.close()
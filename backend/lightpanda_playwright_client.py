@@ -3,10 +3,13 @@ Lightpanda Cloud + Playwright integration via CDP (Chrome DevTools Protocol).
 Uses Playwright's CDP.connect() to connect to Lightpanda Cloud WebSocket.
 """
 
-import asyncio
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
 from typing import Dict, Optional, Any
+from browser_pool import get_browser_pool
+from page_readiness import wait_for_content
+from resource_filter import install_resource_filter
+from text_extract import extract_text, extract_in_browser
+from config import SCRAPE_EXTRACT_IN_BROWSER, SCRAPE_MAX_CHARS
 import os
 from dotenv import load_dotenv
 
@@ -61,6 +64,11 @@ class LightpandaPlaywrightClient:
                     user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
                 )
             
+            try:
+                await install_resource_filter(self.context)
+            except Exception as e:
+                print(f"      ⚠️  Request blocking unavailable: {str(e)[:60]}")
+            
             return self
             
         except Exception as e:
@@ -82,7 +90,7 @@ class LightpandaPlaywrightClient:
         
         Args:
             url: URL to scrape
-            wait_time: Time to wait after page load (seconds) - increased for JS-heavy sites
+            wait_time: Maximum time to wait for content after page load (seconds)
             
         Returns:
             Dictionary with status and content
@@ -90,52 +98,45 @@ class LightpandaPlaywrightClient:
         if not self.context:
             raise RuntimeError("Not connected. Use 'async with' context manager.")
         
+        page = await self.context.new_page()
+        try:
+            return await self.scrape_page(page, url, wait_time=wait_time)
+        finally:
+            await page.close()
+    
+    async def scrape_page(self, page, url: str, wait_time: float = 5.0,
+                          max_chars: int = SCRAPE_MAX_CHARS) -> Dict[str, Any]:
+        """
+        Scrape a URL in an already open page (e.g. one borrowed from the browser pool).
+        The caller owns the page and closes it. Text extraction stops after max_chars.
+        """
         try:
-            # Create a new page
-            page = await self.context.new_page()
-            
             # Navigate to URL
             print(f"      → Navigating to {url[:60]}...")
             try:
-                # Wait for networkidle, then load state for maximum JS rendering
-                await page.goto(url, wait_until='networkidle', timeout=45000)
-                await page.wait_for_load_state('networkidle')  # Extra wait for JS
+                # Don't wait for networkidle - readiness is judged by the content itself
+                await page.goto(url, wait_until='domcontentloaded', timeout=45000)
             except Exception as e:
-                print(f"      ⚠️  Network idle timeout, but page may have loaded")
-                await page.wait_for_load_state('domcontentloaded')
-                await page.wait_for_load_state('load')  # Wait for full page load
+                print(f"      ⚠️  Navigation timeout, but page may have loaded")
             
-            # Wait for JavaScript to render
+            # Wait for JavaScript to render the main content (wait_time is the cap)
             if wait_time > 0:
-                print(f"      → Waiting {wait_time}s for JavaScript...")
-                await asyncio.sleep(wait_time)
-            
-            # Get page content
-            print(f"      → Extracting rendered content...")
-            html_content = await page.content()
-            
-            # Close the page
-            await page.close()
+                waited = await wait_for_content(page, url, max_wait=wait_time)
+                print(f"      → Content ready after {waited:.1f}s")
             
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
+            # Extract in the page so the full HTML never has to cross CDP
+            text = ''
+            if SCRAPE_EXTRACT_IN_BROWSER:
+                try:
+                    text = await extract_in_browser(page, max_chars)
+                except Exception:
+                    text = ''
             
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-                element.decompose()
+            if not text:
+                print(f"      → Extracting rendered content...")
+                text = extract_text(await page.content(), max_chars=max_chars)
             
-            # Extract main content
-            main_content = (
-                soup.find('article') or 
-                soup.find('main') or 
-                soup.find('div', class_=['content', 'article', 'post']) or
-                soup.body
-            )
-            
-            if main_content:
-                text = main_content.get_text(separator=' ', strip=True)
-                text = ' '.join(text.split())
-                
+            if text:
                 return {
                     "status": "success",
                     "content": text,
@@ -144,20 +145,6 @@ class LightpandaPlaywrightClient:
                     "method": "lightpanda_cloud_via_playwright_cdp"
                 }
             
-            # Fallback: use body text
-            if soup.body:
-                text = soup.body.get_text(separator=' ', strip=True)
-                text = ' '.join(text.split())
-                
-                if len(text) > 100:
-                    return {
-                        "status": "success",
-                        "content": text,
-                        "length": len(text),
-                        "url": url,
-                        "method": "lightpanda_cloud_via_playwright_cdp"
-                    }
-            
             return {
                 "status": "error",
                 "error": "No content found",
@@ -184,13 +171,17 @@ def scrape_with_lightpanda_playwright(url: str, api_token: str, region: str = "e
     Returns:
         Dictionary with status and content
     """
+    pool = get_browser_pool()
+    
     async def _scrape():
-        async with LightpandaPlaywrightClient(api_token, region) as client:
-            return await client.scrape_url(url, wait_time=5.0)
+        # Pooled CDP connection stays open between calls
+        async with pool.page('lightpanda', api_token=api_token, region=region) as page:
+            client = LightpandaPlaywrightClient(api_token, region)
+            return await client.scrape_page(page, url, wait_time=5.0)
     
-    # Run async function
+    # Run on the pool's event loop
     try:
-        return asyncio.run(_scrape())
+        return pool.run(_scrape())
     except Exception as e:
         return {
             "status": "failed",
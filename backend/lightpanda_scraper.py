@@ -1,9 +1,11 @@
 """Web scraping module using Lightpanda API for real-world context."""
-import requests
-from bs4 import BeautifulSoup
 from typing import List, Dict, Optional
+import threading
 import time
-from config import LIGHTPANDA_API_KEY
+from config import LIGHTPANDA_API_KEY, SCRAPE_MAX_CHARS
+from http_session import get_session
+from page_cache import get_page_cache
+from text_extract import extract_text
 
 
 class LightpandaScraper:
@@ -12,6 +14,8 @@ class LightpandaScraper:
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or LIGHTPANDA_API_KEY
         self.use_lightpanda = bool(self.api_key)
+        self.session = get_session('scraper')
+        self.page_cache = get_page_cache()
         
         # Fallback headers for BeautifulSoup
         self.headers = {
@@ -37,30 +41,61 @@ class LightpandaScraper:
         return search_urls[:num_results]
     
     def scrape_url(self, url: str) -> str:
-        """Scrape content from a single URL."""
+        """
+        Scrape content from a single URL.
+        Fresh cached copies are returned directly; a stale copy is returned while
+        it is refreshed in the background.
+        """
+        cached = self.page_cache.lookup(url) if self.page_cache else None
+        if cached and cached['state'] == 'fresh':
+            return cached['content'][:1000]
+        
+        if cached and self.page_cache.begin_revalidation(url):
+            threading.Thread(target=self._revalidate_url, args=(url, cached), daemon=True).start()
+        if cached:
+            return cached['content'][:1000]
+        
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "footer", "header"]):
-                script.decompose()
-            
-            # Get text
-            text = soup.get_text(separator=' ', strip=True)
-            
-            # Clean up whitespace
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
-            
-            # Limit to first 1000 characters
-            return text[:1000]
+            return self._fetch_url(url)[:1000]
         except Exception as e:
             return f"Error scraping {url}: {str(e)}"
     
+    def _revalidate_url(self, url: str, cached: Dict):
+        """Refresh a stale cached page in the background."""
+        try:
+            self._fetch_url(url, cached)
+        except Exception:
+            pass
+        finally:
+            self.page_cache.end_revalidation(url)
+    
+    def _fetch_url(self, url: str, cached: Optional[Dict] = None) -> str:
+        """Fetch and extract a page, revalidating a cached copy when possible."""
+        headers = dict(self.headers)
+        if self.page_cache:
+            headers.update(self.page_cache.conditional_headers(cached))
+        
+        response = self.session.get(url, headers=headers, timeout=10)
+        if response.status_code == 304 and cached:
+            return self.page_cache.refresh(url, cached)['content']
+        response.raise_for_status()
+        
+        # Whole-page text; scrape_url only keeps the first 1000 characters
+        text = extract_text(
+            response.content,
+            max_chars=SCRAPE_MAX_CHARS,
+            main_only=False,
+            remove_tags=("script", "style", "nav", "footer", "header")
+        )
+        
+        if self.page_cache and text:
+            self.page_cache.store(
+                url, text, 'http',
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified')
+            )
+        return text
+    
     def get_context(self, topic: str) -> str:
         """Get real-world context about a topic using Lightpanda or fallback."""
         if self.use_lightpanda:
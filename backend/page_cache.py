@@ -0,0 +1,261 @@
+"""
+URL-keyed cache of extracted page text for all scrapers.
+The same category pages get picked for many topics; rendering them again
+through a browser every time is wasted work. Entries live in a local LRU tier
+and in Redis (shared across workers), expire per domain, and are served stale
+while a single background refresh runs. HTTP entries keep their ETag /
+Last-Modified so refreshes can be conditional.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+import redis
+from config import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD, REDIS_VERBOSE_LOGGING,
+    PAGE_CACHE_ENABLED, PAGE_CACHE_TTL, PAGE_CACHE_DOMAIN_TTLS, PAGE_CACHE_STALE_TTL,
+    PAGE_CACHE_LOCAL_ENTRIES, PAGE_CACHE_MAX_CHARS
+)
+
+# Seconds a refresh claim is held, so a crashed refresher doesn't block others for long
+_REVALIDATION_LOCK_TTL = 60
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL for use as a cache key (lowercase host, no fragment)."""
+    parts = urlsplit(url.strip())
+    path = parts.path or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+
+def domain_ttl(url: str, default: int = PAGE_CACHE_TTL) -> int:
+    """Get the freshness TTL for a URL, matching the host or any parent domain."""
+    host = (urlsplit(url).hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    while host:
+        if host in PAGE_CACHE_DOMAIN_TTLS:
+            return PAGE_CACHE_DOMAIN_TTLS[host]
+        host = host.partition('.')[2]
+    return default
+
+
+class PageCache:
+    """
+    Two-tier (process LRU + Redis) cache of scraped page text.
+    Falls back to the local tier alone when Redis is not available.
+    """
+
+    KEY_PREFIX = "scrape:page:"
+    STATS_KEY = "scrape:cache:stats"
+
+    def __init__(self, redis_client=None, local_entries: int = PAGE_CACHE_LOCAL_ENTRIES,
+                 stale_ttl: int = PAGE_CACHE_STALE_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            redis_client: Optional existing Redis client to reuse
+            local_entries: Maximum entries kept in the in-process tier
+            stale_ttl: Seconds past freshness that an entry may still be served
+        """
+        self.local_entries = local_entries
+        self.stale_ttl = stale_ttl
+        self._local: OrderedDict = OrderedDict()  # key -> entry, least recently used first
+        self._lock = threading.Lock()
+        self._revalidating = set()
+
+        self.redis_client = redis_client
+        if self.redis_client is None:
+            try:
+                self.redis_client = redis.Redis(
+                    host=REDIS_HOST,
+                    port=REDIS_PORT,
+                    db=REDIS_DB,
+                    password=REDIS_PASSWORD,
+                    decode_responses=True
+                )
+                self.redis_client.ping()
+            except Exception as e:
+                if REDIS_VERBOSE_LOGGING:
+                    print(f"⚠️  Redis not available for page cache, using local cache only: {e}")
+                self.redis_client = None
+
+    def _key(self, url: str) -> str:
+        digest = hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+        return f"{self.KEY_PREFIX}{digest}"
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """
+        Look up a page.
+
+        Args:
+            url: Page URL
+
+        Returns:
+            Entry dict ('content', 'method', 'etag', 'last_modified', 'fetched_at',
+            'fresh_until') with 'state' set to 'fresh' or 'stale', or None on a miss
+        """
+        key = self._key(url)
+        now = time.time()
+
+        with self._lock:
+            entry = self._local.get(key)
+            if entry:
+                self._local.move_to_end(key)
+
+        if (not entry or entry['fresh_until'] <= now) and self.redis_client:
+            # Another worker may have a newer copy
+            try:
+                payload = self.redis_client.get(key)
+                if payload:
+                    shared = json.loads(payload)
+                    if not entry or shared['fetched_at'] > entry['fetched_at']:
+                        entry = shared
+                        self._remember(key, entry)
+            except Exception as e:
+                if REDIS_VERBOSE_LOGGING:
+                    print(f"⚠️  Page cache read failed: {e}")
+
+        if not entry or entry['fresh_until'] + self.stale_ttl <= now:
+            self._count('misses')
+            return None
+
+        state = 'fresh' if entry['fresh_until'] > now else 'stale'
+        self._count('hits' if state == 'fresh' else 'stale_hits')
+        return dict(entry, state=state)
+
+    def store(self, url: str, content: str, method: str,
+              etag: Optional[str] = None, last_modified: Optional[str] = None) -> Dict:
+        """
+        Store extracted text for a page.
+
+        Args:
+            url: Page URL
+            content: Extracted text
+            method: How it was fetched (e.g. 'http', 'playwright_chrome')
+            etag: ETag response header, if any
+            last_modified: Last-Modified response header, if any
+
+        Returns:
+            The stored entry
+        """
+        now = time.time()
+        entry = {
+            'url': url,
+            'content': content[:PAGE_CACHE_MAX_CHARS],
+            'method': method,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': now,
+            'fresh_until': now + domain_ttl(url)
+        }
+        self._save(self._key(url), entry)
+        return entry
+
+    def refresh(self, url: str, entry: Dict) -> Dict:
+        """Mark an entry fresh again (after a 304 Not Modified)."""
+        now = time.time()
+        entry = {k: v for k, v in entry.items() if k != 'state'}
+        entry['fetched_at'] = now
+        entry['fresh_until'] = now + domain_ttl(url)
+        self._save(self._key(url), entry)
+        self._count('revalidated')
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers from an entry."""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def begin_revalidation(self, url: str) -> bool:
+        """
+        Claim the background refresh of a stale page.
+
+        Returns:
+            True if the caller should refresh it, False if someone already is
+        """
+        key = self._key(url)
+        with self._lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+
+        if self.redis_client:
+            try:
+                if not self.redis_client.set(f"{key}:refreshing", 1, nx=True, ex=_REVALIDATION_LOCK_TTL):
+                    with self._lock:
+                        self._revalidating.discard(key)
+                    return False
+            except Exception:
+                pass
+        return True
+
+    def end_revalidation(self, url: str):
+        """Release a refresh claimed with begin_revalidation."""
+        key = self._key(url)
+        with self._lock:
+            self._revalidating.discard(key)
+        if self.redis_client:
+            try:
+                self.redis_client.delete(f"{key}:refreshing")
+            except Exception:
+                pass
+
+    def _remember(self, key: str, entry: Dict):
+        with self._lock:
+            self._local[key] = entry
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_entries:
+                self._local.popitem(last=False)
+
+    def _save(self, key: str, entry: Dict):
+        self._remember(key, entry)
+        if self.redis_client:
+            try:
+                ttl = max(1, int(entry['fresh_until'] - time.time()) + self.stale_ttl)
+                self.redis_client.set(key, json.dumps(entry), ex=ttl)
+            except Exception as e:
+                if REDIS_VERBOSE_LOGGING:
+                    print(f"⚠️  Page cache write failed: {e}")
+
+    def _count(self, field: str):
+        if self.redis_client:
+            try:
+                self.redis_client.hincrby(self.STATS_KEY, field, 1)
+            except Exception:
+                pass
+
+    def stats(self) -> Dict:
+        """Get hit/miss counters (shared across workers when Redis is available)."""
+        stats = {'local_entries': len(self._local)}
+        if self.redis_client:
+            try:
+                stats.update({k: int(v) for k, v in self.redis_client.hgetall(self.STATS_KEY).items()})
+            except Exception:
+                pass
+        return stats
+
+
+_cache: Optional[PageCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """Get the process-wide page cache, or None if caching is disabled."""
+    global _cache
+    if not PAGE_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PageCache()
+    return _cache
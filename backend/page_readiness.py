@@ -0,0 +1,97 @@
+"""
+Adaptive content-readiness detection for browser scraping.
+Instead of sleeping a fixed time after load, poll the length of the page's main
+content and stop as soon as it is substantial or has stopped growing. How long
+each domain took before is remembered, so pages that show a skeleton first are
+not cut short.
+"""
+import asyncio
+import time
+from typing import Dict
+from urllib.parse import urlparse
+from config import SCRAPE_READY_MIN_CHARS, SCRAPE_READY_POLL_INTERVAL, SCRAPE_READY_STABLE_POLLS
+
+# Returns [main content text length, whether it came from <article>/<main>]
+_CONTENT_LENGTH_JS = """() => {
+    const main = document.querySelector('article') || document.querySelector('main');
+    const el = main || document.body;
+    return [el ? el.innerText.length : 0, !!main];
+}"""
+
+# Learned seconds-until-ready per domain (exponential moving average)
+_domain_profiles: Dict[str, float] = {}
+_PROFILE_WEIGHT = 0.3
+
+
+def _domain(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def get_wait_profile(url: str) -> float:
+    """Get the learned seconds-until-ready for a URL's domain (0 if unknown)."""
+    return _domain_profiles.get(_domain(url), 0.0)
+
+
+def _record(url: str, elapsed: float):
+    domain = _domain(url)
+    previous = _domain_profiles.get(domain)
+    if previous is None:
+        _domain_profiles[domain] = elapsed
+    else:
+        _domain_profiles[domain] = previous + _PROFILE_WEIGHT * (elapsed - previous)
+
+
+async def wait_for_content(page, url: str, max_wait: float = 5.0,
+                           min_chars: int = SCRAPE_READY_MIN_CHARS,
+                           poll_interval: float = SCRAPE_READY_POLL_INTERVAL,
+                           stable_polls: int = SCRAPE_READY_STABLE_POLLS) -> float:
+    """
+    Wait until a page's main content has rendered.
+
+    Returns early when <article>/<main> holds at least min_chars characters, or
+    when the content length has not changed for stable_polls polls (but not
+    before half of the domain's learned wait). Never waits longer than max_wait.
+
+    Args:
+        page: Playwright page that has started loading url
+        url: Page URL (used for the per-domain profile)
+        max_wait: Hard cap in seconds
+        min_chars: Main-content length that counts as ready immediately
+        poll_interval: Seconds between polls
+        stable_polls: Unchanged polls in a row that count as ready
+
+    Returns:
+        Seconds waited
+    """
+    start = time.monotonic()
+    min_settle = min(get_wait_profile(url) * 0.5, max_wait)
+    last_length = -1
+    unchanged = 0
+
+    while True:
+        elapsed = time.monotonic() - start
+        if elapsed >= max_wait:
+            break
+
+        try:
+            length, in_main = await page.evaluate(_CONTENT_LENGTH_JS)
+        except Exception:
+            # Navigation still replacing the document - try again next poll
+            length, in_main = 0, False
+
+        if in_main and length >= min_chars:
+            break
+
+        if length > 0 and length == last_length:
+            unchanged += 1
+            if unchanged >= stable_polls and elapsed >= min_settle:
+                break
+        else:
+            unchanged = 0
+        last_length = length
+
+        await asyncio.sleep(poll_interval)
+
+    elapsed = time.monotonic() - start
+    _record(url, elapsed)
+    return elapsed
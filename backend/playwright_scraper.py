@@ -3,10 +3,13 @@ Playwright-based web scraper using Chrome for JavaScript rendering.
 Solves the issue with JavaScript-heavy websites (SPAs).
 """
 
-import asyncio
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
-from bs4 import BeautifulSoup
 from typing import Dict, Optional, Any
+from browser_pool import get_browser_pool
+from page_readiness import wait_for_content
+from resource_filter import install_resource_filter
+from text_extract import extract_text, extract_in_browser
+from config import SCRAPE_EXTRACT_IN_BROWSER, SCRAPE_MAX_CHARS
 
 
 class PlaywrightScraper:
@@ -35,6 +38,7 @@ class PlaywrightScraper:
         self.context = await self.browser.new_context(
             user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         )
+        await install_resource_filter(self.context)
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -52,7 +56,7 @@ class PlaywrightScraper:
         
         Args:
             url: URL to scrape
-            wait_time: Time to wait after page load (seconds) - increased for JS-heavy sites
+            wait_time: Maximum time to wait for content after page load (seconds)
             wait_for_selector: Optional CSS selector to wait for
             
         Returns:
@@ -61,20 +65,26 @@ class PlaywrightScraper:
         if not self.context:
             raise RuntimeError("Scraper not initialized. Use 'async with PlaywrightScraper() as scraper:'")
         
+        page = await self.context.new_page()
+        try:
+            return await self.scrape_page(page, url, wait_time=wait_time, wait_for_selector=wait_for_selector)
+        finally:
+            await page.close()
+    
+    async def scrape_page(self, page, url: str, wait_time: float = 5.0, wait_for_selector: Optional[str] = None,
+                          max_chars: int = SCRAPE_MAX_CHARS) -> Dict[str, Any]:
+        """
+        Scrape a URL in an already open page (e.g. one borrowed from the browser pool).
+        The caller owns the page and closes it. Text extraction stops after max_chars.
+        """
         try:
-            # Create a new page
-            page = await self.context.new_page()
-            
             # Navigate to URL
             print(f"      → Navigating with Chrome...")
             try:
-                # Wait for networkidle, then load state for maximum JS rendering
-                await page.goto(url, wait_until='networkidle', timeout=self.timeout)
-                await page.wait_for_load_state('networkidle')  # Extra wait for JS
+                # Don't wait for networkidle - readiness is judged by the content itself
+                await page.goto(url, wait_until='domcontentloaded', timeout=self.timeout)
             except PlaywrightTimeout:
-                print(f"      ⚠️  Network idle timeout, but page may have loaded")
-                await page.wait_for_load_state('domcontentloaded')
-                await page.wait_for_load_state('load')  # Wait for full page load
+                print(f"      ⚠️  Navigation timeout, but page may have loaded")
             
             # Wait for specific selector if provided
             if wait_for_selector:
@@ -83,37 +93,24 @@ class PlaywrightScraper:
                 except PlaywrightTimeout:
                     print(f"      ⚠️  Selector not found, continuing anyway")
             
-            # Additional wait for JavaScript to execute
+            # Wait for JavaScript to render the main content (wait_time is the cap)
             if wait_time > 0:
-                print(f"      → Waiting {wait_time}s for JavaScript...")
-                await asyncio.sleep(wait_time)
-            
-            # Get page content
-            print(f"      → Extracting rendered content...")
-            html_content = await page.content()
+                waited = await wait_for_content(page, url, max_wait=wait_time)
+                print(f"      → Content ready after {waited:.1f}s")
             
-            # Close the page
-            await page.close()
-            
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-                element.decompose()
+            # Extract in the page so the full HTML never has to cross CDP
+            text = ''
+            if SCRAPE_EXTRACT_IN_BROWSER:
+                try:
+                    text = await extract_in_browser(page, max_chars)
+                except Exception:
+                    text = ''
             
-            # Extract main content
-            main_content = (
-                soup.find('article') or 
-                soup.find('main') or 
-                soup.find('div', class_=['content', 'article', 'post']) or
-                soup.body
-            )
+            if not text:
+                print(f"      → Extracting rendered content...")
+                text = extract_text(await page.content(), max_chars=max_chars)
             
-            if main_content:
-                text = main_content.get_text(separator=' ', strip=True)
-                text = ' '.join(text.split())
-                
+            if text:
                 return {
                     "status": "success",
                     "content": text,
@@ -122,20 +119,6 @@ class PlaywrightScraper:
                     "method": "playwright_chrome"
                 }
             
-            # Fallback: use body text
-            if soup.body:
-                text = soup.body.get_text(separator=' ', strip=True)
-                text = ' '.join(text.split())
-                
-                if len(text) > 100:  # Minimum content threshold
-                    return {
-                        "status": "success",
-                        "content": text,
-                        "length": len(text),
-                        "url": url,
-                        "method": "playwright_chrome"
-                    }
-            
             return {
                 "status": "error",
                 "error": "No content found",
@@ -162,18 +145,21 @@ def scrape_with_playwright(url: str, wait_time: float = 5.0) -> Dict[str, Any]:
     
     Args:
         url: URL to scrape
-        wait_time: Time to wait after page load (seconds) - increased for JS-heavy sites
+        wait_time: Maximum time to wait for content after page load (seconds)
         
     Returns:
         Dictionary with status and content
     """
+    pool = get_browser_pool()
+    
     async def _scrape():
-        async with PlaywrightScraper(headless=True) as scraper:
-            return await scraper.scrape_url(url, wait_time=wait_time)
+        # Pooled Chrome stays running between calls
+        async with pool.page('chrome') as page:
+            return await PlaywrightScraper(headless=True).scrape_page(page, url, wait_time=wait_time)
     
-    # Run async function
+    # Run on the pool's event loop
     try:
-        return asyncio.run(_scrape())
+        return pool.run(_scrape())
     except Exception as e:
         return {
             "status": "failed",
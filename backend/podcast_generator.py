@@ -1,11 +1,32 @@
 """Core podcast conversation generator."""
-from typing import Dict, List, Optional
+import threading
+import time
+from typing import Callable, Dict, List, Optional
 from claude_client import ClaudeClient
 from memory_manager import MemoryManager
 from lightpanda_scraper import LightpandaScraper
-from config import AVAILABLE_SPONSORS, SANITY_SAVE_EPISODES
+from step_graph import StepGraph
+from script_lint import lint_script
+from config import (
+    AVAILABLE_SPONSORS, SANITY_SAVE_EPISODES, SANITY_ASYNC_WRITES, GENERATE_MAX_PARALLEL_STEPS,
+    GENERATE_PREP_DEADLINE, GENERATE_DRAFT_DEADLINE, GENERATE_CRITIQUE_DEADLINE, CLAUDE_HEDGE_AFTER,
+    GENERATION_QUALITY_MODES, GENERATION_QUALITY_MODE
+)
+from retry_policy import CLASSIFY_RETRY, stage_deadline
 import re
 
+# Appended to the draft prompt in 'single_pass' mode so one call does the
+# critic's job too (same criteria as critique_and_improve)
+SELF_CRITIQUE_NOTE = """
+Before answering, write a draft in your head and critique it as a harsh podcast critic would:
+1. Does the sponsor mention feel natural and unforced, not like an advertisement?
+2. Is the dialogue realistic and engaging?
+3. Do Alex and Maya have distinct voices?
+4. Is the flow conversational without awkward transitions?
+5. Does it explore the topic deeply without being repetitive?
+Fix every issue you find and output only the improved version.
+"""
+
 
 class PodcastGenerator:
     """Generates natural podcast conversations with embedded sponsors."""
@@ -16,6 +37,10 @@ class PodcastGenerator:
         self.scraper = LightpandaScraper()
         self.use_smart_scraping = use_smart_scraping
         
+        # Script-writing latency and tokens per quality mode (see quality_summary)
+        self.quality_stats = {}
+        self._quality_lock = threading.Lock()
+        
         if use_smart_scraping:
             from smart_scraper import SmartScraper
             self.smart_scraper = SmartScraper()
@@ -61,7 +86,12 @@ Sponsor descriptions:
 Select the MOST relevant sponsor for this topic. Return ONLY the sponsor name, nothing else."""
         
         try:
-            sponsor = self.claude.generate(prompt, temperature=0.3, max_tokens=50).strip()
+            sponsor = self.claude.generate(
+                prompt, temperature=0.3, max_tokens=50, memoize=True,
+                retry=CLASSIFY_RETRY, hedge_after=CLAUDE_HEDGE_AFTER,
+                # Only remember replies that name a sponsor we offered
+                validate=lambda text: any(s.lower() in text.lower() for s in available)
+            ).strip()
             # Extract just the sponsor name
             for s in available:
                 if s.lower() in sponsor.lower():
@@ -73,8 +103,18 @@ Select the MOST relevant sponsor for this topic. Return ONLY the sponsor name, n
     
     def generate_initial_conversation(self, topic: str, context: str, 
                                      sponsor: str, memory_summary: Dict, 
-                                     previous_script: Optional[str] = None) -> str:
-        """Generate the initial podcast conversation."""
+                                     previous_script: Optional[str] = None,
+                                     self_critique: bool = False,
+                                     on_line: Optional[Callable[[str], None]] = None,
+                                     metadata: Optional[Dict] = None) -> str:
+        """
+        Generate the initial podcast conversation.
+        
+        If self_critique is set, the model reviews and revises its draft before
+        answering, so the result can be used without a separate critique pass.
+        If on_line is given, the conversation is streamed line by line.
+        metadata, if given, is filled with the call's stop_reason and usage.
+        """
         
         system_prompt = """You are a master podcast script writer. You create natural, engaging conversations between two hosts.
 
@@ -134,18 +174,39 @@ The conversation should:
 - Wrap sponsor name with *sponsor* markers: *sponsor*{sponsor}*sponsor*
 - Avoid repetitive patterns from recent episodes
 {'- Continue naturally from the previous conversation' if previous_script else ''}
-
+{SELF_CRITIQUE_NOTE if self_critique else ''}
 Generate the conversation now. ONLY output the dialogue lines."""
 
-        return self.claude.generate(
+        if on_line:
+            return self._stream_lines(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                max_tokens=3000,
+                temperature=0.8,
+                on_line=on_line,
+                metadata=metadata
+            )
+
+        response = self.claude.generate_with_metadata(
             prompt=prompt,
             system_prompt=system_prompt,
             max_tokens=3000,
             temperature=0.8
         )
+        if metadata is not None:
+            metadata.update(stop_reason=response['stop_reason'], usage=response['usage'])
+        return response['text']
     
-    def critique_and_improve(self, conversation: str, topic: str, sponsor: str) -> str:
-        """Critique the conversation and generate an improved version."""
+    def critique_and_improve(self, conversation: str, topic: str, sponsor: str,
+                             on_line: Optional[Callable[[str], None]] = None,
+                             metadata: Optional[Dict] = None) -> str:
+        """
+        Critique the conversation and generate an improved version.
+        
+        If on_line is given, the improved version is streamed and each complete
+        line is passed to on_line as soon as it arrives. metadata, if given, is
+        filled with the call's stop_reason and usage.
+        """
         
         system_prompt = """You are a harsh but constructive podcast critic. Your job is to:
 1. Analyze the conversation for naturalness, flow, and sponsor integration
@@ -183,12 +244,133 @@ IMPORTANT: Preserve all *sponsor* markers. If sponsor was marked as *sponsor*Spo
 
 No explanations. No labels. Just the improved dialogue."""
 
-        return self.claude.generate(
+        if on_line:
+            return self._stream_lines(
+                prompt=prompt,
+                system_prompt=system_prompt,
+                max_tokens=3500,
+                temperature=0.7,
+                on_line=on_line,
+                metadata=metadata
+            )
+
+        response = self.claude.generate_with_metadata(
             prompt=prompt,
             system_prompt=system_prompt,
             max_tokens=3500,
             temperature=0.7
         )
+        if metadata is not None:
+            metadata.update(stop_reason=response['stop_reason'], usage=response['usage'])
+        return response['text']
+    
+    def _critique_or_keep_draft(self, conversation: str, topic: str, sponsor: str,
+                                on_line: Optional[Callable[[str], None]] = None,
+                                metadata: Optional[Dict] = None) -> str:
+        """
+        Run critique_and_improve within its stage deadline.
+        
+        If it fails (after retries) before any improved line was handed to
+        on_line, the draft is used instead, so scraping and drafting aren't
+        thrown away over one overloaded call.
+        """
+        streamed = []
+        
+        def forward(line: str):
+            streamed.append(line)
+            on_line(line)
+        
+        try:
+            with stage_deadline(GENERATE_CRITIQUE_DEADLINE, 'critique'):
+                return self.critique_and_improve(
+                    conversation, topic, sponsor, on_line=forward if on_line else None,
+                    metadata=metadata
+                )
+        except Exception as e:
+            if streamed:
+                # Part of the improved script is already out (e.g. being voiced)
+                raise
+            print(f"⚠️  Critique failed ({e}), keeping the draft")
+            self._emit_lines(conversation, on_line)
+            return conversation
+    
+    @staticmethod
+    def _emit_lines(conversation: str, on_line: Optional[Callable[[str], None]]):
+        """Hand an already generated script to on_line, one line at a time."""
+        if on_line:
+            for line in conversation.split('\n'):
+                if line.strip():
+                    on_line(line.strip())
+    
+    def _stream_lines(self, prompt: str, system_prompt: str, max_tokens: int,
+                      temperature: float, on_line: Callable[[str], None],
+                      metadata: Optional[Dict] = None) -> str:
+        """Stream a Claude response, calling on_line for each complete line. Returns the full text."""
+        chunks = []
+        pending = ''
+        
+        for text in self.claude.generate_streaming(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            metadata=metadata
+        ):
+            chunks.append(text)
+            pending += text
+            while '\n' in pending:
+                line, pending = pending.split('\n', 1)
+                if line.strip():
+                    on_line(line.strip())
+        
+        if pending.strip():
+            on_line(pending.strip())
+        
+        return ''.join(chunks)
+    
+    @staticmethod
+    def _record_pass(quality: Dict, stage: str, started: float, metadata: Dict):
+        """Add a script-writing call's latency and token usage to an episode's quality report."""
+        usage = metadata.get('usage') or {}
+        quality['passes'].append({
+            'stage': stage,
+            'seconds': round(time.time() - started, 2),
+            'input_tokens': usage.get('input_tokens', 0),
+            'output_tokens': usage.get('output_tokens', 0),
+            'cache_read_input_tokens': usage.get('cache_read_input_tokens', 0)
+        })
+        for key in ('seconds', 'input_tokens', 'output_tokens'):
+            quality[key] = round(sum(p[key] for p in quality['passes']), 2)
+    
+    def _update_quality_stats(self, quality: Dict):
+        with self._quality_lock:
+            stats = self.quality_stats.setdefault(quality['mode'], {
+                'episodes': 0, 'critiqued': 0, 'seconds': 0.0, 'input_tokens': 0, 'output_tokens': 0
+            })
+            stats['episodes'] += 1
+            stats['critiqued'] += int(quality['critiqued'])
+            for key in ('seconds', 'input_tokens', 'output_tokens'):
+                stats[key] += quality[key]
+    
+    def quality_summary(self) -> Dict[str, Dict]:
+        """
+        Compare quality modes used by this generator.
+        
+        Returns:
+            Per mode: episodes generated, share that went through critique, and
+            average script-writing seconds and input/output tokens per episode
+        """
+        with self._quality_lock:
+            return {
+                mode: {
+                    'episodes': stats['episodes'],
+                    'critique_rate': round(stats['critiqued'] / stats['episodes'], 2),
+                    'avg_seconds': round(stats['seconds'] / stats['episodes'], 2),
+                    'avg_input_tokens': round(stats['input_tokens'] / stats['episodes']),
+                    'avg_output_tokens': round(stats['output_tokens'] / stats['episodes'])
+                }
+                for mode, stats in self.quality_stats.items()
+            }
     
     def extract_key_phrases(self, conversation: str) -> List[str]:
         """Extract key phrases from conversation to store in memory."""
@@ -229,12 +411,14 @@ Return ONLY a comma-separated list of tags, nothing else.
 Example: ai,technology,machine-learning,innovation"""
 
         try:
-            tags_str = self.claude.generate(prompt, temperature=0.3, max_tokens=100).strip()
-            # Parse tags
-            tags = [tag.strip().lower() for tag in tags_str.split(',') if tag.strip()]
-            # Limit to 5 tags and remove duplicates
-            unique_tags = list(dict.fromkeys(tags))[:5]
-            return unique_tags
+            tags_str = self.claude.generate(
+                prompt, temperature=0.3, max_tokens=100, memoize=True,
+                retry=CLASSIFY_RETRY, hedge_after=CLAUDE_HEDGE_AFTER,
+                # Only remember replies that look like a tag list, not prose
+                validate=lambda text: bool(self._parse_tags(text)) and all(
+                    len(tag.split()) <= 3 for tag in self._parse_tags(text))
+            ).strip()
+            return self._parse_tags(tags_str)
         except Exception as e:
             print(f"⚠️  Failed to extract tags: {e}")
             # Fallback: simple keyword extraction
@@ -244,9 +428,18 @@ Example: ai,technology,machine-learning,innovation"""
             tags = [w for w in words if w not in stop_words and len(w) > 3][:5]
             return tags
     
+    @staticmethod
+    def _parse_tags(tags_str: str) -> List[str]:
+        """Parse a comma-separated tag reply (lowercased, deduplicated, at most 5)."""
+        tags = [tag.strip().lower() for tag in tags_str.strip().split(',') if tag.strip()]
+        return list(dict.fromkeys(tags))[:5]
+    
     def generate(self, topic: str, real_world_context: Optional[str] = None,
                  force_sponsor: Optional[str] = None, previous_script: Optional[str] = None,
-                 sequence_id: Optional[str] = None, sequence_index: Optional[int] = None) -> Dict[str, str]:
+                 sequence_id: Optional[str] = None, sequence_index: Optional[int] = None,
+                 on_line: Optional[Callable[[str], None]] = None,
+                 on_event: Optional[Callable[[str, Dict], None]] = None,
+                 quality_mode: Optional[str] = None) -> Dict[str, str]:
         """
         Main generation pipeline.
         
@@ -257,112 +450,200 @@ Example: ai,technology,machine-learning,innovation"""
             previous_script: Optional previous conversation script for continuation
             sequence_id: Optional sequence ID for grouping related episodes
             sequence_index: Optional index in the sequence (0-based)
+            on_line: Optional callback receiving each line of the final script as it
+                is streamed (e.g. to start text-to-speech before generation finishes)
+            on_event: Optional callback receiving (event_type, data) at each stage,
+                used to report progress to clients
+            quality_mode: Optional override of GENERATION_QUALITY_MODE ('single_pass',
+                'lint' or 'two_pass')
         
         Returns:
             Dict with conversation and metadata
         """
-        # Extract tags from topic
-        tags = self.extract_tags_from_topic(topic)
-        print(f"🏷️  Extracted tags: {tags}")
+        quality_mode = quality_mode or GENERATION_QUALITY_MODE
+        if quality_mode not in GENERATION_QUALITY_MODES:
+            raise ValueError(f"Invalid quality mode '{quality_mode}'. "
+                             f"Must be one of: {', '.join(GENERATION_QUALITY_MODES)}")
+        emit = on_event or (lambda event_type, data: None)
         
-        # Check for existing context in Sanity
-        existing_context = None
-        existing_scraped_data = []
-        if self.sanity:
-            # Search for episodes with similar tags
-            similar_episodes = self.sanity.get_episodes_by_tags(tags, limit=3)
-            if similar_episodes:
-                print(f"📚 Found {len(similar_episodes)} similar episodes with matching tags")
-                # Get scraped data from similar episodes
-                existing_scraped_data = self.sanity.get_scraped_data_by_tags(tags, limit=5)
-                if existing_scraped_data:
-                    print(f"📊 Found {len(existing_scraped_data)} pieces of scraped content from similar episodes")
-                    # Combine existing scraped content
-                    existing_context_parts = []
-                    for item in existing_scraped_data[:3]:  # Use top 3
-                        content_snippet = item.get('content', '')[:500]
-                        if content_snippet:
-                            existing_context_parts.append(f"From {item.get('source', 'previous episode')}: {content_snippet}")
-                    if existing_context_parts:
-                        existing_context = "\n\n".join(existing_context_parts)
-                        print(f"📚 Using existing context from similar episodes")
-            
+        # Independent lookups run concurrently; each step only waits for the
+        # steps it depends on (e.g. Sanity tag lookups wait for tag extraction)
+        graph = StepGraph(max_workers=GENERATE_MAX_PARALLEL_STEPS)
+        
+        def extract_tags():
+            tags = self.extract_tags_from_topic(topic)
+            print(f"🏷️  Extracted tags: {tags}")
+            emit('tags_extracted', {'tags': tags})
+            return tags
+        
+        def find_tag_matches(tags):
+            # Search for episodes with similar tags and reuse their scraped data
+            # (one query serves both)
+            if not self.sanity:
+                return {'episodes': [], 'scraped_data': []}
+            matches = self.sanity.get_tag_context(tags, episode_limit=3, scraped_limit=5)
+            if matches['episodes']:
+                print(f"📚 Found {len(matches['episodes'])} similar episodes with matching tags")
+            if matches['scraped_data']:
+                print(f"📊 Found {len(matches['scraped_data'])} pieces of scraped content from similar episodes")
+            return matches
+        
+        def find_topic_context():
             # Also check by topic (existing logic)
+            if not self.sanity:
+                return None
             topic_context = self.sanity.get_context_for_topic(topic)
             if topic_context:
-                if existing_context:
-                    existing_context = f"{existing_context}\n\nTopic-specific context: {topic_context}"
-                else:
-                    existing_context = topic_context
                 print(f"📚 Found existing context for topic: {topic}")
-            
+            return topic_context
+        
+        def find_sequence_script():
             # Also search for previous scripts in the same sequence
-            if sequence_id:
-                previous_episodes = self.sanity.get_episodes_by_sequence(sequence_id)
-                if previous_episodes:
-                    # Get the most recent previous script
-                    latest_episode = sorted(previous_episodes, key=lambda x: x.get('sequenceIndex', 0))[-1]
-                    if latest_episode.get('conversation'):
-                        previous_script = latest_episode['conversation']
-                        print(f"📜 Found previous script from sequence {sequence_id}")
-        
-        # Get real-world context
-        smart_result = None
-        scraped_data_for_sanity = []
-        if not real_world_context:
+            if not (self.sanity and sequence_id):
+                return None
+            previous_episodes = self.sanity.get_episodes_by_sequence(
+                sequence_id, fields=('sequenceIndex', 'conversation'))
+            if previous_episodes:
+                # Get the most recent previous script
+                latest_episode = sorted(previous_episodes, key=lambda x: x.get('sequenceIndex', 0))[-1]
+                if latest_episode.get('conversation'):
+                    print(f"📜 Found previous script from sequence {sequence_id}")
+                    return latest_episode['conversation']
+            return None
+        
+        def scrape_context():
+            # Get real-world context
+            if real_world_context:
+                return None
             if self.use_smart_scraping and hasattr(self, 'smart_scraper'):
                 print(f"🧠 Using intelligent scraping for: {topic}")
-                smart_result = self.smart_scraper.get_intelligent_context(topic)
-                new_context = smart_result['context']
+                smart_result = self.smart_scraper.get_intelligent_context(topic, on_event=on_event)
+                if isinstance(smart_result, str):
+                    # No targets found - smart scraper returned fallback text
+                    return {'context': smart_result}
+                return smart_result
+            print(f"🌍 Gathering real-world context about: {topic}")
+            return {'context': self.scraper.get_context(topic)}
+        
+        def select_sponsor(memory_summary):
+            if force_sponsor and force_sponsor in AVAILABLE_SPONSORS:
+                sponsor = force_sponsor
+            else:
+                sponsor = self.select_sponsor(topic, memory_summary.get('recent_sponsors', []))
+            print(f"🎯 Selected sponsor: {sponsor}")
+            emit('sponsor_selected', {'sponsor': sponsor})
+            return sponsor
+        
+        graph.add('tags', extract_tags)
+        graph.add('tag_matches', find_tag_matches, deps=['tags'])
+        graph.add('topic_context', find_topic_context)
+        graph.add('sequence_script', find_sequence_script)
+        graph.add('scrape', scrape_context)
+        graph.add('memory_summary', self.memory.get_memory_summary)
+        graph.add('sponsor', select_sponsor, deps=['memory_summary'])
+        
+        with stage_deadline(GENERATE_PREP_DEADLINE, 'pre-generation'):
+            steps = graph.run()
+        print(f"⏱️  Pre-generation steps: {graph.summary()}")
+        
+        tags = steps['tags']
+        existing_scraped_data = steps['tag_matches']['scraped_data']
+        memory_summary = steps['memory_summary']
+        sponsor = steps['sponsor']
+        if steps['sequence_script']:
+            previous_script = steps['sequence_script']
+        
+        # Combine existing scraped content
+        existing_context = None
+        existing_context_parts = []
+        for item in existing_scraped_data[:3]:  # Use top 3
+            content_snippet = item.get('content', '')[:500]
+            if content_snippet:
+                existing_context_parts.append(f"From {item.get('source', 'previous episode')}: {content_snippet}")
+        if existing_context_parts:
+            existing_context = "\n\n".join(existing_context_parts)
+            print(f"📚 Using existing context from similar episodes")
+        
+        topic_context = steps['topic_context']
+        if topic_context:
+            if existing_context:
+                existing_context = f"{existing_context}\n\nTopic-specific context: {topic_context}"
+            else:
+                existing_context = topic_context
+        
+        smart_result = None
+        scraped_data_for_sanity = []
+        if steps['scrape']:
+            new_context = steps['scrape']['context']
+            if 'sources' in steps['scrape']:
+                smart_result = steps['scrape']
                 scraped_data_for_sanity = smart_result.get('scraped_data', [])
-                
-                # Combine existing and new context
-                if existing_context:
-                    # Add existing scraped data to new scraping
-                    if existing_scraped_data:
-                        scraped_data_for_sanity.extend(existing_scraped_data[:3])  # Include top 3 from similar episodes
-                    real_world_context = f"{existing_context}\n\nRecent updates: {new_context}"
-                    print(f"🔄 Combined existing context with new scraping data")
-                else:
-                    real_world_context = new_context
-                
                 print(f"\n📊 Scraped from {len(smart_result.get('sources', []))} intelligent targets")
+            
+            # Combine existing and new context
+            if existing_context:
+                if smart_result and existing_scraped_data:
+                    # Add existing scraped data to new scraping
+                    scraped_data_for_sanity.extend(existing_scraped_data[:3])  # Include top 3 from similar episodes
+                real_world_context = f"{existing_context}\n\nRecent updates: {new_context}"
+                print(f"🔄 Combined existing context with new scraping data")
             else:
-                print(f"🌍 Gathering real-world context about: {topic}")
-                new_context = self.scraper.get_context(topic)
-                
-                # Combine existing and new context
-                if existing_context:
-                    real_world_context = f"{existing_context}\n\nRecent updates: {new_context}"
-                else:
-                    real_world_context = new_context
+                real_world_context = new_context
         
-        # Get memory
-        memory_summary = self.memory.get_memory_summary()
-        recent_sponsors = memory_summary.get('recent_sponsors', [])
-        
-        # Select sponsor
-        if force_sponsor and force_sponsor in AVAILABLE_SPONSORS:
-            sponsor = force_sponsor
-        else:
-            sponsor = self.select_sponsor(topic, recent_sponsors)
+        emit('context_ready', {
+            'characters': len(real_world_context or ''),
+            'sources': len(smart_result.get('sources', [])) if smart_result else 0
+        })
         
-        print(f"🎯 Selected sponsor: {sponsor}")
         print(f"📝 Context snippet: {real_world_context[:150]}...")
         
         # Generate initial conversation
-        print(f"🎙️  Generating conversation...")
+        print(f"🎙️  Generating conversation ({quality_mode})...")
         if previous_script:
             print(f"📜 Using previous script for continuation")
-        initial_conversation = self.generate_initial_conversation(
-            topic, real_world_context, sponsor, memory_summary, previous_script
-        )
+        quality = {'mode': quality_mode, 'critiqued': False, 'lint_issues': None, 'passes': []}
+        single_pass = quality_mode == 'single_pass'
+        draft_metadata = {}
+        started = time.time()
+        with stage_deadline(GENERATE_DRAFT_DEADLINE, 'draft'):
+            # A single-pass draft is the final script, so stream it straight out
+            initial_conversation = self.generate_initial_conversation(
+                topic, real_world_context, sponsor, memory_summary, previous_script,
+                self_critique=single_pass, on_line=on_line if single_pass else None,
+                metadata=draft_metadata
+            )
+        self._record_pass(quality, 'draft', started, draft_metadata)
         
-        # Self-improve
-        print(f"🧠 Self-improving conversation...")
-        improved_conversation = self.critique_and_improve(
-            initial_conversation, topic, sponsor
-        )
+        emit('draft_ready', {'conversation': initial_conversation})
+        
+        critique = quality_mode == 'two_pass'
+        if quality_mode == 'lint':
+            quality['lint_issues'] = lint_script(initial_conversation, sponsor, draft_metadata.get('stop_reason'))
+            critique = bool(quality['lint_issues'])
+            if critique:
+                print(f"🔎 Draft flagged: {'; '.join(quality['lint_issues'])}")
+            else:
+                print(f"🔎 Draft passed local checks, skipping critique")
+        
+        if critique:
+            # Self-improve
+            print(f"🧠 Self-improving conversation...")
+            critique_metadata = {}
+            started = time.time()
+            improved_conversation = self._critique_or_keep_draft(
+                initial_conversation, topic, sponsor, on_line=on_line, metadata=critique_metadata
+            )
+            self._record_pass(quality, 'critique', started, critique_metadata)
+            quality['critiqued'] = 'usage' in critique_metadata
+        else:
+            improved_conversation = initial_conversation
+            if not single_pass:
+                self._emit_lines(improved_conversation, on_line)
+        
+        self._update_quality_stats(quality)
+        print(f"⏱️  Script ({quality_mode}): {quality['seconds']}s, "
+              f"{quality['input_tokens']} input / {quality['output_tokens']} output tokens")
+        emit('script_ready', {'conversation': improved_conversation})
         
         # Store in memory
         self.memory.add_sponsor(sponsor)
@@ -384,7 +665,9 @@ Example: ai,technology,machine-learning,innovation"""
             'is_continuation': previous_script is not None,
             'sequence_id': sequence_id,
             'sequence_index': sequence_index,
-            'tags': tags
+            'tags': tags,
+            'timings': graph.timings,  # Per-step timings of the pre-generation graph
+            'quality': quality  # Quality mode with per-pass latency and tokens
         }
         
         # Add sources and scraped data if available from smart scraping
@@ -397,11 +680,18 @@ Example: ai,technology,machine-learning,innovation"""
         
         # Save to Sanity CMS if enabled
         if self.sanity and self.sanity.enabled:
-            print("\n💾 Saving episode to Sanity CMS...")
-            sanity_result = self.sanity.save_episode(result)
+            if SANITY_ASYNC_WRITES:
+                # Written by the background outbox writer, off the request path
+                sanity_result = self.sanity.queue_episode(result)
+            else:
+                print("\n💾 Saving episode to Sanity CMS...")
+                sanity_result = self.sanity.save_episode(result)
             if sanity_result.get('success'):
                 document_id = sanity_result.get('document_id', 'unknown')
-                print(f"✅ Episode saved to Sanity! Document ID: {document_id}")
+                if sanity_result.get('status') == 'queued':
+                    print(f"💾 Episode queued for Sanity. Document ID: {document_id}")
+                else:
+                    print(f"✅ Episode saved to Sanity! Document ID: {document_id}")
                 result['sanity_document_id'] = document_id
             else:
                 error_msg = sanity_result.get('error', 'Unknown error')
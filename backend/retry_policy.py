@@ -0,0 +1,126 @@
+"""
+Retry policies and stage deadlines for outbound API calls.
+A RetryPolicy decides which errors are worth retrying and how long to wait
+(exponential backoff with full jitter, so callers that failed together don't
+retry together). A stage deadline bounds a whole pipeline stage: calls made
+inside it shorten their timeouts to the time left and stop retrying once a
+retry could no longer finish in time.
+"""
+import contextvars
+import random
+import time
+from contextlib import contextmanager
+from typing import Optional
+import anthropic
+from config import CLAUDE_MAX_RETRIES, CLAUDE_RETRY_BASE_DELAY, CLAUDE_RETRY_MAX_DELAY
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar('stage_deadline', default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a stage runs out of time before or between calls."""
+
+
+@contextmanager
+def stage_deadline(seconds: Optional[float], stage: str = 'stage'):
+    """
+    Bound the calls made inside the block (including step graph steps started from it).
+
+    Nested deadlines never extend an outer one.
+
+    Args:
+        seconds: Time budget for the stage (None for no deadline)
+        stage: Name used in DeadlineExceeded messages
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.time() + seconds
+    outer = _deadline.get()
+    if outer and outer[0] < deadline:
+        deadline, stage = outer
+    token = _deadline.set((deadline, stage))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left() -> Optional[float]:
+    """
+    Seconds left in the current stage.
+
+    Returns:
+        None outside a stage deadline
+
+    Raises:
+        DeadlineExceeded: If the deadline has passed
+    """
+    current = _deadline.get()
+    if current is None:
+        return None
+    deadline, stage = current
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise DeadlineExceeded(f"{stage} deadline exceeded")
+    return remaining
+
+
+class RetryPolicy:
+    """When and how long to wait before retrying a failed Claude call."""
+
+    def __init__(self, max_retries: int = CLAUDE_MAX_RETRIES, base_delay: float = CLAUDE_RETRY_BASE_DELAY,
+                 max_delay: float = CLAUDE_RETRY_MAX_DELAY, retry_statuses=(408, 409, 429)):
+        """
+        Initialize a policy.
+
+        Args:
+            max_retries: Retries after the first attempt
+            base_delay: Backoff ceiling for the first retry (doubles each retry)
+            max_delay: Largest backoff ceiling
+            retry_statuses: 4xx statuses worth retrying (5xx and connection errors always are)
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = tuple(retry_statuses)
+
+    def is_retryable(self, error: Exception) -> bool:
+        """Check whether an error is transient (timeouts, overload, 5xx, 429...)."""
+        if isinstance(error, anthropic.APIConnectionError):  # Includes APITimeoutError
+            return True
+        if isinstance(error, anthropic.APIStatusError):
+            return error.status_code >= 500 or error.status_code in self.retry_statuses
+        return False
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number attempt + 1."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def next_delay(self, error: Exception, attempt: int, min_delay: float = 0.0) -> Optional[float]:
+        """
+        Decide whether to retry after a failure.
+
+        Args:
+            error: The failure
+            attempt: Retries already made
+            min_delay: Wait the server asked for (e.g. retry-after), if any
+
+        Returns:
+            Seconds to wait before retrying, or None to give up
+        """
+        if attempt >= self.max_retries or not self.is_retryable(error):
+            return None
+        delay = max(min_delay, self.backoff(attempt))
+        remaining = time_left()
+        if remaining is not None and delay >= remaining:
+            # Waiting would use up the stage's time; fail now
+            return None
+        return delay
+
+
+# Long generations: a failure costs the whole pipeline, so retry patiently
+DEFAULT_RETRY = RetryPolicy()
+
+# Short classification calls are hedged; one quick retry is enough
+CLASSIFY_RETRY = RetryPolicy(max_retries=1, base_delay=0.5, max_delay=2.0)
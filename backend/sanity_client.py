@@ -1,9 +1,22 @@
 """Sanity CMS client for storing and retrieving podcast episodes."""
+import json
 import requests
 import os
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence
 from datetime import datetime
 from config import SANITY_PROJECT_ID, SANITY_DATASET, SANITY_API_TOKEN, SANITY_SAVE_EPISODES
+from http_session import get_session
+
+# Projection for listing episodes: everything except the large text fields
+# (conversation, previousScript, contextSummarized, scrapedContent)
+EPISODE_SUMMARY_FIELDS = (
+    '_id', '_createdAt', 'topic', 'sponsor', 'generatedAt', 'tags', 'sourceUrls',
+    'contextUsed', 'sequenceId', 'sequenceIndex', 'isContinuation', 'scrapedSourcesCount'
+)
+
+# Projection for reusing scraped data from earlier episodes
+SCRAPED_CONTENT_FIELD = 'scrapedContent[]{source, url, content, method}'
+EPISODE_SCRAPED_FIELDS = ('_id', 'topic', SCRAPED_CONTENT_FIELD)
 
 
 class SanityClient:
@@ -17,6 +30,7 @@ class SanityClient:
             verbose: Enable verbose logging
         """
         self.verbose = verbose
+        self.session = get_session('sanity')
         
         if not SANITY_PROJECT_ID or not SANITY_API_TOKEN:
             self.enabled = False
@@ -44,39 +58,26 @@ class SanityClient:
     
     def _test_connection(self):
         """Test Sanity connection."""
-        query = '*[_type == "episode"] | order(_createdAt desc) [0...1]'
+        query = '*[_type == "episode"] | order(_createdAt desc) [0...1] {_id}'
         url = f"{self.base_url}/data/query/{self.dataset}"
         headers = {
             "Authorization": f"Bearer {self.api_token}"
         }
         params = {"query": query}
         
-        response = requests.get(url, headers=headers, params=params, timeout=5)
+        response = self.session.get(url, headers=headers, params=params, timeout=5)
         response.raise_for_status()
         
-    def save_episode(self, episode_data: Dict) -> Dict:
+    def build_episode_document(self, episode_data: Dict) -> Dict:
         """
-        Save a podcast episode to Sanity.
-        This will auto-create the schema if it doesn't exist.
+        Build the Sanity document for an episode, including its generated _id.
         
         Args:
-            episode_data: Dictionary with episode information
-                - topic: str
-                - conversation: str
-                - sponsor: str
-                - context_used: str (optional)
-                - sources: list (optional)
-                - scraped_data: dict (optional)
-        
+            episode_data: Dictionary with episode information (see save_episode)
+            
         Returns:
-            Dict with Sanity document ID and status
+            Episode document ready for a create mutation
         """
-        if not self.enabled:
-            return {
-                "success": False,
-                "error": "Sanity not enabled or not configured"
-            }
-        
         # Prepare episode document
         # Note: Sanity will auto-create schema from first document if schema doesn't exist
         episode_doc = {
@@ -127,28 +128,106 @@ class SanityClient:
         # Sanity format: lowercase alphanumeric, 32 chars
         import hashlib
         topic_hash = hashlib.md5(episode_doc.get('topic', '').encode()).hexdigest()
-        timestamp = episode_doc.get('generatedAt', '').replace('-', '').replace(':', '').replace('.', '')[:14]
-        doc_id = f"episode-{topic_hash[:16]}-{timestamp[:8]}"
+        timestamp = episode_doc.get('generatedAt', '').replace('-', '').replace(':', '').replace('.', '')[:15]
+        # Date and time to the second, so two episodes on one topic in a day don't collide
+        doc_id = f"episode-{topic_hash[:16]}-{timestamp.lower().replace('t', '-')}"
         
         # Add the _id to the document so we know it after creation
         episode_doc["_id"] = doc_id
         
-        mutation = {
-            "mutations": [{
-                "create": episode_doc
-            }]
-        }
+        return episode_doc
+    
+    def mutate(self, mutations: List[Dict], timeout: int = 10) -> Dict:
+        """
+        Send mutations to Sanity as one transaction.
         
+        Args:
+            mutations: Sanity mutations (e.g. [{"create": doc}])
+            timeout: Request timeout in seconds
+            
+        Returns:
+            Sanity response (with 'transactionId')
+            
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+        """
         url = f"{self.base_url}/data/mutate/{self.dataset}"
         headers = {
             "Authorization": f"Bearer {self.api_token}",
             "Content-Type": "application/json"
         }
+        response = self.session.post(url, json={"mutations": mutations}, headers=headers, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+    
+    def queue_episode(self, episode_data: Dict) -> Dict:
+        """
+        Queue an episode for the background writer instead of saving it inline.
+        The write survives restarts and Sanity outages (see sanity_outbox).
+        
+        Args:
+            episode_data: Dictionary with episode information (see save_episode)
+            
+        Returns:
+            Dict with the document ID it will be saved under and status 'queued'
+        """
+        if not self.enabled:
+            return {
+                "success": False,
+                "error": "Sanity not enabled or not configured"
+            }
+        
+        from sanity_outbox import get_sanity_outbox
+        
+        episode_doc = self.build_episode_document(episode_data)
+        try:
+            get_sanity_outbox().enqueue(episode_doc)
+        except Exception as e:
+            if self.verbose:
+                print(f"❌ Sanity outbox write failed: {str(e)}")
+            return {
+                "success": False,
+                "error": f"Outbox error: {str(e)}"
+            }
+        
+        return {
+            "success": True,
+            "document_id": episode_doc["_id"],
+            "status": "queued"
+        }
+    
+    def save_episode(self, episode_data: Dict) -> Dict:
+        """
+        Save a podcast episode to Sanity.
+        This will auto-create the schema if it doesn't exist.
+        
+        Args:
+            episode_data: Dictionary with episode information
+                - topic: str
+                - conversation: str
+                - sponsor: str
+                - context_used: str (optional)
+                - sources: list (optional)
+                - scraped_data: dict (optional)
+        
+        Returns:
+            Dict with Sanity document ID and status
+        """
+        if not self.enabled:
+            return {
+                "success": False,
+                "error": "Sanity not enabled or not configured"
+            }
+        
+        episode_doc = self.build_episode_document(episode_data)
+        doc_id = episode_doc["_id"]
+        
+        headers = {
+            "Authorization": f"Bearer {self.api_token}"
+        }
         
         try:
-            response = requests.post(url, json=mutation, headers=headers, timeout=10)
-            response.raise_for_status()
-            result = response.json()
+            result = self.mutate([{"create": episode_doc}])
             
             # Sanity mutation API returns: {"transactionId": "...", "results": [...]}
             # Document ID is not in response, but we generated it client-side
@@ -160,7 +239,7 @@ class SanityClient:
             params = {"query": verify_query}
             
             try:
-                verify_response = requests.get(query_url, headers=headers, params=params, timeout=5)
+                verify_response = self.session.get(query_url, headers=headers, params=params, timeout=5)
                 if verify_response.status_code == 200:
                     verify_result = verify_response.json()
                     if verify_result.get("result") and len(verify_result.get("result", [])) > 0:
@@ -170,7 +249,7 @@ class SanityClient:
                         # Try querying by topic and timestamp as fallback
                         fallback_query = f'*[_type == "episode" && topic == "{episode_doc["topic"]}" && generatedAt == "{episode_doc["generatedAt"]}"] | order(_createdAt desc) [0]'
                         fallback_params = {"query": fallback_query}
-                        fallback_response = requests.get(query_url, headers=headers, params=fallback_params, timeout=5)
+                        fallback_response = self.session.get(query_url, headers=headers, params=fallback_params, timeout=5)
                         if fallback_response.status_code == 200:
                             fallback_result = fallback_response.json()
                             if fallback_result.get("result") and fallback_result.get("result"):
@@ -226,121 +305,125 @@ class SanityClient:
                 "error": f"Unexpected error: {str(e)}"
             }
     
-    def get_episodes(self, limit: int = 10, topic: Optional[str] = None) -> List[Dict]:
+    def query_episodes(self, condition: Optional[str] = None, params: Optional[Dict] = None,
+                       fields: Optional[Sequence[str]] = EPISODE_SUMMARY_FIELDS,
+                       order: Optional[str] = 'generatedAt desc', limit: Optional[int] = None,
+                       first: bool = False, timeout: int = 10):
         """
-        Query recent episodes from Sanity.
+        Query episodes, fetching only the requested fields.
         
         Args:
-            limit: Number of episodes to retrieve
-            topic: Optional topic filter
+            condition: Optional GROQ filter, ANDed with the episode type check
+                (use $name placeholders for values and pass them in params)
+            params: Values for the $name placeholders in the condition
+            fields: GROQ projection entries (field names, or e.g. 'scrapedContent[]{url, content}');
+                None fetches whole documents
+            order: GROQ ordering (e.g. 'generatedAt desc'), or None
+            limit: Maximum number of episodes
+            first: Return only the first match (a dict or None) instead of a list
+            timeout: Request timeout in seconds
             
         Returns:
-            List of episode documents
+            List of episode dicts, or a single dict/None when first is True
+            
+        Raises:
+            requests.exceptions.RequestException: If the query fails
         """
         if not self.enabled:
-            return []
-        
-        if topic:
-            query = f'*[_type == "episode" && topic match "{topic}*"] | order(generatedAt desc) [0...{limit}]'
-        else:
-            query = f'*[_type == "episode"] | order(generatedAt desc) [0...{limit}]'
+            return None if first else []
+        
+        query = '*[_type == "episode"' + (f' && ({condition})' if condition else '') + ']'
+        if order:
+            query += f' | order({order})'
+        if first:
+            query += ' [0]'
+        elif limit is not None:
+            query += f' [0...{int(limit)}]'
+        if fields is not None:
+            query += ' {' + ', '.join(fields) + '}'
         
         url = f"{self.base_url}/data/query/{self.dataset}"
         headers = {
             "Authorization": f"Bearer {self.api_token}"
         }
-        params = {"query": query}
+        request_params = {"query": query}
+        for name, value in (params or {}).items():
+            # GROQ parameters are passed as JSON-encoded $name query parameters
+            request_params[f"${name}"] = json.dumps(value)
         
+        response = self.session.get(url, headers=headers, params=request_params, timeout=timeout)
+        response.raise_for_status()
+        result = response.json().get("result")
+        if first:
+            return result or None
+        return result or []
+    
+    def get_episodes(self, limit: int = 10, topic: Optional[str] = None,
+                     fields: Optional[Sequence[str]] = EPISODE_SUMMARY_FIELDS) -> List[Dict]:
+        """
+        Query recent episodes from Sanity.
+        
+        Args:
+            limit: Number of episodes to retrieve
+            topic: Optional topic filter
+            fields: Fields to fetch (None for whole documents)
+            
+        Returns:
+            List of episode documents
+        """
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            result = response.json()
-            return result.get("result", [])
+            if topic:
+                return self.query_episodes('topic match $topic', {'topic': f"{topic}*"},
+                                           fields=fields, limit=limit)
+            return self.query_episodes(fields=fields, limit=limit)
         except Exception as e:
             print(f"❌ Error querying Sanity: {e}")
             return []
     
-    def get_episode_by_id(self, doc_id: str) -> Optional[Dict]:
-        """Get a specific episode by document ID."""
-        if not self.enabled:
-            return None
-            
-        query = f'*[_id == "{doc_id}"]'
-        url = f"{self.base_url}/data/query/{self.dataset}"
-        headers = {
-            "Authorization": f"Bearer {self.api_token}"
-        }
-        params = {"query": query}
-        
+    def get_episode_by_id(self, doc_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Dict]:
+        """Get a specific episode by document ID (whole document unless fields are given)."""
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            result = response.json()
-            return result.get("result", [None])[0]
+            return self.query_episodes('_id == $id', {'id': doc_id}, fields=fields, order=None, first=True)
         except Exception as e:
             print(f"❌ Error fetching episode from Sanity: {e}")
             return None
     
-    def search_episodes(self, query_text: str, limit: int = 10) -> List[Dict]:
+    def search_episodes(self, query_text: str, limit: int = 10,
+                        fields: Optional[Sequence[str]] = EPISODE_SUMMARY_FIELDS) -> List[Dict]:
         """
         Search episodes by topic or conversation content.
         
         Args:
             query_text: Search text
             limit: Number of results
+            fields: Fields to fetch (None for whole documents)
             
         Returns:
             List of matching episodes
         """
-        if not self.enabled:
-            return []
-        
-        query = f'*[_type == "episode" && (topic match "{query_text}*" || conversation match "{query_text}*")] | order(generatedAt desc) [0...{limit}]'
-        
-        url = f"{self.base_url}/data/query/{self.dataset}"
-        headers = {
-            "Authorization": f"Bearer {self.api_token}"
-        }
-        params = {"query": query}
-        
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            result = response.json()
-            return result.get("result", [])
+            return self.query_episodes('topic match $text || conversation match $text',
+                                       {'text': f"{query_text}*"}, fields=fields, limit=limit)
         except Exception as e:
             print(f"❌ Error searching Sanity: {e}")
             return []
     
-    def get_episode_by_topic(self, topic: str) -> Optional[Dict]:
+    def get_episode_by_topic(self, topic: str,
+                             fields: Optional[Sequence[str]] = EPISODE_SUMMARY_FIELDS) -> Optional[Dict]:
         """
         Get the most recent episode for a given topic.
         Useful for reusing existing context.
         
         Args:
             topic: Topic to search for
+            fields: Fields to fetch (None for the whole document)
             
         Returns:
             Episode document if found, None otherwise
         """
-        if not self.enabled:
-            return None
-        
-        # Search for episodes with similar topic
-        query = f'*[_type == "episode" && topic match "{topic}*"] | order(generatedAt desc) [0]'
-        
-        url = f"{self.base_url}/data/query/{self.dataset}"
-        headers = {
-            "Authorization": f"Bearer {self.api_token}"
-        }
-        params = {"query": query}
-        
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            result = response.json()
-            episodes = result.get("result", [])
-            return episodes[0] if episodes else None
+            # Search for episodes with similar topic
+            return self.query_episodes('topic match $topic', {'topic': f"{topic}*"}, fields=fields, first=True)
         except Exception as e:
             print(f"❌ Error querying episode by topic: {e}")
             return None
@@ -356,75 +439,57 @@ class SanityClient:
         Returns:
             Summarized context string if found, None otherwise
         """
-        episode = self.get_episode_by_topic(topic)
+        episode = self.get_episode_by_topic(topic, fields=('contextSummarized', 'contextUsed'))
         if episode:
             return episode.get('contextSummarized') or episode.get('contextUsed', '')
         return None
     
-    def get_episodes_by_sequence(self, sequence_id: str) -> List[Dict]:
+    def get_episodes_by_sequence(self, sequence_id: str,
+                                 fields: Optional[Sequence[str]] = EPISODE_SUMMARY_FIELDS) -> List[Dict]:
         """
         Get all episodes in a sequence.
         
         Args:
             sequence_id: Sequence identifier
+            fields: Fields to fetch (None for whole documents)
             
         Returns:
             List of episode documents in the sequence
         """
-        if not self.enabled:
-            return []
-        
-        query = f'*[_type == "episode" && sequenceId == "{sequence_id}"] | order(sequenceIndex asc)'
-        
-        url = f"{self.base_url}/data/query/{self.dataset}"
-        headers = {
-            "Authorization": f"Bearer {self.api_token}"
-        }
-        params = {"query": query}
-        
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            result = response.json()
-            return result.get("result", [])
+            return self.query_episodes('sequenceId == $sequenceId', {'sequenceId': sequence_id},
+                                       fields=fields, order='sequenceIndex asc')
         except Exception as e:
             print(f"❌ Error querying episodes by sequence: {e}")
             return []
     
-    def get_episodes_by_tags(self, tags: List[str], limit: int = 10) -> List[Dict]:
+    def get_episodes_by_tags(self, tags: List[str], limit: int = 10,
+                             fields: Optional[Sequence[str]] = EPISODE_SUMMARY_FIELDS) -> List[Dict]:
         """
         Get episodes that match any of the provided tags.
         
         Args:
             tags: List of tags to search for
             limit: Maximum number of episodes to return
+            fields: Fields to fetch (None for whole documents)
             
         Returns:
             List of episode documents matching the tags
         """
-        if not self.enabled or not tags:
+        if not tags:
             return []
         
         # Build query to match any tag
-        tag_conditions = ' || '.join([f'"{tag}" in tags' for tag in tags])
-        query = f'*[_type == "episode" && ({tag_conditions})] | order(generatedAt desc) [0...{limit}]'
-        
-        url = f"{self.base_url}/data/query/{self.dataset}"
-        headers = {
-            "Authorization": f"Bearer {self.api_token}"
-        }
-        params = {"query": query}
-        
+        tag_conditions = ' || '.join(f'$tag{i} in tags' for i in range(len(tags)))
+        params = {f'tag{i}': tag for i, tag in enumerate(tags)}
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=10)
-            response.raise_for_status()
-            result = response.json()
-            return result.get("result", [])
+            return self.query_episodes(tag_conditions, params, fields=fields, limit=limit)
         except Exception as e:
             print(f"❌ Error querying episodes by tags: {e}")
             return []
     
-    def get_scraped_data_by_tags(self, tags: List[str], limit: int = 5) -> List[Dict]:
+    def get_scraped_data_by_tags(self, tags: List[str], limit: int = 5,
+                                 episodes: Optional[List[Dict]] = None) -> List[Dict]:
         """
         Get scraped content from episodes matching the tags.
         Useful for reusing previously scraped data.
@@ -432,11 +497,39 @@ class SanityClient:
         Args:
             tags: List of tags to search for
             limit: Maximum number of episodes to retrieve
+            episodes: Episodes already fetched by get_episodes_by_tags (skips the query)
             
         Returns:
             List of scraped content dictionaries with source, url, content, method
         """
-        episodes = self.get_episodes_by_tags(tags, limit)
+        if episodes is None:
+            episodes = self.get_episodes_by_tags(tags, limit, fields=EPISODE_SCRAPED_FIELDS)
+        return self._scraped_items(episodes[:limit])
+    
+    def get_tag_context(self, tags: List[str], episode_limit: int = 3, scraped_limit: int = 5) -> Dict:
+        """
+        Get matching episodes and their scraped content with a single query.
+        Equivalent to get_episodes_by_tags + get_scraped_data_by_tags, which
+        would otherwise send the same query twice with different limits.
+        
+        Args:
+            tags: List of tags to search for
+            episode_limit: Maximum number of episodes to return
+            scraped_limit: Maximum number of episodes to take scraped content from
+            
+        Returns:
+            Dict with 'episodes' and 'scraped_data'
+        """
+        episodes = self.get_episodes_by_tags(tags, limit=max(episode_limit, scraped_limit),
+                                             fields=EPISODE_SUMMARY_FIELDS + (SCRAPED_CONTENT_FIELD,))
+        return {
+            'episodes': episodes[:episode_limit],
+            'scraped_data': self._scraped_items(episodes[:scraped_limit])
+        }
+    
+    @staticmethod
+    def _scraped_items(episodes: List[Dict]) -> List[Dict]:
+        """Flatten the scrapedContent of episodes into scraped content dictionaries."""
         scraped_data = []
         
         for episode in episodes:
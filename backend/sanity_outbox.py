@@ -0,0 +1,348 @@
+"""
+Durable outbox for Sanity episode writes.
+Episodes are appended to a Redis stream (or, without Redis, to an on-disk
+journal) and a background writer sends them to Sanity in batched
+transactions, retrying with backoff until Sanity accepts them. Saving an
+episode therefore costs no Sanity round trips on the request path and
+survives restarts and Sanity outages.
+"""
+import atexit
+import json
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+import redis
+import requests
+from config import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD, REDIS_VERBOSE_LOGGING,
+    SANITY_OUTBOX_DIR, SANITY_OUTBOX_BATCH_SIZE, SANITY_OUTBOX_FLUSH_INTERVAL,
+    SANITY_OUTBOX_MAX_BACKOFF, SANITY_OUTBOX_CLAIM_IDLE
+)
+
+# HTTP statuses worth retrying; any other 4xx means the document itself is bad
+_RETRY_STATUSES = (408, 409, 425, 429)
+
+
+class _RedisStreamStore:
+    """Outbox entries in a Redis stream, shared by all workers through a consumer group."""
+
+    STREAM_KEY = "sanity:outbox"
+    DEAD_KEY = "sanity:outbox:dead"
+    GROUP = "sanity-writers"
+
+    def __init__(self, redis_client, claim_idle: float):
+        self.redis_client = redis_client
+        self.claim_idle_ms = int(claim_idle * 1000)
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        try:
+            self.redis_client.xgroup_create(self.STREAM_KEY, self.GROUP, id='0', mkstream=True)
+        except redis.ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    def append(self, document: Dict) -> str:
+        return self.redis_client.xadd(self.STREAM_KEY, {'document': json.dumps(document)})
+
+    def read_batch(self, count: int, block: float) -> List[Tuple[str, Dict]]:
+        # Entries this writer read but never acknowledged (e.g. before a restart)
+        entries = self.redis_client.xreadgroup(self.GROUP, self.consumer, {self.STREAM_KEY: '0'}, count=count)
+        batch = self._decode(entries)
+        if not batch:
+            # Entries abandoned by a writer that died
+            claimed = self.redis_client.xautoclaim(
+                self.STREAM_KEY, self.GROUP, self.consumer, self.claim_idle_ms, count=count
+            )
+            batch = [(entry_id, json.loads(fields['document'])) for entry_id, fields in claimed[1] if fields]
+        if not batch:
+            entries = self.redis_client.xreadgroup(
+                self.GROUP, self.consumer, {self.STREAM_KEY: '>'}, count=count, block=int(block * 1000)
+            )
+            batch = self._decode(entries)
+        return batch
+
+    @staticmethod
+    def _decode(entries) -> List[Tuple[str, Dict]]:
+        batch = []
+        for _, stream_entries in entries or []:
+            for entry_id, fields in stream_entries:
+                batch.append((entry_id, json.loads(fields['document'])))
+        return batch
+
+    def ack(self, entry_ids: List[str]):
+        pipe = self.redis_client.pipeline()
+        pipe.xack(self.STREAM_KEY, self.GROUP, *entry_ids)
+        pipe.xdel(self.STREAM_KEY, *entry_ids)
+        pipe.execute()
+
+    def dead_letter(self, entry_id: str, document: Dict, error: str):
+        self.redis_client.rpush(self.DEAD_KEY, json.dumps({'document': document, 'error': error, 'failed_at': time.time()}))
+        self.ack([entry_id])
+
+    def pending(self) -> int:
+        return self.redis_client.xlen(self.STREAM_KEY)
+
+    def dead(self) -> int:
+        return self.redis_client.llen(self.DEAD_KEY)
+
+
+class _JournalStore:
+    """Outbox entries as one JSON file each in a local directory."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.dead_directory = os.path.join(directory, 'dead')
+        os.makedirs(self.dead_directory, exist_ok=True)
+        self._wake = threading.Event()
+
+    def append(self, document: Dict) -> str:
+        # Names sort in arrival order; write then rename so readers never see partial files
+        entry_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.json"
+        tmp_path = os.path.join(self.directory, f".{entry_id}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(document, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.directory, entry_id))
+        self._wake.set()
+        return entry_id
+
+    def read_batch(self, count: int, block: float) -> List[Tuple[str, Dict]]:
+        names = self._entries()
+        if not names:
+            self._wake.wait(block)
+            self._wake.clear()
+            names = self._entries()
+
+        batch = []
+        for name in names[:count]:
+            try:
+                with open(os.path.join(self.directory, name), encoding='utf-8') as f:
+                    batch.append((name, json.load(f)))
+            except FileNotFoundError:
+                continue  # Sent by another writer in the meantime
+        return batch
+
+    def _entries(self) -> List[str]:
+        return sorted(n for n in os.listdir(self.directory) if n.endswith('.json'))
+
+    def ack(self, entry_ids: List[str]):
+        for entry_id in entry_ids:
+            try:
+                os.remove(os.path.join(self.directory, entry_id))
+            except FileNotFoundError:
+                pass
+
+    def dead_letter(self, entry_id: str, document: Dict, error: str):
+        with open(os.path.join(self.dead_directory, entry_id), 'w', encoding='utf-8') as f:
+            json.dump({'document': document, 'error': error, 'failed_at': time.time()}, f)
+        self.ack([entry_id])
+
+    def pending(self) -> int:
+        return len(self._entries())
+
+    def dead(self) -> int:
+        return sum(1 for n in os.listdir(self.dead_directory) if n.endswith('.json'))
+
+
+class SanityOutbox:
+    """
+    Queues Sanity documents and writes them from a background thread.
+    Uses a Redis stream when Redis is available, otherwise an on-disk journal.
+    """
+
+    def __init__(self, sanity_client=None, redis_client=None, journal_dir: str = SANITY_OUTBOX_DIR,
+                 batch_size: int = SANITY_OUTBOX_BATCH_SIZE,
+                 flush_interval: float = SANITY_OUTBOX_FLUSH_INTERVAL,
+                 max_backoff: float = SANITY_OUTBOX_MAX_BACKOFF,
+                 claim_idle: float = SANITY_OUTBOX_CLAIM_IDLE):
+        """
+        Initialize the outbox.
+
+        Args:
+            sanity_client: SanityClient used to send mutations (created on first use if omitted)
+            redis_client: Optional existing Redis client to reuse
+            journal_dir: Directory for the on-disk journal used without Redis
+            batch_size: Documents sent per Sanity transaction
+            flush_interval: Seconds the writer waits for new entries before checking again
+            max_backoff: Longest wait between retries while Sanity is failing
+            claim_idle: Seconds before another worker's unacknowledged entries are taken over
+        """
+        self._sanity = sanity_client
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.stats = {'queued': 0, 'written': 0, 'batches': 0, 'retries': 0, 'dead_lettered': 0}
+        self._stop = threading.Event()
+        self._idle = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.store = None
+        if redis_client is None:
+            try:
+                redis_client = redis.Redis(
+                    host=REDIS_HOST,
+                    port=REDIS_PORT,
+                    db=REDIS_DB,
+                    password=REDIS_PASSWORD,
+                    decode_responses=True
+                )
+                redis_client.ping()
+            except Exception as e:
+                if REDIS_VERBOSE_LOGGING:
+                    print(f"⚠️  Redis not available for Sanity outbox, using on-disk journal: {e}")
+                redis_client = None
+        if redis_client is not None:
+            try:
+                self.store = _RedisStreamStore(redis_client, claim_idle)
+            except Exception as e:
+                if REDIS_VERBOSE_LOGGING:
+                    print(f"⚠️  Redis stream unavailable for Sanity outbox, using on-disk journal: {e}")
+        if self.store is None:
+            self.store = _JournalStore(journal_dir)
+
+    @property
+    def sanity(self):
+        if self._sanity is None:
+            from sanity_client import SanityClient
+            self._sanity = SanityClient()
+        return self._sanity
+
+    def enqueue(self, document: Dict) -> str:
+        """
+        Durably queue a document for writing.
+
+        Args:
+            document: Sanity document with its _id set
+
+        Returns:
+            Outbox entry ID
+        """
+        entry_id = self.store.append(document)
+        self.stats['queued'] += 1
+        self._idle.clear()
+        self.start()
+        return entry_id
+
+    def start(self):
+        """Start the background writer (no-op if it is already running)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='sanity-outbox', daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the writer; unsent entries stay in the outbox for the next start."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def flush(self, timeout: float = 30.0) -> bool:
+        """
+        Wait until the outbox has been written out.
+
+        Returns:
+            True if it emptied within the timeout
+        """
+        if self.store.pending() == 0:
+            return True
+        self.start()
+        return self._idle.wait(timeout)
+
+    def _run(self):
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                batch = self.store.read_batch(self.batch_size, self.flush_interval)
+            except Exception as e:
+                print(f"⚠️  Sanity outbox read failed: {e}")
+                self._stop.wait(self.flush_interval)
+                continue
+
+            if not batch:
+                self._idle.set()
+                continue
+
+            if self._write(batch):
+                failures = 0
+                continue
+
+            # Sanity is unreachable or overloaded; entries stay queued
+            failures += 1
+            self.stats['retries'] += 1
+            backoff = min(self.max_backoff, 2 ** failures) * random.uniform(0.5, 1.0)
+            print(f"⚠️  Sanity outbox: write failed, retrying {len(batch)} document(s) in {backoff:.1f}s")
+            self._stop.wait(backoff)
+
+    def _write(self, batch: List[Tuple[str, Dict]]) -> bool:
+        """
+        Send a batch as one transaction.
+
+        Returns:
+            False if the batch should be retried later
+        """
+        # createIfNotExists makes a retry after a lost response harmless
+        mutations = [{'createIfNotExists': document} for _, document in batch]
+        try:
+            result = self.sanity.mutate(mutations)
+        except requests.exceptions.HTTPError as e:
+            status = e.response.status_code if e.response is not None else None
+            if status is None or status >= 500 or status in _RETRY_STATUSES:
+                return False
+            if len(batch) > 1:
+                # One bad document fails the whole transaction; find it by sending singly
+                return all([self._write([item]) for item in batch])
+            entry_id, document = batch[0]
+            error = self._error_message(e)
+            print(f"❌ Sanity outbox: rejected {document.get('_id')} ({status}): {error}")
+            self.store.dead_letter(entry_id, document, error)
+            self.stats['dead_lettered'] += 1
+            return True
+        except requests.exceptions.RequestException:
+            return False
+
+        self.store.ack([entry_id for entry_id, _ in batch])
+        self.stats['written'] += len(batch)
+        self.stats['batches'] += 1
+        print(f"💾 Sanity outbox: saved {len(batch)} document(s) "
+              f"(transaction {result.get('transactionId', 'unknown')})")
+        return True
+
+    @staticmethod
+    def _error_message(error: requests.exceptions.HTTPError) -> str:
+        try:
+            return error.response.json().get('error', {}).get('description') or error.response.text[:200]
+        except Exception:
+            return str(error)
+
+    def health(self) -> Dict:
+        """Get outbox backlog, dead letters (across all writers) and this process's counters."""
+        try:
+            pending, dead = self.store.pending(), self.store.dead()
+        except Exception:
+            pending = dead = None
+        return dict(self.stats, pending=pending, dead_letters=dead,
+                    writer_alive=bool(self._thread and self._thread.is_alive()),
+                    backend=type(self.store).__name__.strip('_'))
+
+
+_outbox: Optional[SanityOutbox] = None
+_outbox_lock = threading.Lock()
+
+
+def get_sanity_outbox() -> SanityOutbox:
+    """Get the process-wide Sanity outbox, creating it (and its writer) on first use."""
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                _outbox = SanityOutbox()
+                _outbox.start()
+                # Give queued writes a moment to go out on shutdown; the rest stay queued
+                atexit.register(_outbox.flush, 5.0)
+    return _outbox
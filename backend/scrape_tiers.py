@@ -0,0 +1,135 @@
+"""
+Cost-aware scrape tiers.
+Plain HTTP is tried first and a browser is used only when the HTTP text looks
+incomplete. The tier that worked for a domain is remembered in Redis so later
+scrapes of that domain go straight to it.
+"""
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+import redis
+from config import (
+    REDIS_HOST, REDIS_PORT, REDIS_DB, REDIS_PASSWORD, REDIS_VERBOSE_LOGGING,
+    SCRAPE_MIN_QUALITY_CHARS, SCRAPE_TIER_MEMORY_TTL
+)
+
+# Cheapest first
+TIER_ORDER = ('http', 'lightpanda_cloud_cdp', 'playwright_chrome')
+
+# Text that means we got an interstitial instead of the page
+_BLOCKED_MARKERS = (
+    'enable javascript', 'javascript is disabled', 'javascript is required',
+    'turn on javascript', 'checking your browser', 'verify you are human',
+    'are you a robot', 'access denied', 'captcha',
+)
+
+
+def domain_of(url: str) -> str:
+    """Get the domain used to key per-site state (lowercase, without www.)."""
+    host = (urlsplit(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def is_quality_content(text: str, min_chars: int = SCRAPE_MIN_QUALITY_CHARS) -> bool:
+    """
+    Judge whether scraped text is the real page.
+
+    Short text usually means a JavaScript-rendered site that plain HTTP can't
+    see; short text mentioning a JavaScript/bot check is an interstitial.
+    """
+    if not text or len(text) < min_chars:
+        return False
+    if len(text) < min_chars * 4:
+        lowered = text.lower()
+        if any(marker in lowered for marker in _BLOCKED_MARKERS):
+            return False
+    return True
+
+
+class TierMemory:
+    """
+    Remembers which scrape tier worked for each domain.
+    Falls back to an in-process dict when Redis is not available.
+    """
+
+    KEY_PREFIX = "scrape:tier:"
+
+    def __init__(self, redis_client=None, ttl: int = SCRAPE_TIER_MEMORY_TTL):
+        """
+        Initialize tier memory.
+
+        Args:
+            redis_client: Optional existing Redis client to reuse
+            ttl: Seconds to remember a domain's tier (it is re-probed from HTTP afterwards)
+        """
+        self.ttl = ttl
+        self._local: Dict[str, str] = {}
+
+        self.redis_client = redis_client
+        if self.redis_client is None:
+            try:
+                self.redis_client = redis.Redis(
+                    host=REDIS_HOST,
+                    port=REDIS_PORT,
+                    db=REDIS_DB,
+                    password=REDIS_PASSWORD,
+                    decode_responses=True
+                )
+                self.redis_client.ping()
+            except Exception as e:
+                if REDIS_VERBOSE_LOGGING:
+                    print(f"⚠️  Redis not available for scrape tier memory, using in-process fallback: {e}")
+                self.redis_client = None
+
+    def get(self, url: str) -> Optional[str]:
+        """Get the tier that last worked for a URL's domain."""
+        domain = domain_of(url)
+        if self.redis_client:
+            try:
+                tier = self.redis_client.get(f"{self.KEY_PREFIX}{domain}")
+                if tier:
+                    return tier
+            except Exception:
+                pass
+        return self._local.get(domain)
+
+    def remember(self, url: str, tier: str):
+        """Record the tier that worked for a URL's domain."""
+        domain = domain_of(url)
+        self._local[domain] = tier
+        if self.redis_client:
+            try:
+                self.redis_client.set(f"{self.KEY_PREFIX}{domain}", tier, ex=self.ttl)
+            except Exception as e:
+                if REDIS_VERBOSE_LOGGING:
+                    print(f"⚠️  Failed to store scrape tier: {e}")
+
+    def plan(self, url: str, available: List[str]) -> List[str]:
+        """
+        Order the tiers to try for a URL.
+
+        Args:
+            url: Page URL
+            available: Usable tiers, cheapest first
+
+        Returns:
+            The tiers to try, starting at the domain's remembered tier
+        """
+        remembered = self.get(url)
+        if remembered in available:
+            return available[available.index(remembered):]
+        return list(available)
+
+
+_memory: Optional[TierMemory] = None
+_memory_lock = threading.Lock()
+
+
+def get_tier_memory() -> TierMemory:
+    """Get the process-wide tier memory, creating it on first use."""
+    global _memory
+    if _memory is None:
+        with _memory_lock:
+            if _memory is None:
+                _memory = TierMemory()
+    return _memory
@@ -0,0 +1,93 @@
+"""
+Local checks for generated podcast scripts.
+Cheap heuristics (no API calls) for the problems the critique pass exists to
+fix: narration or stray lines, one host dominating, a missing or overdone
+sponsor mention, ad-like phrasing, repeated lines and truncated output. Used
+by the 'lint' quality mode to decide whether a draft needs critique.
+"""
+import re
+from typing import List, Optional
+
+SPEAKERS = ('Alex', 'Maya')
+
+# Phrases that make a sponsor mention sound like an ad read
+AD_PHRASES = (
+    'sponsored by', 'speaking of sponsors', 'our sponsor', 'this episode is brought to you',
+    'use code', 'promo code', 'check them out', 'link in the description'
+)
+
+MIN_LINES = 12
+MAX_LINES = 40
+MAX_RUN = 3  # Lines in a row by the same host
+MIN_SPEAKER_SHARE = 0.3
+MAX_SPONSOR_MENTIONS = 2
+
+_LINE_RE = re.compile(r'^(\w+):\s*(.+)$')
+
+
+def lint_script(conversation: str, sponsor: str, stop_reason: Optional[str] = None) -> List[str]:
+    """
+    Check a script for problems worth a critique pass.
+
+    Args:
+        conversation: Script with one "Speaker: line" per line
+        sponsor: Sponsor that should be mentioned
+        stop_reason: Claude stop reason of the draft, if known ('max_tokens' means it was cut off)
+
+    Returns:
+        List of problems found (empty if the script looks fine)
+    """
+    issues = []
+    lines = [line.strip() for line in conversation.split('\n') if line.strip()]
+    dialogue = []
+    stray = 0
+    for line in lines:
+        match = _LINE_RE.match(line)
+        if match and match.group(1) in SPEAKERS:
+            dialogue.append((match.group(1), match.group(2)))
+        else:
+            stray += 1
+
+    if stray:
+        issues.append(f"{stray} line(s) are not Alex/Maya dialogue")
+    if len(dialogue) < MIN_LINES:
+        issues.append(f"only {len(dialogue)} dialogue lines (expected at least {MIN_LINES})")
+    elif len(dialogue) > MAX_LINES:
+        issues.append(f"{len(dialogue)} dialogue lines (expected at most {MAX_LINES})")
+
+    if dialogue:
+        for speaker in SPEAKERS:
+            share = sum(1 for name, _ in dialogue if name == speaker) / len(dialogue)
+            if share < MIN_SPEAKER_SHARE:
+                issues.append(f"{speaker} has only {share:.0%} of the lines")
+
+        run = longest = 1
+        for previous, current in zip(dialogue, dialogue[1:]):
+            run = run + 1 if current[0] == previous[0] else 1
+            longest = max(longest, run)
+        if longest > MAX_RUN:
+            issues.append(f"one host speaks {longest} times in a row")
+
+        spoken = [text.lower() for _, text in dialogue]
+        if len(set(spoken)) < len(spoken):
+            issues.append("repeated lines")
+
+    sponsor_mentions = len(re.findall(rf'\*sponsor\*\s*{re.escape(sponsor)}\s*\*sponsor\*',
+                                      conversation, re.IGNORECASE))
+    if sponsor_mentions == 0:
+        if sponsor.lower() in conversation.lower():
+            issues.append(f"{sponsor} mentioned without *sponsor* markers")
+        else:
+            issues.append(f"{sponsor} is never mentioned")
+    elif sponsor_mentions > MAX_SPONSOR_MENTIONS:
+        issues.append(f"{sponsor} mentioned {sponsor_mentions} times")
+
+    lowered = conversation.lower()
+    ad_phrases = [phrase for phrase in AD_PHRASES if phrase in lowered]
+    if ad_phrases:
+        issues.append(f"ad-like phrasing: {', '.join(ad_phrases)}")
+
+    if stop_reason == 'max_tokens' or (dialogue and not re.search(r'[.!?"\')*]$', dialogue[-1][1])):
+        issues.append("script appears to be cut off")
+
+    return issues
@@ -1,37 +1,103 @@
 """Intelligent scraping: Claude selects targets → Lightpanda fetches data."""
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from claude_client import ClaudeClient
 # Lightpanda is handled via lightpanda_playwright_client now
 from lightpanda_playwright_client import LightpandaPlaywrightClient as LightpandaClient
-from lightpanda_playwright_client import scrape_with_lightpanda_playwright
-from playwright_scraper import scrape_with_playwright
-from config import LIGHTPANDA_API_KEY
+from playwright_scraper import PlaywrightScraper
+from browser_pool import get_browser_pool
+from page_cache import get_page_cache
+from scrape_tiers import TIER_ORDER, domain_of, get_tier_memory, is_quality_content
+from domain_health import get_domain_health
+from text_extract import extract_text
+from config import (
+    LIGHTPANDA_API_KEY, SCRAPE_DEADLINE, SCRAPE_MAX_CONCURRENCY, SCRAPE_MAX_CHARS, CLAUDE_MEMO_TARGETS_TTL
+)
+import asyncio
 import json
 
 
+# Static instructions for choosing scrape targets (sent first, ahead of the per-topic request)
+TARGET_GUIDANCE_PROMPT = """You are a research agent identifying the BEST websites to scrape for podcast context.
+
+Current Date: November 2025
+
+CRITICAL REQUIREMENTS FOR URLs:
+1. ✅ MUST BE RECENT: Prefer URLs from 2024-2025 or current/latest content
+2. ✅ MUST BE VALID: Use landing pages, topic pages, or category pages that are GUARANTEED to exist
+3. ✅ PREFER BASE/Topic PAGES over specific old article URLs
+4. ✅ AVOID: Specific article URLs from 2020-2023 (these often return 404)
+
+URL PATTERNS TO PREFER:
+✅ https://www.technologyreview.com/topic/artificial-intelligence/  (topic page)
+✅ https://www.theverge.com/ai-artificial-intelligence  (category page)
+✅ https://techcrunch.com/  (main page or /tag/ai/)
+✅ https://venturebeat.com/ai/  (category page)
+✅ https://www.bbc.com/news/technology  (section page)
+✅ https://www.reuters.com/technology/  (section page)
+✅ https://arstechnica.com/information-technology/  (category page)
+
+❌ AVOID: https://www.technologyreview.com/2022/01/11/1041557/specific-article/
+❌ AVOID: https://www.nature.com/articles/d41586-022-00623-x  (old specific articles)
+
+Your task:
+1. Identify the requested number of reputable websites with RECENT (2024-2025) or CURRENT content for the topic given below
+2. Use TOPIC/CATEGORY/LANDING pages that are guaranteed to exist, not old specific articles
+3. For each, explain WHY it's valuable
+
+Consider:
+- News sites (TechCrunch, The Verge, Bloomberg, BBC, Reuters)
+- Research platforms (ArXiv, Nature topic pages, Pew Research topic pages)
+- Industry blogs (relevant to topic)
+- Data sources (Statista, Pew Research topic pages)
+- Official sources (government, orgs)
+
+Return ONLY a JSON array in this format:
+[
+  {
+    "url": "https://domain.com/topic-or-category-page",
+    "source_name": "Source Name",
+    "reason": "Why this source is valuable for this topic",
+    "expected_content": "What kind of data/info we expect"
+  }
+]
+
+IMPORTANT:
+- Use topic/category pages, NOT specific old article URLs
+- Prefer URLs from 2024-2025 or current content pages
+- Ensure URLs are guaranteed to exist (use section pages, not specific articles)
+- Be specific but use stable, long-lived page URLs"""
+
+
 class SmartScraper:
     """
     Two-phase intelligent scraping:
     1. Claude analyzes topic and recommends target websites
-    2. Lightpanda scrapes those specific targets for real data
+    2. Those specific targets are scraped for real data (cheapest method first)
     """
     
     def __init__(self):
         self.claude = ClaudeClient()
         self.use_lightpanda = bool(LIGHTPANDA_API_KEY)
-        # Note: Lightpanda is used via scrape_with_lightpanda_playwright function
+        self.page_cache = get_page_cache()
+        self.tier_memory = get_tier_memory()
+        self.domain_health = get_domain_health()
+        self._refreshes = set()
+        # Note: Lightpanda/Chrome sessions come from the process-wide browser pool
         # No need to instantiate a client here
     
-    def get_intelligent_context(self, topic: str, max_sources: int = 3) -> Dict:
+    def get_intelligent_context(self, topic: str, max_sources: int = 3,
+                                on_event: Optional[Callable[[str, Dict], None]] = None) -> Dict:
         """
         Intelligent two-phase scraping.
         
         Phase 1: Ask Claude which websites to scrape
-        Phase 2: Use Lightpanda to fetch from those targets
+        Phase 2: Fetch those targets (HTTP, then Lightpanda/Chrome), with Claude
+                 synthesis only as a fallback when none of them could be scraped
         
         Args:
             topic: The podcast topic
             max_sources: Maximum number of sources to scrape
+            on_event: Optional callback receiving (event_type, data) progress events
         
         Returns:
             Dict with context, sources, and metadata
@@ -42,7 +108,9 @@ class SmartScraper:
         
         # PHASE 1: Claude recommends targets
         print("\n[PHASE 1] Claude Agent: Analyzing topic & selecting targets...")
-        targets = self._get_target_websites(topic, max_sources)
+        targets = self._get_target_websites(
+            topic, max_sources, avoid_domains=self.domain_health.known_bad_domains()
+        )
         
         if not targets:
             print("⚠️  No targets identified, using fallback")
@@ -53,12 +121,20 @@ class SmartScraper:
             print(f"   {i}. {target['url']}")
             print(f"      → {target['reason'][:60]}...")
         
-        # PHASE 2: Lightpanda scrapes targets
+        if on_event:
+            on_event('targets_chosen', {
+                'targets': [{'url': t['url'], 'source_name': t['source_name']} for t in targets]
+            })
+        
+        # PHASE 2: Scrape targets (direct HTTP first; Lightpanda Cloud only when configured)
         if self.use_lightpanda:
-            print("\n[PHASE 2] Lightpanda Agent: Fetching real data...")
-            scraped_data = self._scrape_targets(targets)
+            print("\n[PHASE 2] Scraping Agent: Fetching real data (HTTP, Lightpanda, Chrome)...")
         else:
-            print("\n[PHASE 2] ⚠️  Lightpanda not available, using Claude synthesis...")
+            print("\n[PHASE 2] Scraping Agent: Fetching real data (HTTP, Chrome; Lightpanda not configured)...")
+        scraped_data = self._scrape_targets(targets, on_event=on_event)
+        synthesized = not scraped_data
+        if synthesized:
+            print("\n[PHASE 2] ⚠️  No source could be scraped, using Claude synthesis...")
             scraped_data = self._synthesize_data(topic, targets)
         
         # PHASE 3: Claude synthesizes into podcast context
@@ -73,81 +149,44 @@ class SmartScraper:
             'sources': targets,
             'scraped_data': scraped_data,
             'method': 'intelligent_scraping',
-            'lightpanda_used': self.use_lightpanda
+            'lightpanda_used': any(item.get('method') == 'lightpanda_cloud_cdp' for item in scraped_data),
+            'synthesized': synthesized
         }
     
-    def _get_target_websites(self, topic: str, max_sources: int) -> List[Dict]:
+    def _get_target_websites(self, topic: str, max_sources: int,
+                             avoid_domains: Optional[List[str]] = None) -> List[Dict]:
         """
         Phase 1: Ask Claude to identify best websites to scrape.
+        Domains in avoid_domains (e.g. ones whose circuit breaker is open) are excluded.
         """
-        prompt = f"""You are a research agent identifying the BEST websites to scrape for podcast context.
-
-Topic: "{topic}"
-Current Date: November 2025
-
-CRITICAL REQUIREMENTS FOR URLs:
-1. ✅ MUST BE RECENT: Prefer URLs from 2024-2025 or current/latest content
-2. ✅ MUST BE VALID: Use landing pages, topic pages, or category pages that are GUARANTEED to exist
-3. ✅ PREFER BASE/Topic PAGES over specific old article URLs
-4. ✅ AVOID: Specific article URLs from 2020-2023 (these often return 404)
-
-URL PATTERNS TO PREFER:
-✅ https://www.technologyreview.com/topic/artificial-intelligence/  (topic page)
-✅ https://www.theverge.com/ai-artificial-intelligence  (category page)
-✅ https://techcrunch.com/  (main page or /tag/ai/)
-✅ https://venturebeat.com/ai/  (category page)
-✅ https://www.bbc.com/news/technology  (section page)
-✅ https://www.reuters.com/technology/  (section page)
-✅ https://arstechnica.com/information-technology/  (category page)
-
-❌ AVOID: https://www.technologyreview.com/2022/01/11/1041557/specific-article/
-❌ AVOID: https://www.nature.com/articles/d41586-022-00623-x  (old specific articles)
-
-Your task:
-1. Identify {max_sources} reputable websites with RECENT (2024-2025) or CURRENT content
-2. Use TOPIC/CATEGORY/LANDING pages that are guaranteed to exist, not old specific articles
-3. For each, explain WHY it's valuable
-
-Consider:
-- News sites (TechCrunch, The Verge, Bloomberg, BBC, Reuters)
-- Research platforms (ArXiv, Nature topic pages, Pew Research topic pages)
-- Industry blogs (relevant to topic)
-- Data sources (Statista, Pew Research topic pages)
-- Official sources (government, orgs)
-
-Return ONLY a JSON array in this format:
-[
-  {{
-    "url": "https://domain.com/topic-or-category-page",
-    "source_name": "Source Name",
-    "reason": "Why this source is valuable for this topic",
-    "expected_content": "What kind of data/info we expect"
-  }}
-]
-
-IMPORTANT:
-- Use topic/category pages, NOT specific old article URLs
-- Prefer URLs from 2024-2025 or current content pages
-- Ensure URLs are guaranteed to exist (use section pages, not specific articles)
-- Be specific but use stable, long-lived page URLs
+        avoid_domains = avoid_domains or []
+        avoid_note = ""
+        if avoid_domains:
+            avoid_note = f"\nDo NOT use these domains (they are currently blocking or failing): {', '.join(avoid_domains)}"
+        
+        # The guidance is identical for every topic, so it goes first; only the
+        # short request after it changes between calls. It is not marked with
+        # cacheable(): at ~600 tokens it is below Anthropic's caching minimum.
+        prompt = [
+            TARGET_GUIDANCE_PROMPT,
+            f"""Topic: "{topic}"
+Number of websites: {max_sources}{avoid_note}
 
 Return ONLY the JSON array, nothing else."""
+        ]
 
         try:
             response = self.claude.generate(
                 prompt=prompt,
                 temperature=0.3,  # More deterministic
-                max_tokens=1000
+                max_tokens=1000,
+                memoize=True,  # Same topic and avoid-list -> same picks
+                memoize_ttl=CLAUDE_MEMO_TARGETS_TTL,
+                validate=self._is_target_list  # Don't replay an unparseable reply
             )
             
-            # Extract JSON from response
-            response = response.strip()
-            if "```json" in response:
-                response = response.split("```json")[1].split("```")[0]
-            elif "```" in response:
-                response = response.split("```")[1].split("```")[0]
-            
-            targets = json.loads(response)
+            targets = self._parse_targets(response)
+            targets = [t for t in targets if domain_of(t.get('url', '')) not in avoid_domains]
             return targets[:max_sources]
             
         except json.JSONDecodeError as e:
@@ -158,157 +197,294 @@ Return ONLY the JSON array, nothing else."""
             print(f"⚠️  Error getting targets: {e}")
             return []
     
-    def _scrape_targets(self, targets: List[Dict]) -> List[Dict]:
+    @staticmethod
+    def _parse_targets(response: str) -> List[Dict]:
+        """
+        Parse Claude's target list, with or without a ```json fence.
+        
+        Raises:
+            json.JSONDecodeError: If the reply isn't JSON
+        """
+        response = response.strip()
+        if "```json" in response:
+            response = response.split("```json")[1].split("```")[0]
+        elif "```" in response:
+            response = response.split("```")[1].split("```")[0]
+        return json.loads(response)
+    
+    @classmethod
+    def _is_target_list(cls, response: str) -> bool:
+        """Check that a reply parses into a non-empty list of targets with URLs."""
+        try:
+            targets = cls._parse_targets(response)
+        except json.JSONDecodeError:
+            return False
+        return (isinstance(targets, list) and bool(targets)
+                and all(isinstance(t, dict) and t.get('url') for t in targets))
+    
+    def _scrape_targets(self, targets: List[Dict],
+                        on_event: Optional[Callable[[str, Dict], None]] = None,
+                        deadline: float = SCRAPE_DEADLINE) -> List[Dict]:
         """
-        Phase 2: Scrape each target once - try best method, if fails move on.
-        Priority: Lightpanda Cloud > Playwright > HTTP
+        Phase 2: Scrape all targets concurrently - cheapest method that yields
+        complete text wins (see _fetch_target).
+        
+        Everything runs on the browser pool's event loop, reusing its long-lived
+        Lightpanda connection and Chrome instance. Whatever has finished when the
+        deadline hits is returned.
         """
+        try:
+            return get_browser_pool().run(self._scrape_targets_async(targets, on_event, deadline))
+        except Exception as e:
+            print(f"   ⚠️  Parallel scraping failed: {str(e)[:60]}")
+            return []
+    
+    async def _scrape_targets_async(self, targets: List[Dict],
+                                    on_event: Optional[Callable[[str, Dict], None]],
+                                    deadline: float) -> List[Dict]:
+        """Scrape targets as concurrent tasks under a global deadline."""
+        semaphore = asyncio.Semaphore(SCRAPE_MAX_CONCURRENCY)
+        started = set()  # Targets that got a concurrency slot
+        
+        async def scrape_one(i: int, target: Dict) -> Optional[Dict]:
+            async with semaphore:
+                started.add(i)
+                result = await self._scrape_target(i, len(targets), target)
+            if on_event:
+                on_event('source_scraped', {
+                    'url': target['url'],
+                    'source_name': target['source_name'],
+                    'success': result is not None,
+                    'method': result['method'] if result else None
+                })
+            return result
+        
+        # Recently failing domains start last, so healthy ones get the concurrency slots first
+        order = sorted(range(len(targets)), key=lambda n: self.domain_health.is_degraded(targets[n]['url']))
+        tasks = [None] * len(targets)
+        for n in order:
+            tasks[n] = asyncio.create_task(scrape_one(n + 1, targets[n]))
+        
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        if pending:
+            print(f"\n   ⏱️  Scraping deadline ({deadline:.0f}s) reached, "
+                  f"returning {len(done)}/{len(tasks)} targets")
+            for n, (target, task) in enumerate(zip(targets, tasks)):
+                if task in pending:
+                    task.cancel()
+                    # Targets still queued behind slow ones say nothing about their domain
+                    if n + 1 in started:
+                        self.domain_health.record_failure(target['url'], error='deadline exceeded')
+            await asyncio.gather(*pending, return_exceptions=True)
+        
+        # Keep the order Claude ranked the targets in
         scraped = []
+        for task in tasks:
+            if task in done and not task.cancelled() and task.exception() is None and task.result():
+                scraped.append(task.result())
+        return scraped
+    
+    async def _scrape_target(self, i: int, total: int, target: Dict) -> Optional[Dict]:
+        """
+        Scrape a single target, using the page cache first.
+        A stale cached copy is returned immediately and refreshed in the background.
+        """
+        cached = self.page_cache.lookup(target['url']) if self.page_cache else None
+        if not cached:
+            if self.domain_health.is_open(target['url']):
+                print(f"\n   [{i}/{total}] Skipping {target['source_name']} (circuit open after repeated failures)")
+                return None
+            return await self._fetch_target(i, total, target)
         
-        for i, target in enumerate(targets, 1):
-            print(f"\n   [{i}/{len(targets)}] Scraping {target['source_name']}...")
-            
-            success = False
+        print(f"\n   [{i}/{total}] {target['source_name']}: using {cached['state']} cached copy "
+              f"({len(cached['content']):,} characters)")
+        if cached['state'] == 'stale' and self.page_cache.begin_revalidation(target['url']):
+            task = asyncio.create_task(self._revalidate_target(i, total, target, cached))
+            # Keep a reference so the refresh isn't garbage collected mid-flight
+            self._refreshes.add(task)
+            task.add_done_callback(self._refreshes.discard)
+        
+        item = self._scraped_item(target, cached['content'], cached['method'])
+        item['cached'] = True
+        return item
+    
+    async def _revalidate_target(self, i: int, total: int, target: Dict, cached: Dict):
+        """Refresh a stale cached page in the background."""
+        try:
+            await self._fetch_target(i, total, target, cached)
+        except Exception as e:
+            print(f"      ⚠️  Background refresh of {target['url'][:60]} failed: {str(e)[:60]}")
+        finally:
+            self.page_cache.end_revalidation(target['url'])
+    
+    async def _fetch_target(self, i: int, total: int, target: Dict,
+                            cached: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Fetch a single target, cheapest method first.
+        Priority: HTTP > Lightpanda Cloud > Playwright, escalating only when the
+        text looks incomplete, and starting at the tier that last worked for the domain.
+        """
+        print(f"\n   [{i}/{total}] Scraping {target['source_name']}...")
+        url = target['url']
+        
+        available = [t for t in TIER_ORDER if t != 'lightpanda_cloud_cdp' or LIGHTPANDA_API_KEY]
+        tiers = self.tier_memory.plan(url, available)
+        if tiers[0] != available[0]:
+            print(f"      → Domain previously needed {tiers[0]}, skipping cheaper methods")
+        
+        best_effort = None
+        outcome = {}
+        for tier in tiers:
+            content = await self._fetch_with_tier(tier, url, cached, outcome)
+            if not content or len(content) <= 100:
+                continue
             
-            # Try Lightpanda Cloud first (if API key available)
-            if LIGHTPANDA_API_KEY and not success:
-                try:
-                    print(f"      → Trying Lightpanda Cloud...")
-                    result = scrape_with_lightpanda_playwright(
-                        url=target['url'],
-                        api_token=LIGHTPANDA_API_KEY,
-                        region="eu"
-                    )
-                    
-                    if result.get('status') == 'success' and result.get('content'):
-                        content = result.get('content', '')
-                        if len(content) > 100:
-                            scraped.append({
-                                'source': target['source_name'],
-                                'url': target['url'],
-                                'content': content[:2000],
-                                'status': 'success',
-                                'method': 'lightpanda_cloud_cdp'
-                            })
-                            print(f"      ✅ Retrieved {len(content):,} characters")
-                            success = True
-                            continue
-                except Exception as e:
-                    print(f"      ⚠️  Lightpanda failed: {str(e)[:60]}")
+            if is_quality_content(content):
+                print(f"      ✅ Retrieved {len(content):,} characters")
+                self.tier_memory.remember(url, tier)
+                self.domain_health.record_success(url)
+                if tier == 'http':
+                    # _direct_scrape cached it along with its validators
+                    return self._scraped_item(target, content, tier)
+                return self._fetched_item(target, content, tier)
             
-            # Try Playwright if Lightpanda failed
-            if not success:
-                try:
-                    print(f"      → Trying Playwright Chrome...")
-                    result = scrape_with_playwright(
-                        url=target['url'],
-                        wait_time=5.0
-                    )
-                    
-                    if result.get('status') == 'success' and result.get('content'):
-                        content = result.get('content', '')
-                        if len(content) > 100:
-                            scraped.append({
-                                'source': target['source_name'],
-                                'url': target['url'],
-                                'content': content[:2000],
-                                'status': 'success',
-                                'method': 'playwright_chrome'
-                            })
-                            print(f"      ✅ Retrieved {len(content):,} characters")
-                            success = True
-                            continue
-                except Exception as e:
-                    print(f"      ⚠️  Playwright failed: {str(e)[:60]}")
+            print(f"      ↗️  Only {len(content):,} characters, escalating...")
+            if not best_effort:
+                best_effort = (content, tier)
+        
+        if best_effort:
+            # Better than nothing, but not cached so the next run tries again
+            content, tier = best_effort
+            print(f"      ⚠️  Using incomplete content ({len(content):,} characters)")
+            return self._scraped_item(target, content, tier)
+        
+        print(f"      ❌ All methods failed, moving on...")
+        self.domain_health.record_failure(url, status=outcome.get('status'), error=outcome.get('error'))
+        return None
+    
+    async def _fetch_with_tier(self, tier: str, url: str, cached: Optional[Dict], outcome: Dict) -> str:
+        """Fetch a page's text with one scrape tier (empty on failure, with the reason in outcome)."""
+        try:
+            if tier == 'http':
+                # Blocking requests call, so off the event loop
+                print(f"      → Trying direct HTTP...")
+                return await asyncio.to_thread(self._direct_scrape, url, cached, outcome)
             
-            # Try HTTP as last resort
-            if not success:
-                try:
-                    print(f"      → Trying direct HTTP...")
-                    scraped_content = self._direct_scrape(target['url'])
-                    if scraped_content and len(scraped_content) > 100:
-                        scraped.append({
-                            'source': target['source_name'],
-                            'url': target['url'],
-                            'content': scraped_content[:2000],
-                            'status': 'success',
-                            'method': 'http'
-                        })
-                        print(f"      ✅ Retrieved {len(scraped_content)} characters")
-                        success = True
-                except Exception as e:
-                    print(f"      ⚠️  HTTP failed: {str(e)[:60]}")
+            if tier == 'lightpanda_cloud_cdp':
+                print(f"      → Trying Lightpanda Cloud...")
+                async with get_browser_pool().page('lightpanda', api_token=LIGHTPANDA_API_KEY, region="eu") as page:
+                    client = LightpandaClient(LIGHTPANDA_API_KEY, region="eu")
+                    result = await client.scrape_page(page, url, wait_time=5.0)
+            else:
+                print(f"      → Trying Playwright Chrome...")
+                async with get_browser_pool().page('chrome') as page:
+                    result = await PlaywrightScraper(headless=True).scrape_page(page, url, wait_time=5.0)
             
-            if not success:
-                print(f"      ❌ All methods failed, moving on...")
-        
-        return scraped
+            if result.get('status') != 'success':
+                outcome['error'] = result.get('error', 'no content')
+                return ''
+            return result.get('content', '')
+        except Exception as e:
+            print(f"      ⚠️  {tier} failed: {str(e)[:60]}")
+            outcome['error'] = str(e)
+            return ''
+    
+    def _fetched_item(self, target: Dict, content: str, method: str) -> Dict:
+        """Cache freshly rendered content and build its scraped item."""
+        if self.page_cache:
+            self.page_cache.store(target['url'], content, method)
+        return self._scraped_item(target, content, method)
     
-    def _direct_scrape(self, url: str) -> str:
+    @staticmethod
+    def _scraped_item(target: Dict, content: str, method: str) -> Dict:
+        return {
+            'source': target['source_name'],
+            'url': target['url'],
+            'content': content[:2000],
+            'status': 'success',
+            'method': method
+        }
+    
+    def _direct_scrape(self, url: str, cached: Optional[Dict] = None,
+                       outcome: Optional[Dict] = None) -> str:
         """
-        Direct HTTP scraping using BeautifulSoup (fallback method).
+        Direct HTTP scraping (fallback method).
+        Revalidates a cached copy with If-None-Match / If-Modified-Since when possible.
+        Failure details ('status' for HTTP errors, 'error' otherwise, including
+        pages with too little text) are written to outcome when given.
         """
+        outcome = outcome if outcome is not None else {}
         import requests
-        from bs4 import BeautifulSoup
+        from http_session import get_session
         
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=15)
+            if self.page_cache:
+                headers.update(self.page_cache.conditional_headers(cached))
+            response = get_session('scraper').get(url, headers=headers, timeout=15)
             
             # Check status
-            if response.status_code == 404:
+            if response.status_code == 304 and cached:
+                print(f"         → Not modified, reusing cached copy")
+                self.page_cache.refresh(url, cached)
+                return cached['content']
+            elif response.status_code == 404:
                 print(f"         → 404 Not Found (URL may be incorrect)")
+                outcome['status'] = 404
                 return ""
             elif response.status_code == 403:
                 print(f"         → 403 Forbidden (site blocking scraper)")
+                outcome['status'] = 403
                 return ""
             
+            if not response.ok:
+                outcome['status'] = response.status_code
+            
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            text = extract_text(response.content, max_chars=SCRAPE_MAX_CHARS)
             
-            # Remove unwanted elements
-            for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside']):
-                element.decompose()
+            if not text:
+                print(f"         → No main content found")
+                outcome['error'] = 'no main content'
+                return ""
             
-            # Try to find main content
-            main_content = (
-                soup.find('article') or 
-                soup.find('main') or 
-                soup.find('div', class_=['content', 'article', 'post']) or
-                soup.body
-            )
+            # Warn if content is suspiciously short (likely JavaScript-rendered)
+            if len(text) < 500:
+                print(f"         → Warning: Only {len(text)} chars (site may be JavaScript-heavy)")
+                # Still return it, but it's probably not useful
             
-            if main_content:
-                text = main_content.get_text(separator=' ', strip=True)
-                # Clean up whitespace
-                text = ' '.join(text.split())
-                
-                # Warn if content is suspiciously short (likely JavaScript-rendered)
-                if len(text) < 500:
-                    print(f"         → Warning: Only {len(text)} chars (site may be JavaScript-heavy)")
-                    # Still return it, but it's probably not useful
-                
-                return text if len(text) > 100 else ""  # Minimum 100 chars
+            if len(text) <= 100:  # Minimum 100 chars
+                outcome['error'] = f'short content ({len(text)} characters)'
+                return ""
             
-            print(f"         → No main content found")
-            return ""
+            # Incomplete text isn't cached, so a browser tier can replace it
+            if self.page_cache and is_quality_content(text):
+                self.page_cache.store(
+                    url, text, 'http',
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified')
+                )
+            return text
             
         except requests.exceptions.Timeout:
             print(f"         → Timeout (site too slow)")
+            outcome['error'] = 'timeout'
             return ""
         except requests.exceptions.ConnectionError:
             print(f"         → Connection error")
+            outcome['error'] = 'connection error'
             return ""
         except Exception as e:
             print(f"         → Error: {type(e).__name__}")
+            outcome['error'] = type(e).__name__
             return ""
     
     def _synthesize_data(self, topic: str, targets: List[Dict]) -> List[Dict]:
         """
-        Fallback: Claude synthesizes expected data when Lightpanda unavailable.
+        Fallback: Claude synthesizes expected data when no target could be scraped.
         """
         prompt = f"""Based on these target websites for the topic "{topic}", 
 synthesize what kind of information we would likely find:
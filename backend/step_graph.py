@@ -0,0 +1,113 @@
+"""
+Small dependency-graph executor for pipeline steps.
+Steps declare which other steps they need; every step whose dependencies are
+done runs right away on a thread pool, so independent I/O (Claude calls,
+Sanity lookups, scraping) overlaps instead of running back to back.
+"""
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class StepGraph:
+    """
+    Runs named steps concurrently, respecting their dependencies.
+
+    Each step function receives the results of its dependencies as keyword
+    arguments. Per-step timings are available in `timings` after run().
+    """
+
+    def __init__(self, max_workers: int = 6):
+        """
+        Initialize an empty graph.
+
+        Args:
+            max_workers: Maximum steps running at the same time
+        """
+        self.max_workers = max_workers
+        self._steps: Dict[str, Dict] = {}
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, Dict] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], deps: Iterable[str] = ()):
+        """
+        Add a step.
+
+        Args:
+            name: Unique step name (also the keyword its result is passed as)
+            fn: Callable taking the dependency results as keyword arguments
+            deps: Names of steps that must finish first
+        """
+        if name in self._steps:
+            raise ValueError(f"Duplicate step: {name}")
+        self._steps[name] = {'fn': fn, 'deps': tuple(deps)}
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run all steps.
+
+        Returns:
+            Dict of step name -> result
+
+        Raises:
+            The first exception raised by a step, after running steps have finished
+        """
+        for name, step in self._steps.items():
+            missing = [d for d in step['deps'] if d not in self._steps]
+            if missing:
+                raise ValueError(f"Step '{name}' depends on unknown steps: {missing}")
+
+        start = time.time()
+        pending = dict(self._steps)
+        running = {}
+        error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='step') as pool:
+            while pending or running:
+                if error is None:
+                    for name, step in list(pending.items()):
+                        if all(d in self.results for d in step['deps']):
+                            del pending[name]
+                            kwargs = {d: self.results[d] for d in step['deps']}
+                            # Steps inherit the caller's context (e.g. its Claude call priority)
+                            context = contextvars.copy_context()
+                            future = pool.submit(context.run, self._timed, name, step['fn'], kwargs, start)
+                            running[future] = name
+
+                if not running:
+                    if pending and error is None:
+                        raise ValueError(f"Dependency cycle between steps: {sorted(pending)}")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception as e:
+                        # Let running steps finish, but start nothing new
+                        error = error or e
+
+        if error is not None:
+            raise error
+        return self.results
+
+    def _timed(self, name: str, fn: Callable[..., Any], kwargs: Dict, graph_start: float) -> Any:
+        step_start = time.time()
+        status = 'error'
+        try:
+            result = fn(**kwargs)
+            status = 'ok'
+            return result
+        finally:
+            self.timings[name] = {
+                'started_at': round(step_start - graph_start, 3),
+                'duration': round(time.time() - step_start, 3),
+                'status': status
+            }
+
+    def summary(self) -> str:
+        """One-line timing summary, in start order."""
+        ordered = sorted(self.timings.items(), key=lambda item: item[1]['started_at'])
+        return ", ".join(f"{name} {t['duration']:.1f}s" for name, t in ordered)
@@ -0,0 +1,109 @@
+"""Tests for frame-level mp3 stitching, using synthetic MPEG frames."""
+import json
+import os
+import tempfile
+from audio_stitcher import extract_frames, stitch_episode
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, no padding: 144 * 128000 / 44100 = 417 bytes
+FRAME_HEADER = b'\xff\xfb\x90\x00'
+FRAME_LENGTH = 417
+FRAME_DURATION = 1152 / 44100
+
+
+def _frame(fill=0x00):
+    return FRAME_HEADER + bytes([fill]) * (FRAME_LENGTH - 4)
+
+
+def _xing_frame():
+    body = bytearray(FRAME_LENGTH - 4)
+    body[32:36] = b'Xing'  # Where encoders put it after the side info
+    return FRAME_HEADER + bytes(body)
+
+
+def _id3v2(payload_size=20):
+    size = bytes([(payload_size >> shift) & 0x7F for shift in (21, 14, 7, 0)])
+    return b'ID3\x03\x00\x00' + size + b'\x00' * payload_size
+
+
+def _id3v1():
+    return b'TAG' + b'\x00' * 125
+
+
+def test_extract_plain_frames():
+    """Plain frames come through unchanged with their summed duration."""
+    data = _frame(0x11) * 3
+    frames, duration = extract_frames(data)
+    print(f"✅ {len(frames)} bytes, {duration:.4f}s")
+    assert frames == data
+    assert abs(duration - 3 * FRAME_DURATION) < 1e-9
+
+
+def test_extract_drops_tags_and_xing():
+    """ID3v2/ID3v1 tags and a leading Xing frame are dropped; audio frames are kept."""
+    data = _id3v2() + _xing_frame() + _frame(0x22) * 2 + _id3v1()
+    frames, duration = extract_frames(data)
+    print(f"✅ Kept {len(frames) // FRAME_LENGTH} of 3 frames")
+    assert frames == _frame(0x22) * 2
+    assert abs(duration - 2 * FRAME_DURATION) < 1e-9
+
+
+def test_extract_resyncs_after_junk():
+    """Junk between frames is skipped by scanning for the next header."""
+    frames, _ = extract_frames(_frame(0x33) + b'\x00junk\x00' + _frame(0x44))
+    assert frames == _frame(0x33) + _frame(0x44)
+
+
+def test_stitch_offsets_and_index():
+    """The stitched file and its .json chapter index have matching byte and time offsets."""
+    with tempfile.TemporaryDirectory() as audio_dir:
+        sources = {
+            'ep_dialogue_0.mp3': _id3v2() + _xing_frame() + _frame(0x01) * 2,  # 2 audio frames
+            'ep_dialogue_1.mp3': _frame(0x02) * 3,                             # 3 audio frames
+            'ep_dialogue_2.mp3': _id3v2(40) + _frame(0x03) + _id3v1(),         # 1 audio frame
+        }
+        for name, data in sources.items():
+            with open(os.path.join(audio_dir, name), 'wb') as f:
+                f.write(data)
+
+        lines = [{'index': i, 'audio_file': name} for i, name in enumerate(sources)]
+        lines.append({'index': 3, 'audio_file': 'missing.mp3'})  # Skipped
+        index = stitch_episode('ep', lines, audio_dir)
+
+        with open(os.path.join(audio_dir, 'ep.mp3'), 'rb') as f:
+            stitched = f.read()
+        with open(os.path.join(audio_dir, 'ep.json')) as f:
+            stored_index = json.load(f)
+
+        print(f"✅ Stitched {len(stitched)} bytes, chapters {[(c['byte_start'], c['time_start']) for c in index['chapters']]}")
+        assert stored_index == index
+        assert stitched == _frame(0x01) * 2 + _frame(0x02) * 3 + _frame(0x03)
+        assert index['bytes'] == len(stitched) == 6 * FRAME_LENGTH
+        assert index['duration'] == round(6 * FRAME_DURATION, 3)
+
+        expected = [(0, 2), (2, 3), (5, 1)]  # (first frame, frame count) per line
+        assert [c['index'] for c in index['chapters']] == [0, 1, 2]
+        for chapter, (start, count) in zip(index['chapters'], expected):
+            assert chapter['byte_start'] == start * FRAME_LENGTH
+            assert chapter['byte_end'] == (start + count) * FRAME_LENGTH
+            assert chapter['time_start'] == round(start * FRAME_DURATION, 3)
+            assert chapter['time_end'] == round((start + count) * FRAME_DURATION, 3)
+            assert stitched[chapter['byte_start']:chapter['byte_end']] == extract_frames(
+                sources[chapter['source_file']])[0]
+
+
+def test_stitch_nothing_returns_none():
+    """With no usable audio, no episode file is left behind."""
+    with tempfile.TemporaryDirectory() as audio_dir:
+        assert stitch_episode('empty', [{'index': 0, 'audio_file': 'missing.mp3'}], audio_dir) is None
+        assert os.listdir(audio_dir) == []
+
+
+if __name__ == '__main__':
+    print("🧪 Running Audio Stitcher Tests\n")
+    print("=" * 60)
+    for test in (test_extract_plain_frames, test_extract_drops_tags_and_xing, test_extract_resyncs_after_junk,
+                 test_stitch_offsets_and_index, test_stitch_nothing_returns_none):
+        print(f"\n▶️  {test.__name__}")
+        test()
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
@@ -0,0 +1,278 @@
+"""Tests for the shared Claude scheduler and the async Claude client (no API calls)."""
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+import anthropic
+from claude_client import AsyncClaudeClient
+from claude_scheduler import PRIORITY_BATCH, PRIORITY_INTERACTIVE, ClaudeScheduler, _Waiter, claude_priority
+from retry_policy import DeadlineExceeded, RetryPolicy
+
+
+def _message(text):
+    return SimpleNamespace(
+        content=[SimpleNamespace(text=text)], model='test-model', stop_reason='end_turn',
+        usage=SimpleNamespace(input_tokens=10, output_tokens=5)
+    )
+
+
+def _raw(text, headers=None):
+    return SimpleNamespace(headers=headers or {}, parse=lambda: _message(text))
+
+
+def _rate_limit_error(retry_after='0.2'):
+    response = SimpleNamespace(status_code=429, headers={'retry-after': retry_after}, request=None)
+    return anthropic.RateLimitError('rate limited', response=response, body=None)
+
+
+def _async_client(create, max_concurrency=3):
+    client = AsyncClaudeClient(api_key='test-key')
+    client.client = SimpleNamespace(messages=SimpleNamespace(
+        with_raw_response=SimpleNamespace(create=create)
+    ))
+    client.scheduler = ClaudeScheduler(max_concurrency=max_concurrency)
+    return client
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "condition not reached in time"
+        time.sleep(0.01)
+
+
+def test_priority_order():
+    """Queued interactive calls are admitted before batch calls that queued earlier."""
+    scheduler = ClaudeScheduler(max_concurrency=1)
+    scheduler.acquire()
+    admitted = []
+
+    def worker(name, priority):
+        with claude_priority(priority):
+            with scheduler.slot():
+                admitted.append(name)
+
+    threads = []
+    for name, priority in [('batch-1', PRIORITY_BATCH), ('batch-2', PRIORITY_BATCH),
+                           ('interactive', PRIORITY_INTERACTIVE)]:
+        thread = threading.Thread(target=worker, args=(name, priority))
+        thread.start()
+        threads.append(thread)
+        _wait_until(lambda: scheduler.health()['queued'] == len(threads))
+
+    scheduler.release()
+    for thread in threads:
+        thread.join(2)
+
+    print(f"✅ Admission order: {admitted}")
+    assert admitted == ['interactive', 'batch-1', 'batch-2']
+    assert scheduler.health()['active'] == 0
+
+
+def test_slot_released_on_timeout():
+    """A waiter that times out leaves the queue and never keeps a slot."""
+    scheduler = ClaudeScheduler(max_concurrency=1)
+    scheduler.acquire()
+
+    try:
+        scheduler.acquire(timeout=0.1)
+        assert False, "acquire should have timed out"
+    except DeadlineExceeded:
+        pass
+
+    health = scheduler.health()
+    assert health['active'] == 1 and health['queued'] == 0
+    scheduler.release()
+    scheduler.acquire(timeout=0.1)  # The slot is free again
+    scheduler.release()
+    print(f"✅ Timed-out waiter left no slot behind: {scheduler.health()}")
+    assert scheduler.health()['active'] == 0
+
+
+def test_granted_slot_returned_on_abandon():
+    """A slot granted just as its waiter gives up is handed back."""
+    scheduler = ClaudeScheduler(max_concurrency=1)
+    event = threading.Event()
+    waiter = _Waiter(event.set)
+    scheduler._enqueue(PRIORITY_INTERACTIVE, waiter)
+    assert waiter.granted and scheduler.health()['active'] == 1
+
+    scheduler._abandon(waiter)
+    print(f"✅ Abandoned grant returned: {scheduler.health()}")
+    assert scheduler.health()['active'] == 0
+
+
+def test_async_waiter_cancelled():
+    """Cancelling a task waiting for a slot removes it without leaking the slot."""
+    scheduler = ClaudeScheduler(max_concurrency=1)
+
+    async def run():
+        await scheduler.acquire_async()
+        waiting = asyncio.ensure_future(scheduler.acquire_async())
+        await asyncio.sleep(0.05)
+        assert scheduler.health()['queued'] == 1
+        waiting.cancel()
+        try:
+            await waiting
+        except asyncio.CancelledError:
+            pass
+        scheduler.release()
+        # The freed slot is usable again, woken through call_soon_threadsafe
+        await asyncio.wait_for(scheduler.acquire_async(), 1.0)
+        scheduler.release()
+
+    asyncio.run(run())
+    health = scheduler.health()
+    print(f"✅ Cancelled async waiter cleaned up: {health}")
+    assert health['active'] == 0 and health['queued'] == 0
+
+
+def test_rate_limit_halves_then_recovers():
+    """A 429 halves concurrency and pauses admission; successes grow it back."""
+    scheduler = ClaudeScheduler(max_concurrency=8)
+    delay = scheduler.note_rate_limited({'retry-after': '0.2'})
+    assert delay == 0.2
+    assert scheduler.health()['limit'] == 4
+
+    started = time.time()
+    scheduler.acquire(timeout=2.0)
+    waited = time.time() - started
+    scheduler.release()
+    assert waited >= 0.15, f"admitted after {waited:.2f}s, during the pause"
+
+    for _ in range(100):
+        scheduler.observe({})
+    print(f"✅ Paused {waited:.2f}s after 429, limit recovered to {scheduler.health()['limit']}")
+    assert scheduler.health()['limit'] == 8
+
+
+def test_low_budget_headers_pause():
+    """A response reporting an almost spent request budget pauses until the reset."""
+    scheduler = ClaudeScheduler(max_concurrency=2, min_requests=1)
+    reset = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() + 2))
+    scheduler.observe({'anthropic-ratelimit-requests-remaining': '0',
+                       'anthropic-ratelimit-requests-reset': reset})
+    health = scheduler.health()
+    print(f"✅ Low budget paused admission: {health}")
+    assert health['pauses'] == 1 and health['paused_for'] > 0
+    assert not scheduler.has_capacity()
+
+
+def test_async_client_concurrency():
+    """Concurrent async calls never exceed the scheduler's limit."""
+    in_flight = [0]
+    peak = [0]
+
+    async def create(**kwargs):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.02)
+        in_flight[0] -= 1
+        return _raw('ok')
+
+    client = _async_client(create, max_concurrency=3)
+
+    async def run():
+        return await asyncio.gather(*[client.generate(f"prompt {n}") for n in range(20)])
+
+    results = asyncio.run(run())
+    print(f"✅ 20 async calls, at most {peak[0]} in flight")
+    assert results == ['ok'] * 20
+    assert peak[0] <= 3
+    assert client.usage_totals['calls'] == 20
+    assert client.scheduler.health()['active'] == 0
+
+
+def test_async_client_retries_rate_limit():
+    """An async 429 is retried after the scheduler's pause, with concurrency halved."""
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(time.time())
+        if len(calls) == 1:
+            raise _rate_limit_error('0.1')
+        return _raw('recovered')
+
+    client = _async_client(create, max_concurrency=4)
+    result = asyncio.run(client.generate('prompt', retry=RetryPolicy(max_retries=2, base_delay=0.01)))
+    health = client.scheduler.health()
+    print(f"✅ Retried after 429 ({calls[1] - calls[0]:.2f}s): {health}")
+    assert result == 'recovered'
+    assert calls[1] - calls[0] >= 0.08
+    assert health['rate_limited'] == 1 and health['limit'] == 2
+
+
+def test_async_client_hedge_cancels_loser():
+    """A hedged async call returns the faster duplicate and cancels the slow one."""
+    started = []
+    cancelled = []
+
+    async def create(**kwargs):
+        call = len(started)
+        started.append(call)
+        try:
+            await asyncio.sleep(1.0 if call == 0 else 0.05)
+        except asyncio.CancelledError:
+            cancelled.append(call)
+            raise
+        return _raw(f"call-{call}")
+
+    client = _async_client(create)
+
+    async def run():
+        result = await client.generate('prompt', hedge_after=0.1)
+        await asyncio.sleep(0.05)
+        return result
+
+    result = asyncio.run(run())
+    print(f"✅ Hedged call answered by {result}, cancelled {cancelled}")
+    assert result == 'call-1'
+    assert cancelled == [0]
+    assert client.scheduler.health()['active'] == 0
+
+
+def test_async_client_streaming():
+    """Async streaming yields chunks, fills metadata and releases its slot."""
+    class FakeStream:
+        response = SimpleNamespace(headers={})
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        @property
+        async def text_stream(self):
+            for chunk in ['Alex: Hi\n', 'Maya: Hello']:
+                yield chunk
+
+        async def get_final_message(self):
+            return _message('Alex: Hi\nMaya: Hello')
+
+    client = _async_client(None)
+    client.client = SimpleNamespace(messages=SimpleNamespace(stream=lambda **kwargs: FakeStream()))
+
+    async def run():
+        metadata = {}
+        chunks = [chunk async for chunk in client.generate_streaming('prompt', metadata=metadata)]
+        return chunks, metadata
+
+    chunks, metadata = asyncio.run(run())
+    print(f"✅ Streamed {len(chunks)} chunks, usage {metadata['usage']}")
+    assert ''.join(chunks) == 'Alex: Hi\nMaya: Hello'
+    assert metadata['stop_reason'] == 'end_turn' and metadata['usage']['output_tokens'] == 5
+    assert client.scheduler.health()['active'] == 0
+
+
+if __name__ == '__main__':
+    print("🧪 Running Claude Scheduler Tests\n")
+    print("=" * 60)
+    for test in (test_priority_order, test_slot_released_on_timeout, test_granted_slot_returned_on_abandon,
+                 test_async_waiter_cancelled, test_rate_limit_halves_then_recovers, test_low_budget_headers_pause,
+                 test_async_client_concurrency, test_async_client_retries_rate_limit,
+                 test_async_client_hedge_cancels_loser, test_async_client_streaming):
+        print(f"\n▶️  {test.__name__}")
+        test()
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
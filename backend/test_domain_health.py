@@ -0,0 +1,79 @@
+"""Tests for the per-domain circuit breaker (in-process fallback, no Redis)."""
+import time
+from domain_health import DomainHealth
+
+
+def _health(threshold=3, base_backoff=10, max_backoff=35):
+    return DomainHealth(redis_client=False, threshold=threshold,
+                        base_backoff=base_backoff, max_backoff=max_backoff)
+
+
+def _backoff(record):
+    return record['open_until'] - record['last_failure']
+
+
+def test_opens_at_threshold_then_doubles():
+    """The breaker opens once failures reach the threshold, and each further failure doubles it."""
+    health = _health()
+    url = 'https://flaky.example.com/page'
+    records = [health.record_failure(url, error='timeout') for _ in range(2)]
+    assert [r['open_until'] for r in records] == [0.0, 0.0]
+    assert not health.is_open(url) and health.is_degraded(url)
+
+    records += [health.record_failure(url, error='timeout') for _ in range(3)]
+    print(f"✅ Backoffs: {[round(_backoff(r)) if r['open_until'] else 0 for r in records]}")
+    assert [round(_backoff(r)) for r in records[2:]] == [10, 20, 35]  # Capped at max_backoff
+    assert health.is_open(url) and health.get(url)['failures'] == 5
+
+
+def test_blocking_status_opens_and_doubles():
+    """A 403 opens the breaker at once, and repeated 403s keep doubling the backoff."""
+    health = _health(max_backoff=1000)
+    url = 'https://blocked.example.com/'
+    records = [health.record_failure(url, status=403) for _ in range(4)]
+
+    print(f"✅ Backoffs after 403s: {[round(_backoff(r)) for r in records]}")
+    assert [round(_backoff(r)) for r in records] == [10, 20, 40, 80]
+    assert [r['failures'] for r in records] == [1, 2, 3, 4]
+    assert health.get(url)['last_status'] == 403
+
+
+def test_success_resets_domain():
+    """record_success closes the breaker and clears the failure count."""
+    health = _health(threshold=1)
+    url = 'https://recovering.example.com/'
+    health.record_failure(url, status=404)
+    assert health.is_open(url) and health.is_degraded(url)
+
+    health.record_success(url)
+    record = health.get(url)
+    print(f"✅ After success: {record}")
+    assert not health.is_open(url) and not health.is_degraded(url)
+    assert record['failures'] == 0 and record['open_until'] == 0
+
+
+def test_known_bad_domains():
+    """Only domains whose breaker is open right now are reported."""
+    health = _health(threshold=1, base_backoff=0.1, max_backoff=0.1)
+    health.record_failure('https://www.blocked.example.com/a', status=403)
+    health.record_failure('https://brief.example.com/', error='timeout')
+    health._open('brief.example.com', time.time() - 1)  # Window already over
+    _health().record_failure('https://other-instance.example.com/', error='timeout')
+
+    bad = health.known_bad_domains()
+    print(f"✅ Known bad: {bad}")
+    assert bad == ['blocked.example.com']
+
+    time.sleep(0.15)
+    assert health.known_bad_domains() == []
+
+
+if __name__ == '__main__':
+    print("🧪 Running Domain Health Tests\n")
+    print("=" * 60)
+    for test in (test_opens_at_threshold_then_doubles, test_blocking_status_opens_and_doubles,
+                 test_success_resets_domain, test_known_bad_domains):
+        print(f"\n▶️  {test.__name__}")
+        test()
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
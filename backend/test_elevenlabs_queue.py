@@ -0,0 +1,141 @@
+"""Tests for concurrent ElevenLabs synthesis (stubbed API calls, in-memory Redis)."""
+import random
+import threading
+import time
+import elevenlabs_queue
+from elevenlabs_queue import ElevenLabsQueue
+
+
+class FakeRedis:
+    """The few hash commands the queue uses, thread-safe."""
+
+    def __init__(self):
+        self.hashes = {}
+        self._lock = threading.Lock()
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        with self._lock:
+            record = self.hashes.setdefault(key, {})
+            if mapping:
+                record.update({k: str(v) for k, v in mapping.items()})
+            if field is not None:
+                record[field] = str(value)
+
+    def hincrby(self, key, field, amount=1):
+        with self._lock:
+            record = self.hashes.setdefault(key, {})
+            record[field] = str(int(record.get(field, 0)) + amount)
+            return int(record[field])
+
+
+class FakeEvents:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, episode_id, event_type, data=None):
+        self.published.append((event_type, data))
+
+
+class StubQueue(ElevenLabsQueue):
+    """ElevenLabsQueue with no network: _call_elevenlabs sleeps and records concurrency."""
+
+    def __init__(self, delay=lambda item_index: 0.02):
+        self.redis_client = FakeRedis()
+        self.api_key = 'test-key'
+        self.voice_alex = 'voice-alex'
+        self.voice_maya = 'voice-maya'
+        self.tts_cache = None
+        self.streaming = False
+        self.events = FakeEvents()
+        self.delay = delay
+        self.running = {}
+        self.peak = {}
+        self.started = []
+        self._stats_lock = threading.Lock()
+
+    def _call_elevenlabs(self, text, voice_id, index, episode_id):
+        with self._stats_lock:
+            self.started.append(index)
+            self.running[voice_id] = self.running.get(voice_id, 0) + 1
+            self.peak[voice_id] = max(self.peak.get(voice_id, 0), self.running[voice_id])
+        time.sleep(self.delay(index))
+        with self._stats_lock:
+            self.running[voice_id] -= 1
+        return {'success': True, 'index': index, 'audio_file': f"{episode_id}_dialogue_{index}.mp3"}
+
+
+def _items(speakers):
+    return [{'index': i, 'speaker': speaker, 'text': f"line {i}"} for i, speaker in enumerate(speakers)]
+
+
+def test_results_in_order_and_processed_counter():
+    """Results come back in dialogue order and every success is counted exactly once."""
+    queue = StubQueue(delay=lambda index: random.uniform(0.0, 0.03))
+    items = _items(['alex', 'maya'] * 15)
+
+    results = list(queue._synthesize_ordered(items, 'episode-test', max_parallel=6))
+
+    record = queue.redis_client.hashes['elevenlabs:episode:episode-test']
+    print(f"✅ {len(results)} results in order, processed={record['processed']}")
+    assert [r['index'] for r in results] == list(range(30))
+    assert record['processed'] == '30'
+    assert record['status'] == 'completed'
+    assert sum(1 for event, _ in queue.events.published if event == 'line_audio_ready') == 30
+
+
+def test_voice_budget_does_not_block_other_voice():
+    """A run of same-voice lines stays within its budget without starving the other voice."""
+    elevenlabs_queue.ELEVENLABS_MAX_PARALLEL_PER_VOICE, saved = 1, elevenlabs_queue.ELEVENLABS_MAX_PARALLEL_PER_VOICE
+    try:
+        queue = StubQueue(delay=lambda index: 0.05)
+        items = _items(['alex'] * 4 + ['maya'])
+        results = list(queue._synthesize_ordered(items, 'episode-voices', max_parallel=2))
+    finally:
+        elevenlabs_queue.ELEVENLABS_MAX_PARALLEL_PER_VOICE = saved
+
+    print(f"✅ Start order {queue.started}, peak per voice {queue.peak}")
+    assert [r['index'] for r in results] == [0, 1, 2, 3, 4]
+    assert queue.peak == {'voice-alex': 1, 'voice-maya': 1}
+    # Maya's line starts alongside the first Alex line, not after all four
+    assert queue.started.index(4) <= 1
+
+
+def test_status_completed_when_consumer_stops_early():
+    """Closing the result generator early still marks the episode completed."""
+    queue = StubQueue()
+    results = queue._synthesize_ordered(_items(['alex', 'maya'] * 3), 'episode-early', max_parallel=2)
+    next(results)
+    results.close()
+
+    status = queue.redis_client.hashes['elevenlabs:episode:episode-early']['status']
+    print(f"✅ Status after early close: {status}")
+    assert status == 'completed'
+
+
+def test_pipeline_orders_streamed_lines():
+    """Lines added to a TTSPipeline while the script streams finish in order."""
+    queue = StubQueue(delay=lambda index: 0.04 if index % 3 == 0 else 0.01)
+    queue._summarize_results = lambda episode_id, results: {'success': True, 'results': results}
+    pipeline = queue.open_pipeline('episode-pipeline', max_parallel=4)
+
+    for i in range(8):
+        pipeline.add_line(f"{'Alex' if i % 2 == 0 else 'Maya'}: streamed line {i}")
+    pipeline.add_line("(music fades)")  # Not dialogue, ignored
+    result = pipeline.finish()
+
+    record = queue.redis_client.hashes['elevenlabs:episode:episode-pipeline']
+    print(f"✅ Pipeline finished {len(result['results'])} lines, processed={record['processed']}")
+    assert [r['index'] for r in result['results']] == list(range(8))
+    assert record['processed'] == '8' and record['total_dialogues'] == '8'
+    assert record['status'] == 'completed'
+
+
+if __name__ == '__main__':
+    print("🧪 Running ElevenLabs Queue Tests\n")
+    print("=" * 60)
+    for test in (test_results_in_order_and_processed_counter, test_voice_budget_does_not_block_other_voice,
+                 test_status_completed_when_consumer_stops_early, test_pipeline_orders_streamed_lines):
+        print(f"\n▶️  {test.__name__}")
+        test()
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
@@ -0,0 +1,92 @@
+"""Tests for episode progress events (in-process fallback, no Redis)."""
+import threading
+import uuid
+import episode_events
+from episode_events import EpisodeEvents
+
+
+def _local_events():
+    events = EpisodeEvents(redis_client=False)  # Falsy client: skip connecting, use the fallback
+    events.redis_client = None
+    return events
+
+
+def test_replay_then_live_without_gaps():
+    """Events published before and after listen() starts arrive once each, in seq order."""
+    events = _local_events()
+    episode_id = f"episode-{uuid.uuid4().hex[:8]}"
+    for n in range(3):
+        events.publish(episode_id, 'before_listen', {'n': n})
+
+    received = []
+    listening = threading.Event()
+
+    def listen():
+        for event in events.listen(episode_id, timeout=5, heartbeat=0.05):
+            listening.set()
+            if event:
+                received.append(event)
+
+    listener = threading.Thread(target=listen)
+    listener.start()
+    assert listening.wait(2)
+
+    # Concurrent publishers, like parallel TTS workers
+    publishers = [
+        threading.Thread(target=lambda w=w: [events.publish(episode_id, 'line_audio_ready', {'worker': w, 'n': n})
+                                             for n in range(10)])
+        for w in range(4)
+    ]
+    for publisher in publishers:
+        publisher.start()
+    for publisher in publishers:
+        publisher.join()
+    events.publish(episode_id, 'episode_complete', {})
+    listener.join(5)
+
+    seqs = [event['seq'] for event in received]
+    print(f"✅ Received {len(seqs)} events, seq {seqs[0]}..{seqs[-1]}")
+    assert not listener.is_alive()
+    assert seqs == list(range(1, 45))
+    assert [event['type'] for event in received[:3]] == ['before_listen'] * 3
+    assert received[-1]['type'] == 'episode_complete'
+
+
+def test_late_listener_replays_finished_episode():
+    """A listener connecting after the episode finished gets the full log and stops."""
+    events = _local_events()
+    episode_id = f"episode-{uuid.uuid4().hex[:8]}"
+    for event_type in ('episode_started', 'tags_extracted', 'episode_failed'):
+        events.publish(episode_id, event_type)
+
+    received = [event for event in events.listen(episode_id, timeout=2, heartbeat=0.05) if event]
+    print(f"✅ Replayed {[event['type'] for event in received]}")
+    assert [event['seq'] for event in received] == [1, 2, 3]
+
+
+def test_local_log_expires():
+    """In-process logs are dropped once their TTL passes."""
+    events = _local_events()
+    old_episode = f"episode-{uuid.uuid4().hex[:8]}"
+    saved_ttl = episode_events.EPISODE_EVENTS_TTL
+    episode_events.EPISODE_EVENTS_TTL = 0
+    try:
+        events.publish(old_episode, 'episode_started')
+        events.publish(f"episode-{uuid.uuid4().hex[:8]}", 'episode_started')
+    finally:
+        episode_events.EPISODE_EVENTS_TTL = saved_ttl
+
+    print("✅ Expired episode log dropped")
+    assert old_episode not in EpisodeEvents._local_logs
+    assert old_episode not in EpisodeEvents._local_expiry
+
+
+if __name__ == '__main__':
+    print("🧪 Running Episode Events Tests\n")
+    print("=" * 60)
+    for test in (test_replay_then_live_without_gaps, test_late_listener_replays_finished_episode,
+                 test_local_log_expires):
+        print(f"\n▶️  {test.__name__}")
+        test()
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
@@ -0,0 +1,157 @@
+"""Tests for the two-tier page cache (local tier, plus an in-memory stand-in for Redis)."""
+import threading
+import time
+import page_cache
+from page_cache import PageCache, domain_ttl, normalize_url
+
+
+class FakeRedis:
+    """The string and hash commands the page cache uses."""
+
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        with self._lock:
+            if nx and key in self.values:
+                return None
+            self.values[key] = value
+            return True
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def hincrby(self, key, field, amount=1):
+        with self._lock:
+            record = self.hashes.setdefault(key, {})
+            record[field] = record.get(field, 0) + amount
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+
+def _with_domain_ttls(ttls, test):
+    saved = dict(page_cache.PAGE_CACHE_DOMAIN_TTLS)
+    page_cache.PAGE_CACHE_DOMAIN_TTLS.clear()
+    page_cache.PAGE_CACHE_DOMAIN_TTLS.update(ttls)
+    try:
+        return test()
+    finally:
+        page_cache.PAGE_CACHE_DOMAIN_TTLS.clear()
+        page_cache.PAGE_CACHE_DOMAIN_TTLS.update(saved)
+
+
+def test_domain_ttl_matches_parent_domains():
+    """A TTL set for a domain applies to its subdomains and the www. form."""
+    def check():
+        assert domain_ttl('https://www.example.com/deals', default=100) == 60
+        assert domain_ttl('https://shop.news.example.com/a', default=100) == 60
+        assert domain_ttl('https://news.example.org/', default=100) == 5
+        assert domain_ttl('https://example.net/', default=100) == 100
+        assert domain_ttl('https://notexample.com/', default=100) == 100
+        print("✅ Domain TTLs follow parent domains")
+    _with_domain_ttls({'example.com': 60, 'news.example.org': 5}, check)
+    assert normalize_url('HTTPS://Example.COM#top') == 'https://example.com/'
+
+
+def test_lookup_fresh_stale_expired():
+    """Entries are fresh within their TTL, stale within stale_ttl after it, then gone."""
+    def check():
+        cache = PageCache(redis_client=False, stale_ttl=0.2)
+        cache.store('https://fresh.example.com/', 'fresh text', 'http')
+        cache.store('https://volatile.example.com/', 'volatile text', 'http')
+
+        assert cache.lookup('https://fresh.example.com/')['state'] == 'fresh'
+        stale = cache.lookup('https://volatile.example.com/')
+        assert stale['state'] == 'stale' and stale['content'] == 'volatile text'
+
+        time.sleep(0.25)
+        assert cache.lookup('https://volatile.example.com/') is None
+        assert cache.lookup('https://unknown.example.com/') is None
+        print("✅ Fresh, stale and expired entries")
+    _with_domain_ttls({'volatile.example.com': 0}, check)
+
+
+def test_refresh_after_not_modified():
+    """refresh() keeps the content and validators and makes the entry fresh again."""
+    def check():
+        cache = PageCache(redis_client=False, stale_ttl=60)
+        cache.store('https://volatile.example.com/', 'cached text', 'http', etag='"v1"',
+                    last_modified='Mon, 01 Jan 2024 00:00:00 GMT')
+        stale = cache.lookup('https://volatile.example.com/')
+        assert stale['state'] == 'stale'
+        assert PageCache.conditional_headers(stale) == {
+            'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'
+        }
+
+        page_cache.PAGE_CACHE_DOMAIN_TTLS['volatile.example.com'] = 60  # The 304 response
+        refreshed = cache.refresh('https://volatile.example.com/', stale)
+        assert 'state' not in refreshed and refreshed['fetched_at'] >= stale['fetched_at']
+
+        entry = cache.lookup('https://volatile.example.com/')
+        print(f"✅ Refreshed entry is {entry['state']}")
+        assert entry['state'] == 'fresh'
+        assert entry['content'] == 'cached text' and entry['etag'] == '"v1"'
+    _with_domain_ttls({'volatile.example.com': 0}, check)
+
+
+def test_single_revalidation_claim():
+    """Only one claimant refreshes a page, in-process and across workers sharing Redis."""
+    redis_client = FakeRedis()
+    worker_a = PageCache(redis_client=redis_client)
+    worker_b = PageCache(redis_client=redis_client)
+    url = 'https://example.com/deals'
+
+    assert worker_a.begin_revalidation(url)
+    assert not worker_a.begin_revalidation(url)
+    assert not worker_b.begin_revalidation(url)
+
+    worker_a.end_revalidation(url)
+    assert worker_b.begin_revalidation(url)
+    worker_b.end_revalidation(url)
+    print("✅ Second claimant turned away until the first releases")
+
+
+def test_shared_entry_across_workers():
+    """A page stored by one worker is a hit for another through Redis."""
+    redis_client = FakeRedis()
+    PageCache(redis_client=redis_client).store('https://example.com/a', 'shared text', 'http')
+    reader = PageCache(redis_client=redis_client)
+
+    entry = reader.lookup('https://EXAMPLE.com/a#section')
+    stats = reader.stats()
+    print(f"✅ Shared hit: {stats}")
+    assert entry['content'] == 'shared text' and entry['state'] == 'fresh'
+    assert stats['hits'] == 1 and stats['local_entries'] == 1
+
+
+def test_local_lru_eviction():
+    """The local tier keeps at most local_entries pages, dropping the least recently used."""
+    cache = PageCache(redis_client=False, local_entries=2)
+    cache.store('https://example.com/1', 'one', 'http')
+    cache.store('https://example.com/2', 'two', 'http')
+    assert cache.lookup('https://example.com/1')  # Page 2 is now least recently used
+    cache.store('https://example.com/3', 'three', 'http')
+
+    print(f"✅ Local tier after eviction: {cache.stats()}")
+    assert cache.stats()['local_entries'] == 2
+    assert cache.lookup('https://example.com/1')['content'] == 'one'
+    assert cache.lookup('https://example.com/2') is None
+    assert cache.lookup('https://example.com/3')['content'] == 'three'
+
+
+if __name__ == '__main__':
+    print("🧪 Running Page Cache Tests\n")
+    print("=" * 60)
+    for test in (test_domain_ttl_matches_parent_domains, test_lookup_fresh_stale_expired,
+                 test_refresh_after_not_modified, test_single_revalidation_claim,
+                 test_shared_entry_across_workers, test_local_lru_eviction):
+        print(f"\n▶️  {test.__name__}")
+        test()
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
@@ -0,0 +1,94 @@
+"""Tests for retry backoff and stage deadlines."""
+import time
+from types import SimpleNamespace
+import anthropic
+from retry_policy import DeadlineExceeded, RetryPolicy, stage_deadline, time_left
+
+
+def _overloaded_error():
+    response = SimpleNamespace(status_code=529, headers={}, request=None)
+    return anthropic.APIStatusError('overloaded', response=response, body=None)
+
+
+def _bad_request_error():
+    response = SimpleNamespace(status_code=400, headers={}, request=None)
+    return anthropic.BadRequestError('bad request', response=response, body=None)
+
+
+def test_backoff_within_full_jitter_bounds():
+    """Each delay is between 0 and min(max_delay, base_delay * 2**attempt), and actually varies."""
+    policy = RetryPolicy(max_retries=6, base_delay=0.5, max_delay=4.0)
+    for attempt, ceiling in enumerate([0.5, 1.0, 2.0, 4.0, 4.0, 4.0]):
+        delays = [policy.backoff(attempt) for _ in range(200)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+        assert max(delays) - min(delays) > ceiling / 4  # Spread out, not a fixed step
+    print("✅ Backoff stays under min(max_delay, base_delay * 2**attempt)")
+
+
+def test_next_delay_gives_up():
+    """No retry after max_retries or for errors that aren't transient."""
+    policy = RetryPolicy(max_retries=2, base_delay=0.01, max_delay=0.01)
+    assert policy.next_delay(_overloaded_error(), attempt=0) is not None
+    assert policy.next_delay(_overloaded_error(), attempt=2) is None
+    assert policy.next_delay(_bad_request_error(), attempt=0) is None
+    assert policy.next_delay(_overloaded_error(), attempt=0, min_delay=0.3) == 0.3  # retry-after wins
+    print("✅ Gives up after max_retries and on 400s")
+
+
+def test_nested_deadline_never_extends_outer():
+    """An inner stage gets the smaller of its own and the outer budget, then the outer one again."""
+    with stage_deadline(0.5, 'generate'):
+        with stage_deadline(10, 'critique'):
+            inner = time_left()
+        with stage_deadline(0.1, 'draft'):
+            shorter = time_left()
+        outer = time_left()
+
+    print(f"✅ Inner {inner:.2f}s, shorter {shorter:.2f}s, outer {outer:.2f}s")
+    assert inner <= 0.5
+    assert shorter <= 0.1
+    assert 0.1 < outer <= 0.5
+
+
+def test_stops_retrying_at_deadline():
+    """A retry whose wait would outlast the stage is refused; past the deadline, time_left raises."""
+    policy = RetryPolicy(max_retries=5, base_delay=0.01, max_delay=0.01)
+    with stage_deadline(5, 'generate'), stage_deadline(0.2, 'draft'):
+        assert policy.next_delay(_overloaded_error(), attempt=0) is not None
+        assert policy.next_delay(_overloaded_error(), attempt=0, min_delay=1.0) is None
+
+        time.sleep(0.25)
+        try:
+            time_left()
+            assert False, "time_left should raise once the deadline passed"
+        except DeadlineExceeded as e:
+            print(f"✅ {e}")
+            assert 'draft' in str(e)
+
+
+def test_deadline_does_not_leak():
+    """Leaving a stage, even through an exception, restores the previous deadline."""
+    assert time_left() is None
+    try:
+        with stage_deadline(0.05, 'scrape'):
+            time.sleep(0.1)
+            time_left()
+    except DeadlineExceeded:
+        pass
+
+    print("✅ No deadline after the stage exits")
+    assert time_left() is None
+    with stage_deadline(None):
+        assert time_left() is None
+
+
+if __name__ == '__main__':
+    print("🧪 Running Retry Policy Tests\n")
+    print("=" * 60)
+    for test in (test_backoff_within_full_jitter_bounds, test_next_delay_gives_up,
+                 test_nested_deadline_never_extends_outer, test_stops_retrying_at_deadline,
+                 test_deadline_does_not_leak):
+        print(f"\n▶️  {test.__name__}")
+        test()
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
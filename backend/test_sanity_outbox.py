@@ -0,0 +1,135 @@
+"""Tests for the Sanity outbox (on-disk journal, fake Sanity client)."""
+import json
+import os
+import tempfile
+import redis
+import requests
+from sanity_outbox import SanityOutbox, _JournalStore
+
+
+class UnavailableRedis:
+    """A Redis client whose server is down, so the outbox falls back to its journal."""
+
+    def xgroup_create(self, *args, **kwargs):
+        raise redis.ConnectionError('connection refused')
+
+
+class FakeSanity:
+    """Records mutate() calls; fail(mutations) may return a status to raise an HTTPError with."""
+
+    def __init__(self, fail=lambda mutations: None):
+        self.fail = fail
+        self.calls = []
+
+    def mutate(self, mutations):
+        self.calls.append([m['createIfNotExists']['_id'] for m in mutations])
+        status = self.fail(mutations)
+        if status:
+            response = requests.Response()
+            response.status_code = status
+            response._content = json.dumps({'error': {'description': f"status {status}"}}).encode()
+            raise requests.HTTPError(f"{status} error", response=response)
+        return {'transactionId': f"tx-{len(self.calls)}"}
+
+
+def _outbox(journal_dir, sanity):
+    return SanityOutbox(sanity_client=sanity, redis_client=UnavailableRedis(), journal_dir=journal_dir,
+                        batch_size=10, flush_interval=0.05, max_backoff=0.05)
+
+
+def _episode(n, **fields):
+    return dict({'_id': f"episode-{n}", '_type': 'episode', 'title': f"Episode {n}"}, **fields)
+
+
+def test_journal_append_read_ack_order():
+    """Journal entries are read back in arrival order and disappear once acknowledged."""
+    with tempfile.TemporaryDirectory() as journal_dir:
+        store = _JournalStore(journal_dir)
+        ids = [store.append(_episode(n)) for n in range(5)]
+
+        batch = store.read_batch(3, block=0)
+        assert [entry_id for entry_id, _ in batch] == ids[:3]
+        assert [document['_id'] for _, document in batch] == ['episode-0', 'episode-1', 'episode-2']
+
+        store.ack(ids[:3])
+        remaining = store.read_batch(10, block=0)
+        print(f"✅ Read in order, {store.pending()} left after ack")
+        assert [entry_id for entry_id, _ in remaining] == ids[3:]
+        assert store.pending() == 2
+        assert not [n for n in os.listdir(journal_dir) if n.endswith('.tmp')]
+
+
+def test_falls_back_to_journal():
+    """Without a working Redis the outbox writes to the on-disk journal."""
+    with tempfile.TemporaryDirectory() as journal_dir:
+        outbox = _outbox(journal_dir, FakeSanity())
+        print(f"✅ Backend: {outbox.health()['backend']}")
+        assert isinstance(outbox.store, _JournalStore)
+
+
+def test_retryable_errors_keep_entries_queued():
+    """5xx and 429 responses leave the whole batch in the outbox."""
+    for status in (503, 429):
+        with tempfile.TemporaryDirectory() as journal_dir:
+            sanity = FakeSanity(fail=lambda mutations: status)
+            outbox = _outbox(journal_dir, sanity)
+            for n in range(2):
+                outbox.store.append(_episode(n))
+
+            assert outbox._write(outbox.store.read_batch(10, block=0)) is False
+            print(f"✅ {status}: {outbox.store.pending()} entries still queued")
+            assert outbox.store.pending() == 2 and outbox.store.dead() == 0
+            assert sanity.calls == [['episode-0', 'episode-1']]  # Not split into single writes
+
+
+def test_bad_document_dead_lettered_alone():
+    """A 400 on a batch is narrowed down to the bad document; the others are saved."""
+    with tempfile.TemporaryDirectory() as journal_dir:
+        sanity = FakeSanity(fail=lambda mutations: 400 if any(
+            m['createIfNotExists'].get('broken') for m in mutations) else None)
+        outbox = _outbox(journal_dir, sanity)
+        for n in range(3):
+            outbox.store.append(_episode(n, broken=(n == 1)))
+
+        assert outbox._write(outbox.store.read_batch(10, block=0)) is True
+
+        dead_dir = outbox.store.dead_directory
+        dead = [json.load(open(os.path.join(dead_dir, name))) for name in os.listdir(dead_dir)]
+        print(f"✅ Calls {sanity.calls}, dead-lettered {[d['document']['_id'] for d in dead]}")
+        assert sanity.calls == [['episode-0', 'episode-1', 'episode-2'],
+                                ['episode-0'], ['episode-1'], ['episode-2']]
+        assert [d['document']['_id'] for d in dead] == ['episode-1']
+        assert dead[0]['error'] == 'status 400'
+        assert outbox.store.pending() == 0
+        assert outbox.stats['written'] == 2 and outbox.stats['dead_lettered'] == 1
+
+
+def test_flush_after_retry():
+    """The writer retries through an outage and flush() returns True once the outbox is empty."""
+    with tempfile.TemporaryDirectory() as journal_dir:
+        sanity = FakeSanity(fail=lambda mutations: 502 if len(sanity.calls) == 1 else None)
+        outbox = _outbox(journal_dir, sanity)
+        assert outbox.flush(1)  # Nothing queued yet
+
+        for n in range(3):
+            outbox.enqueue(_episode(n))
+        flushed = outbox.flush(5)
+        outbox.stop()
+
+        health = outbox.health()
+        print(f"✅ Flushed={flushed}: {health}")
+        assert flushed
+        assert health['pending'] == 0 and health['dead_letters'] == 0
+        assert health['retries'] >= 1 and health['written'] == 3
+
+
+if __name__ == '__main__':
+    print("🧪 Running Sanity Outbox Tests\n")
+    print("=" * 60)
+    for test in (test_journal_append_read_ack_order, test_falls_back_to_journal,
+                 test_retryable_errors_keep_entries_queued, test_bad_document_dead_lettered_alone,
+                 test_flush_after_retry):
+        print(f"\n▶️  {test.__name__}")
+        test()
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
@@ -0,0 +1,151 @@
+"""Tests for the local script checks and the 'lint' quality mode (no API calls)."""
+import threading
+import podcast_generator
+from script_lint import MAX_RUN, lint_script
+
+SPONSOR = 'Notion'
+
+
+def _script(lines=14, sponsor_line=5):
+    """A clean script: alternating hosts, distinct lines, one marked sponsor mention."""
+    script = []
+    for i in range(lines):
+        speaker = 'Alex' if i % 2 == 0 else 'Maya'
+        text = f"Point number {i} about how teams plan their week."
+        if i == sponsor_line:
+            text = f"I keep my notes in *sponsor*{SPONSOR}*sponsor*, which helps with point {i}."
+        script.append(f"{speaker}: {text}")
+    return '\n'.join(script)
+
+
+def test_clean_script_passes():
+    """A well-formed 14-line script has no issues."""
+    issues = lint_script(_script(), SPONSOR, stop_reason='end_turn')
+    print(f"✅ Clean script: {issues}")
+    assert issues == []
+
+
+def test_stray_narration():
+    """Lines that aren't Alex/Maya dialogue are flagged."""
+    lines = _script().split('\n')
+    lines.insert(3, "Narrator: (the hosts laugh)")
+    lines.insert(8, "[music fades]")
+    issues = lint_script('\n'.join(lines), SPONSOR)
+    print(f"✅ Narration: {issues}")
+    assert issues == ["2 line(s) are not Alex/Maya dialogue"]
+
+
+def test_one_host_run():
+    """More than MAX_RUN lines in a row by one host is flagged."""
+    lines = _script(lines=20).split('\n')
+    for i in range(2, 2 + MAX_RUN + 1):
+        lines[i] = 'Alex' + lines[i][4:]
+    lines[2 + MAX_RUN + 1] = 'Maya' + lines[2 + MAX_RUN + 1][4:]  # Ends the run
+    issues = lint_script('\n'.join(lines), SPONSOR)
+    print(f"✅ Long run: {issues}")
+    assert f"one host speaks {MAX_RUN + 1} times in a row" in issues
+
+
+def test_sponsor_without_markers():
+    """A sponsor named without *sponsor* markers (or not at all) is flagged."""
+    unmarked = _script().replace(f"*sponsor*{SPONSOR}*sponsor*", SPONSOR)
+    missing = _script().replace(f"*sponsor*{SPONSOR}*sponsor*", "a notebook")
+    print(f"✅ Unmarked: {lint_script(unmarked, SPONSOR)}")
+    assert lint_script(unmarked, SPONSOR) == [f"{SPONSOR} mentioned without *sponsor* markers"]
+    assert lint_script(missing, SPONSOR) == [f"{SPONSOR} is never mentioned"]
+
+
+def test_truncated_script():
+    """A draft that hit max_tokens, or whose last line stops mid-sentence, is flagged."""
+    assert lint_script(_script(), SPONSOR, stop_reason='max_tokens') == ["script appears to be cut off"]
+
+    cut = _script().rsplit('.', 1)[0].rsplit(' ', 1)[0]  # Last line ends mid-sentence
+    issues = lint_script(cut, SPONSOR, stop_reason='end_turn')
+    print(f"✅ Truncated: {issues}")
+    assert issues == ["script appears to be cut off"]
+
+
+class FakeClaude:
+    """Draft calls return self.draft; critique calls return a clean script."""
+
+    def __init__(self, draft):
+        self.draft = draft
+        self.calls = []
+
+    def _reply(self, system_prompt):
+        stage = 'critique' if 'critic' in system_prompt else 'draft'
+        self.calls.append(stage)
+        return self.draft if stage == 'draft' else _script(sponsor_line=7)
+
+    def generate_with_metadata(self, prompt, system_prompt=None, **kwargs):
+        return {'text': self._reply(system_prompt), 'stop_reason': 'end_turn',
+                'usage': {'input_tokens': 100, 'output_tokens': 50}}
+
+    def generate_streaming(self, prompt, system_prompt=None, metadata=None, **kwargs):
+        text = self._reply(system_prompt)
+        if metadata is not None:
+            metadata.update(stop_reason='end_turn', usage={'input_tokens': 100, 'output_tokens': 50})
+        yield text
+
+
+class FakeMemory:
+    def get_memory_summary(self):
+        return {}
+
+    def add_sponsor(self, sponsor):
+        pass
+
+    def add_phrase(self, phrase):
+        pass
+
+    def add_tone_pattern(self, pattern):
+        pass
+
+
+def _generator(draft):
+    generator = podcast_generator.PodcastGenerator.__new__(podcast_generator.PodcastGenerator)
+    generator.claude = FakeClaude(draft)
+    generator.memory = FakeMemory()
+    generator.sanity = None
+    generator.use_smart_scraping = False
+    generator.quality_stats = {}
+    generator._quality_lock = threading.Lock()
+    generator.extract_tags_from_topic = lambda topic: ['productivity']
+    generator.select_sponsor = lambda topic, excluded: SPONSOR
+    return generator
+
+
+def test_lint_mode_critiques_only_flagged_drafts():
+    """In 'lint' mode a flagged draft goes through critique; a clean one is emitted as is."""
+    clean = _generator(_script())
+    lines = []
+    result = clean.generate('Planning your week', real_world_context='Context.',
+                            on_line=lines.append, quality_mode='lint')
+    assert clean.claude.calls == ['draft']
+    assert result['conversation'] == _script()
+    assert lines == _script().split('\n')
+    assert result['quality']['lint_issues'] == [] and not result['quality']['critiqued']
+
+    flagged_draft = _script().replace(f"*sponsor*{SPONSOR}*sponsor*", SPONSOR)
+    flagged = _generator(flagged_draft)
+    lines = []
+    result = flagged.generate('Planning your week', real_world_context='Context.',
+                              on_line=lines.append, quality_mode='lint')
+    print(f"✅ Flagged draft critiqued: {result['quality']['lint_issues']}")
+    assert flagged.claude.calls == ['draft', 'critique']
+    assert result['conversation'] == _script(sponsor_line=7)
+    assert lines == _script(sponsor_line=7).split('\n')
+    assert result['quality']['critiqued']
+    assert flagged.quality_summary()['lint']['critique_rate'] == 1.0
+
+
+if __name__ == '__main__':
+    print("🧪 Running Script Lint Tests\n")
+    print("=" * 60)
+    for test in (test_clean_script_passes, test_stray_narration, test_one_host_run,
+                 test_sponsor_without_markers, test_truncated_script,
+                 test_lint_mode_critiques_only_flagged_drafts):
+        print(f"\n▶️  {test.__name__}")
+        test()
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
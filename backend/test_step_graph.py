@@ -0,0 +1,132 @@
+"""Tests for the dependency-graph step executor."""
+import threading
+import time
+from claude_scheduler import PRIORITY_BATCH, claude_priority, current_priority
+from retry_policy import stage_deadline, time_left
+from step_graph import StepGraph
+
+
+def test_dependencies_run_in_order():
+    """A step runs after its dependencies and receives their results as keyword arguments."""
+    order = []
+
+    def tags():
+        time.sleep(0.05)
+        order.append('tags')
+        return ['ai', 'chips']
+
+    def tag_matches(tags):
+        order.append('tag_matches')
+        return [f"match:{tag}" for tag in tags]
+
+    graph = StepGraph()
+    graph.add('tag_matches', tag_matches, deps=['tags'])
+    graph.add('tags', tags)
+    results = graph.run()
+
+    print(f"✅ Ran {order}: {graph.summary()}")
+    assert order == ['tags', 'tag_matches']
+    assert results['tag_matches'] == ['match:ai', 'match:chips']
+    assert graph.timings['tag_matches']['started_at'] >= graph.timings['tags']['duration']
+
+
+def test_independent_steps_run_in_parallel():
+    """Steps without dependencies between them run at the same time."""
+    barrier = threading.Barrier(3, timeout=2)  # Only passes if all three are running together
+
+    def step(n):
+        def run():
+            barrier.wait()
+            return n
+        return run
+
+    graph = StepGraph(max_workers=3)
+    for n in range(3):
+        graph.add(f"step_{n}", step(n))
+    results = graph.run()
+
+    print(f"✅ Parallel steps: {graph.summary()}")
+    assert results == {'step_0': 0, 'step_1': 1, 'step_2': 2}
+
+
+def test_failing_step_lets_siblings_finish():
+    """A failure is raised after running siblings finish; its dependents never start."""
+    started = []
+
+    def broken():
+        raise RuntimeError('sanity lookup failed')
+
+    def slow_sibling():
+        time.sleep(0.1)
+        started.append('slow_sibling')
+        return 'done'
+
+    def dependent(broken):
+        started.append('dependent')
+
+    graph = StepGraph()
+    graph.add('broken', broken)
+    graph.add('slow_sibling', slow_sibling)
+    graph.add('dependent', dependent, deps=['broken'])
+
+    begin = time.time()
+    try:
+        graph.run()
+        assert False, "run() should have raised"
+    except RuntimeError as e:
+        assert str(e) == 'sanity lookup failed'
+
+    print(f"✅ Failure surfaced after {time.time() - begin:.2f}s, timings {graph.timings}")
+    assert started == ['slow_sibling']
+    assert graph.results == {'slow_sibling': 'done'}
+    assert graph.timings['broken']['status'] == 'error'
+    assert graph.timings['slow_sibling']['status'] == 'ok'
+
+
+def test_steps_inherit_context():
+    """The caller's Claude priority and stage deadline reach every step."""
+    def probe():
+        return current_priority(), time_left()
+
+    graph = StepGraph()
+    graph.add('first', probe)
+    graph.add('second', lambda first: probe(), deps=['first'])
+    with claude_priority(PRIORITY_BATCH), stage_deadline(30, 'generate'):
+        results = graph.run()
+
+    print(f"✅ Steps saw {results}")
+    for priority, remaining in results.values():
+        assert priority == PRIORITY_BATCH
+        assert 0 < remaining <= 30
+
+
+def test_invalid_graphs_rejected():
+    """Unknown dependencies and cycles raise instead of hanging."""
+    graph = StepGraph()
+    graph.add('a', lambda missing: None, deps=['missing'])
+    try:
+        graph.run()
+        assert False, "unknown dependency should raise"
+    except ValueError:
+        pass
+
+    graph = StepGraph()
+    graph.add('a', lambda b: None, deps=['b'])
+    graph.add('b', lambda a: None, deps=['a'])
+    try:
+        graph.run()
+        assert False, "cycle should raise"
+    except ValueError as e:
+        print(f"✅ Rejected: {e}")
+
+
+if __name__ == '__main__':
+    print("🧪 Running Step Graph Tests\n")
+    print("=" * 60)
+    for test in (test_dependencies_run_in_order, test_independent_steps_run_in_parallel,
+                 test_failing_step_lets_siblings_finish, test_steps_inherit_context,
+                 test_invalid_graphs_rejected):
+        print(f"\n▶️  {test.__name__}")
+        test()
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
@@ -0,0 +1,97 @@
+"""Tests for the content-addressed TTS audio cache (local files only)."""
+import os
+import tempfile
+import time
+from tts_cache import TTSCache
+
+SETTINGS = {"stability": 0.5, "similarity_boost": 0.5}
+
+
+def _audio_file(directory, name, size):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+    return path
+
+
+def test_key_stable_and_normalized():
+    """Keys ignore whitespace differences and change with anything that affects the audio."""
+    key = TTSCache.make_key('voice-a', 'model-1', SETTINGS, 'Hello  there,\n world')
+    assert key == TTSCache.make_key('voice-a', 'model-1', dict(reversed(list(SETTINGS.items()))),
+                                    ' Hello there, world ')
+    assert key != TTSCache.make_key('voice-b', 'model-1', SETTINGS, 'Hello there, world')
+    assert key != TTSCache.make_key('voice-a', 'model-2', SETTINGS, 'Hello there, world')
+    assert key != TTSCache.make_key('voice-a', 'model-1', {"stability": 0.6, "similarity_boost": 0.5},
+                                    'Hello there, world')
+    assert key != TTSCache.make_key('voice-a', 'model-1', SETTINGS, 'Hello there, World')
+    print(f"✅ Stable key: {key[:16]}...")
+
+
+def test_hit_and_miss():
+    """A stored line is a hit for another cache instance; unknown keys miss."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, 'cache')
+        writer = TTSCache(cache_dir=cache_dir, max_bytes=10 ** 6)
+        reader = TTSCache(cache_dir=cache_dir, max_bytes=10 ** 6)
+        reader.stats()  # Build the reader's index before the write
+
+        writer.store('a' * 64, _audio_file(tmp, 'line.mp3', 1000))
+        dest = os.path.join(tmp, 'episode_dialogue_0.mp3')
+
+        assert reader.fetch('a' * 64, dest)
+        assert os.path.getsize(dest) == 1000
+        assert not reader.fetch('b' * 64, os.path.join(tmp, 'missing.mp3'))
+        stats = reader.stats()
+        print(f"✅ Hit/miss across instances: {stats}")
+        assert stats['hits'] == 1 and stats['misses'] == 1 and stats['entries'] == 1
+
+
+def test_hit_leaves_linked_audio_untouched():
+    """Fetching doesn't change the mtime of audio files hard-linked to the entry."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TTSCache(cache_dir=os.path.join(tmp, 'cache'), max_bytes=10 ** 6)
+        first = _audio_file(tmp, 'episode-1_dialogue_0.mp3', 500)
+        cache.store('c' * 64, first)
+        mtime = os.stat(first).st_mtime_ns
+
+        time.sleep(0.02)
+        assert cache.fetch('c' * 64, os.path.join(tmp, 'episode-2_dialogue_0.mp3'))
+        print("✅ Linked episode audio keeps its mtime on a hit")
+        assert os.stat(first).st_mtime_ns == mtime
+
+
+def test_eviction_by_size_keeps_recently_used():
+    """Over max_bytes, the least recently used entries are evicted first."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, 'cache')
+        cache = TTSCache(cache_dir=cache_dir, max_bytes=2500)
+        for name in ('1', '2'):
+            cache.store(name * 64, _audio_file(tmp, f"{name}.mp3", 1000))
+            time.sleep(0.02)
+
+        # Use the oldest entry so the other one becomes least recently used
+        assert cache.fetch('1' * 64, os.path.join(tmp, 'reuse.mp3'))
+        time.sleep(0.02)
+        cache.store('3' * 64, _audio_file(tmp, '3.mp3', 1000))
+
+        stats = cache.stats()
+        print(f"✅ After eviction: {stats}")
+        assert stats['entries'] == 2 and stats['bytes'] == 2000
+        assert os.path.exists(os.path.join(cache_dir, '1' * 64 + '.mp3'))
+        assert not os.path.exists(os.path.join(cache_dir, '2' * 64 + '.mp3'))
+
+        # A new process rebuilds the same recency order from disk
+        reloaded = TTSCache(cache_dir=cache_dir, max_bytes=1500)
+        reloaded.store('4' * 64, _audio_file(tmp, '4.mp3', 1000))
+        assert sorted(os.listdir(cache_dir)) == ['4' * 64 + '.mp3', '4' * 64 + '.used']
+
+
+if __name__ == '__main__':
+    print("🧪 Running TTS Cache Tests\n")
+    print("=" * 60)
+    for test in (test_key_stable_and_normalized, test_hit_and_miss, test_hit_leaves_linked_audio_untouched,
+                 test_eviction_by_size_keeps_recently_used):
+        print(f"\n▶️  {test.__name__}")
+        test()
+    print("\n" + "=" * 60)
+    print("✅ All tests completed!")
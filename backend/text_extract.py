@@ -0,0 +1,207 @@
+"""
+HTML-to-text extraction for scraped pages.
+Uses the fastest parser that is installed (selectolax, then lxml, then
+BeautifulSoup's html.parser) and stops collecting text once the character
+budget is reached. Browser scrapers can skip HTML serialization entirely with
+extract_in_browser(), which walks the DOM inside the page.
+"""
+from typing import Iterable, Optional, Sequence
+from config import TEXT_EXTRACTOR
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _SelectolaxParser
+except ImportError:
+    try:
+        # selectolax < 0.3.13 only has the Modest backend
+        from selectolax.parser import HTMLParser as _SelectolaxParser
+    except ImportError:
+        _SelectolaxParser = None
+
+try:
+    import lxml.html as _lxml_html
+except ImportError:
+    _lxml_html = None
+
+from bs4 import BeautifulSoup
+
+# Elements that never hold article text
+REMOVE_TAGS = ('script', 'style', 'nav', 'footer', 'header', 'aside', 'noscript', 'template')
+
+# Where the main content usually lives, most specific first
+MAIN_SELECTORS = ('article', 'main', 'div.content', 'div.article', 'div.post')
+
+_IN_BROWSER_JS = """([maxChars, removeTags, mainSelectors]) => {
+    let root = null;
+    for (const selector of mainSelectors) {
+        root = document.querySelector(selector);
+        if (root) break;
+    }
+    root = root || document.body;
+    if (!root) return '';
+
+    const skip = new Set(removeTags.map(t => t.toUpperCase()));
+    const stop = root.parentElement;
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT, {
+        acceptNode(node) {
+            for (let el = node.parentElement; el && el !== stop; el = el.parentElement) {
+                if (skip.has(el.tagName)) return NodeFilter.FILTER_REJECT;
+            }
+            return NodeFilter.FILTER_ACCEPT;
+        }
+    });
+
+    const parts = [];
+    let length = 0;
+    while (walker.nextNode() && length < maxChars) {
+        const text = walker.currentNode.nodeValue.replace(/\\s+/g, ' ').trim();
+        if (text) {
+            parts.push(text);
+            length += text.length + 1;
+        }
+    }
+    return parts.join(' ');
+}"""
+
+
+def available_backends() -> list:
+    """List the installed parser backends, fastest first."""
+    backends = []
+    if _SelectolaxParser is not None:
+        backends.append('selectolax')
+    if _lxml_html is not None:
+        backends.append('lxml')
+    backends.append('bs4')
+    return backends
+
+
+def _backend() -> str:
+    backends = available_backends()
+    if TEXT_EXTRACTOR != 'auto' and TEXT_EXTRACTOR in backends:
+        return TEXT_EXTRACTOR
+    return backends[0]
+
+
+def _join_until(strings: Iterable[str], max_chars: Optional[int]) -> str:
+    """Join whitespace-normalized strings, stopping once max_chars is reached."""
+    parts = []
+    length = 0
+    for s in strings:
+        text = ' '.join(s.split())
+        if not text:
+            continue
+        parts.append(text)
+        length += len(text) + 1
+        if max_chars is not None and length >= max_chars:
+            break
+    text = ' '.join(parts)
+    return text[:max_chars] if max_chars is not None else text
+
+
+def extract_text(html, max_chars: Optional[int] = None, main_only: bool = True,
+                 remove_tags: Sequence[str] = REMOVE_TAGS) -> str:
+    """
+    Extract readable text from an HTML document.
+
+    Args:
+        html: HTML as str or bytes
+        max_chars: Stop collecting text after this many characters
+        main_only: Prefer <article>/<main>/content divs over the whole body
+        remove_tags: Elements whose text is dropped
+
+    Returns:
+        Whitespace-normalized text (empty if none was found)
+    """
+    if not html:
+        return ''
+
+    backend = _backend()
+    if backend == 'selectolax':
+        return _extract_selectolax(html, max_chars, main_only, remove_tags)
+    if backend == 'lxml':
+        return _extract_lxml(html, max_chars, main_only, remove_tags)
+    return _extract_bs4(html, max_chars, main_only, remove_tags)
+
+
+def _extract_selectolax(html, max_chars, main_only, remove_tags) -> str:
+    tree = _SelectolaxParser(html)
+    tree.strip_tags(list(remove_tags))
+
+    roots = [tree.css_first(s) for s in MAIN_SELECTORS] if main_only else []
+    roots = [r for r in roots if r is not None][:1] + [tree.body or tree.root]
+
+    for root in roots:
+        if root is None:
+            continue
+        strings = (node.text(deep=False) for node in root.traverse(include_text=True) if node.tag == '-text')
+        text = _join_until(strings, max_chars)
+        if text:
+            return text
+    return ''
+
+
+def _extract_lxml(html, max_chars, main_only, remove_tags) -> str:
+    try:
+        doc = _lxml_html.document_fromstring(html)
+    except Exception:
+        # Empty or undecodable document
+        return _extract_bs4(html, max_chars, main_only, remove_tags)
+
+    for el in list(doc.iter(*remove_tags)):
+        # Keeps the tail text, which belongs to the parent
+        el.drop_tree()
+
+    roots = []
+    if main_only:
+        for selector in MAIN_SELECTORS:
+            tag, _, cls = selector.partition('.')
+            xpath = f"//{tag}" if not cls else f"//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+            found = doc.xpath(xpath)
+            if found:
+                roots.append(found[0])
+                break
+    body = doc.find('body')
+    roots.append(body if body is not None else doc)
+
+    for root in roots:
+        text = _join_until(root.itertext(), max_chars)
+        if text:
+            return text
+    return ''
+
+
+def _extract_bs4(html, max_chars, main_only, remove_tags) -> str:
+    soup = BeautifulSoup(html, 'html.parser')
+    for element in soup(list(remove_tags)):
+        element.decompose()
+
+    roots = []
+    if main_only:
+        main_content = (
+            soup.find('article') or
+            soup.find('main') or
+            soup.find('div', class_=['content', 'article', 'post'])
+        )
+        if main_content:
+            roots.append(main_content)
+    roots.append(soup.body or soup)
+
+    for root in roots:
+        text = _join_until(root.stripped_strings, max_chars)
+        if text:
+            return text
+    return ''
+
+
+async def extract_in_browser(page, max_chars: int) -> str:
+    """
+    Extract the main text inside the browser, so only the text crosses CDP.
+
+    Args:
+        page: Playwright page with the content loaded
+        max_chars: Stop collecting text after this many characters
+
+    Returns:
+        Whitespace-normalized text (empty if none was found)
+    """
+    text = await page.evaluate(_IN_BROWSER_JS, [max_chars, list(REMOVE_TAGS), list(MAIN_SELECTORS)])
+    return (text or '')[:max_chars]
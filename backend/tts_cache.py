@@ -0,0 +1,218 @@
+"""
+Content-addressed cache for ElevenLabs text-to-speech audio.
+Identical lines (same voice, model, settings and text) are synthesized once
+and reused by hard-linking the cached mp3 into the audio directory.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from config import TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES, REDIS_VERBOSE_LOGGING
+
+
+class TTSCache:
+    """
+    Size-bounded LRU cache of synthesized audio files on disk.
+    Entries are keyed by a hash of everything that affects the audio output.
+    """
+
+    STATS_KEY = "elevenlabs:cache:stats"
+
+    def __init__(self, cache_dir: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES,
+                 redis_client=None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cached mp3 files
+            max_bytes: Maximum total size before least recently used entries are evicted
+            redis_client: Optional Redis client for shared hit/miss counters
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.redis_client = redis_client
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries: Optional[OrderedDict] = None  # key -> size, oldest first
+        self._total_bytes = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(voice_id: str, model_id: str, voice_settings: Dict, text: str) -> str:
+        """
+        Build the cache key for a synthesis request.
+
+        Args:
+            voice_id: ElevenLabs voice ID
+            model_id: ElevenLabs model ID
+            voice_settings: Voice settings sent with the request
+            text: Text to be spoken
+
+        Returns:
+            Hex digest identifying the audio output
+        """
+        normalized_text = ' '.join(text.split())
+        payload = json.dumps({
+            'voice_id': voice_id,
+            'model_id': model_id,
+            'voice_settings': voice_settings,
+            'text': normalized_text
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def _recency_path(self, key: str) -> str:
+        # Cached mp3s share an inode with episode files hard-linked into /audio,
+        # so recency is tracked on a separate marker file, never on the audio
+        return os.path.join(self.cache_dir, f"{key}.used")
+
+    def _touch(self, key: str):
+        """Record a use of an entry (survives restarts and is seen by other workers)."""
+        with open(self._recency_path(key), 'a'):
+            pass
+        os.utime(self._recency_path(key))
+
+    def _load_entries(self):
+        """Build the in-memory LRU index from the files on disk (oldest first)."""
+        if self._entries is not None:
+            return
+
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.mp3'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            try:
+                last_used = os.stat(self._recency_path(name[:-4])).st_mtime
+            except OSError:
+                last_used = stat.st_mtime
+            files.append((last_used, name[:-4], stat.st_size))
+
+        files.sort()
+        self._entries = OrderedDict((key, size) for _, key, size in files)
+        self._total_bytes = sum(size for _, _, size in files)
+
+    def _count(self, field: str):
+        if self.redis_client:
+            try:
+                self.redis_client.hincrby(self.STATS_KEY, field, 1)
+            except Exception:
+                pass
+
+    def fetch(self, key: str, dest_path: str) -> bool:
+        """
+        Materialize a cached entry at dest_path.
+
+        Args:
+            key: Cache key from make_key
+            dest_path: Where the audio file should appear
+
+        Returns:
+            True on a cache hit, False on a miss
+        """
+        src = self._path(key)
+        # The disk is the source of truth: other workers store entries this
+        # process's index hasn't seen
+        try:
+            size = os.path.getsize(src)
+        except OSError:
+            size = None
+        hit = size is not None
+
+        with self._lock:
+            self._load_entries()
+            if hit:
+                self._total_bytes += size - self._entries.pop(key, 0)
+                self._entries[key] = size
+                self.hits += 1
+            else:
+                self._total_bytes -= self._entries.pop(key, 0)
+                self.misses += 1
+
+        if not hit:
+            self._count('misses')
+            return False
+
+        try:
+            _link_or_copy(src, dest_path)
+            self._touch(key)
+        except OSError:
+            # Evicted by another worker between lookup and link
+            return False
+
+        self._count('hits')
+        return True
+
+    def store(self, key: str, audio_path: str):
+        """
+        Add a freshly synthesized file to the cache.
+
+        Args:
+            key: Cache key from make_key
+            audio_path: Path of the generated audio file
+        """
+        dest = self._path(key)
+        try:
+            tmp = f"{dest}.{threading.get_ident()}.tmp"
+            _link_or_copy(audio_path, tmp)
+            os.replace(tmp, dest)
+            size = os.path.getsize(dest)
+            self._touch(key)
+        except OSError as e:
+            if REDIS_VERBOSE_LOGGING:
+                print(f"⚠️  TTS cache store failed: {e}")
+            return
+
+        with self._lock:
+            self._load_entries()
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            for path in (self._path(key), self._recency_path(key)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            if REDIS_VERBOSE_LOGGING:
+                print(f"🧹 TTS cache evicted {key[:12]}... ({size:,} bytes)")
+
+    def stats(self) -> Dict:
+        """Get hit/miss counters and current size."""
+        with self._lock:
+            self._load_entries()
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+def _link_or_copy(src: str, dest: str):
+    """Hard-link src to dest, falling back to a copy across filesystems."""
+    if os.path.exists(dest):
+        os.remove(dest)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
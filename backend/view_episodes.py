@@ -1,11 +1,14 @@
 """View saved episodes from Sanity CMS."""
 import os
 from dotenv import load_dotenv
-from sanity_client import SanityClient
+from sanity_client import SanityClient, EPISODE_SUMMARY_FIELDS
 from datetime import datetime
 
 load_dotenv()
 
+# The listing shows a conversation preview
+LISTING_FIELDS = EPISODE_SUMMARY_FIELDS + ('conversation',)
+
 def format_date(date_str):
     """Format ISO date string to readable format."""
     try:
@@ -92,7 +95,7 @@ def main():
     print("🔍 Querying Sanity CMS for episodes...")
     print()
     
-    episodes = client.get_episodes(limit=20)
+    episodes = client.get_episodes(limit=20, fields=LISTING_FIELDS)
     
     if not episodes:
         print("📭 No episodes found.")
@@ -133,7 +136,7 @@ if __name__ == "__main__":
             query = sys.argv[2]
             print(f"🔍 Searching for: '{query}'")
             print()
-            episodes = client.search_episodes(query, limit=10)
+            episodes = client.search_episodes(query, limit=10, fields=LISTING_FIELDS)
             display_episodes(episodes)
         elif sys.argv[1] == "--id" and len(sys.argv) > 2:
             # Get specific episode